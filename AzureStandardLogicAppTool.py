@@ -1,15 +1,33 @@
+import asyncio
+import hashlib
 import json
+import re
 import requests
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, AsyncIterator, Iterable, Optional, Tuple
 from urllib.parse import urlparse, parse_qs
 
+import aiohttp
 from azure.identity import DefaultAzureCredential
+from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
 from azure.ai.agents.models import (
     OpenApiTool,
     OpenApiConnectionAuthDetails,
     OpenApiConnectionSecurityScheme,
+    OpenApiManagedAuthDetails,
+    OpenApiManagedSecurityScheme,
 )
 
+from arm_session import (
+    arm_request,
+    arm_request_async,
+    create_arm_session_async,
+    get_arm_session,
+)
+from discovery_cache import DiscoveryCache, discovery_scope
+from rate_limits import BACKGROUND, bind_priority, prioritized
+from token_cache import get_arm_token, get_arm_token_async
+
 
 class AzureStandardLogicAppTool:
     """
@@ -17,11 +35,21 @@ class AzureStandardLogicAppTool:
     and then invoking them with an appropriate payload.
     """
 
-    def __init__(self, subscription_id: str, resource_group: str, credential=None):
+    def __init__(
+        self,
+        subscription_id: str,
+        resource_group: str,
+        credential=None,
+        tenant_id: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+    ):
         if credential is None:
             credential = DefaultAzureCredential()
         self.subscription_id = subscription_id
         self.resource_group = resource_group
+        self.tenant_id = tenant_id
+        # pooled keep-alive session shared by all ARM calls
+        self.session = session or get_arm_session()
 
         self.callback_urls: Dict[str, str] = {}
 
@@ -31,18 +59,25 @@ class AzureStandardLogicAppTool:
 
     def get_access_token(self) -> str:
         """
-        Get an Azure AD access token for ARM API calls.
+        Get an Azure AD access token for ARM API calls (cached until shortly before expiry).
         """
-        token = self.credential.get_token("https://management.azure.com/.default")
-        return token.token
+        return get_arm_token(self.credential, self.tenant_id)
+
+    def _workflows_url(self, logic_app_name: str) -> str:
+        return f"{self.base_url}/providers/Microsoft.Web/sites/{logic_app_name}/hostruntime/runtime/webhooks/workflow/api/management/workflows"
+
+    def _trigger_url(
+        self, logic_app_name: str, workflow_name: str, trigger_name: str
+    ) -> str:
+        return f"{self._workflows_url(logic_app_name)}/{workflow_name}/triggers/{trigger_name}"
 
     def list_standard_logic_app_workflows(self, logic_app_name: str) -> Dict[str, Any]:
         """
         List workflows for a Logic App Standard using the ARM REST API.
         """
-        url = f"{self.base_url}/providers/Microsoft.Web/sites/{logic_app_name}/hostruntime/runtime/webhooks/workflow/api/management/workflows?api-version=2018-11-01"
+        url = f"{self._workflows_url(logic_app_name)}?api-version=2018-11-01"
         headers = {"Authorization": f"Bearer {self.get_access_token()}"}
-        resp = requests.get(url, headers=headers)
+        resp = arm_request("GET", url, session=self.session, headers=headers)
         resp.raise_for_status()
         return resp.json()
 
@@ -52,9 +87,9 @@ class AzureStandardLogicAppTool:
         """
         Get the trigger definition for a workflow in Logic App Standard.
         """
-        url = f"{self.base_url}/providers/Microsoft.Web/sites/{logic_app_name}/hostruntime/runtime/webhooks/workflow/api/management/workflows/{workflow_name}/triggers/{trigger_name}/schemas/json?api-version=2024-11-01"
+        url = f"{self._trigger_url(logic_app_name, workflow_name, trigger_name)}/schemas/json?api-version=2024-11-01"
         headers = {"Authorization": f"Bearer {self.get_access_token()}"}
-        resp = requests.get(url, headers=headers)
+        resp = arm_request("GET", url, session=self.session, headers=headers)
         resp.raise_for_status()
         return resp.json()
 
@@ -65,15 +100,7 @@ class AzureStandardLogicAppTool:
         Generate an OpenAPI spec matching the provided Logic App schema example.
         """
         # Extract properties and required fields
-        properties = {}
-        required = []
-        for k, v in trigger_def.get("properties", {}).items():
-            prop_schema = {"type": v.get("type", "string")}
-            if v.get("description"):
-                prop_schema["description"] = v["description"]
-            properties[k] = prop_schema
-            if v.get("nullable", False) is False:
-                required.append(k)
+        properties, required = self._trigger_request_properties(trigger_def)
 
         # Standard Logic App query parameters
         parameters = [
@@ -165,15 +192,174 @@ class AzureStandardLogicAppTool:
         }
         return openapi
 
+    @staticmethod
+    def _trigger_request_properties(
+        trigger_def: Dict[str, Any],
+    ) -> Tuple[Dict[str, Any], list[str]]:
+        properties = {}
+        required = []
+        for k, v in trigger_def.get("properties", {}).items():
+            prop_schema = {"type": v.get("type", "string")}
+            if v.get("description"):
+                prop_schema["description"] = v["description"]
+            properties[k] = prop_schema
+            if v.get("nullable", False) is False:
+                required.append(k)
+        return properties, required
+
+    def generate_openapi_spec_for_logic_app(
+        self,
+        logic_app_name: str,
+        workflows: list[Dict[str, Any]],
+        server_url: str,
+        sig_security: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Generate a single OpenAPI spec covering all HTTP-triggered workflows of a Logic App.
+
+        `workflows` items carry `workflow_name`, `trigger_name` and `trigger_def`.
+        Every workflow gets its own path (`/{workflow}/triggers/{trigger}/invoke`,
+        relative to `server_url`, i.e. `https://<site>/api`) and a unique operationId;
+        parameters, responses and identical request schemas are shared through
+        `components`.
+
+        A SAS `sig` is specific to a single workflow, so by default the document has no
+        security requirement and is meant for Entra ID (managed identity) auth. Set
+        `sig_security` to keep the `sig` apiKey scheme for single-sig use.
+        """
+        parameters: Dict[str, Any] = {
+            "api-version": {
+                "name": "api-version",
+                "in": "query",
+                "description": "`2022-05-01` is the most common generally available version",
+                "required": True,
+                "schema": {"type": "string", "default": "2022-05-01"},
+            },
+        }
+        if sig_security:
+            parameters["sv"] = {
+                "name": "sv",
+                "in": "query",
+                "description": "The version number",
+                "required": True,
+                "schema": {"type": "string", "default": "1.0"},
+            }
+
+        schemas: Dict[str, Any] = {}
+        schema_refs: Dict[str, str] = {}
+        paths: Dict[str, Any] = {}
+        operation_ids: set[str] = set()
+
+        for workflow in workflows:
+            workflow_name = workflow["workflow_name"]
+            trigger_name = workflow["trigger_name"]
+
+            base_operation_id = operation_id = re.sub(
+                r"[^A-Za-z0-9_]", "_", workflow_name
+            )
+            suffix = 2
+            while operation_id in operation_ids:
+                operation_id = f"{base_operation_id}_{suffix}"
+                suffix += 1
+            operation_ids.add(operation_id)
+
+            # workflows with the same request shape share one schema component
+            properties, required = self._trigger_request_properties(
+                workflow["trigger_def"]
+            )
+            schema = {
+                "type": "object",
+                "properties": properties,
+                **({"required": required} if required else {}),
+            }
+            schema_key = json.dumps(schema, sort_keys=True)
+            if schema_key not in schema_refs:
+                schema_name = f"{operation_id}Request"
+                schemas[schema_name] = schema
+                schema_refs[schema_key] = f"#/components/schemas/{schema_name}"
+
+            operation_parameters = [
+                {"$ref": f"#/components/parameters/{name}"} for name in parameters
+            ]
+            if sig_security:
+                sp_name = f"sp-{trigger_name}"
+                if sp_name not in parameters:
+                    parameters[sp_name] = {
+                        "name": "sp",
+                        "in": "query",
+                        "description": "The permissions",
+                        "required": True,
+                        "schema": {
+                            "type": "string",
+                            "default": f"%2Ftriggers%2F{trigger_name}%2Frun",
+                        },
+                    }
+                operation_parameters.append(
+                    {"$ref": f"#/components/parameters/{sp_name}"}
+                )
+
+            paths[f"/{workflow_name}/triggers/{trigger_name}/invoke"] = {
+                "post": {
+                    "description": workflow_name.replace("_", "-"),
+                    "operationId": operation_id,
+                    "parameters": operation_parameters,
+                    "responses": {
+                        "200": {"$ref": "#/components/responses/LogicAppResponse"},
+                        "default": {"$ref": "#/components/responses/LogicAppResponse"},
+                    },
+                    "requestBody": {
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": schema_refs[schema_key]}
+                            }
+                        },
+                        "required": True,
+                    },
+                }
+            }
+
+        components: Dict[str, Any] = {
+            "parameters": parameters,
+            "responses": {
+                "LogicAppResponse": {
+                    "description": "The Logic App Response.",
+                    "content": {"application/json": {"schema": {"type": "object"}}},
+                }
+            },
+            "schemas": schemas,
+        }
+        openapi = {
+            "openapi": "3.0.3",
+            "info": {
+                "version": "1.0.0.0",
+                "title": logic_app_name.replace("_", "-"),
+                "description": f"Workflows of the {logic_app_name} Logic App",
+            },
+            "servers": [{"url": server_url}],
+            "paths": paths,
+            "components": components,
+        }
+        if sig_security:
+            openapi["security"] = [{"sig": []}]
+            components["securitySchemes"] = {
+                "sig": {
+                    "type": "apiKey",
+                    "description": "The SHA 256 hash of the entire request URI with an internal key.",
+                    "name": "sig",
+                    "in": "query",
+                }
+            }
+        return openapi
+
     def get_workflow_callback_url(
         self, logic_app_name: str, workflow_name: str, trigger_name: str
     ) -> str:
         """
         Get the callback URL for a workflow trigger in Logic App Standard.
         """
-        url = f"{self.base_url}/providers/Microsoft.Web/sites/{logic_app_name}/hostruntime/runtime/webhooks/workflow/api/management/workflows/{workflow_name}/triggers/{trigger_name}/listCallbackUrl?api-version=2024-11-01"
+        url = f"{self._trigger_url(logic_app_name, workflow_name, trigger_name)}/listCallbackUrl?api-version=2024-11-01"
         headers = {"Authorization": f"Bearer {self.get_access_token()}"}
-        resp = requests.post(url, headers=headers)
+        resp = arm_request("POST", url, session=self.session, headers=headers)
         resp.raise_for_status()
         return resp.json().get("value", "")
 
@@ -191,10 +377,14 @@ class FoundryTool:
         foundry_name: str,
         project_name: str,
         credential=None,
+        tenant_id: Optional[str] = None,
+        session: Optional[requests.Session] = None,
     ):
         if credential is None:
             credential = DefaultAzureCredential()
         self.credential = credential
+        self.tenant_id = tenant_id
+        self.session = session or get_arm_session()
         self.subscription_id = subscription_id
         self.resource_group = resource_group
         self.foundry_name = foundry_name
@@ -202,32 +392,454 @@ class FoundryTool:
 
     def get_access_token(self) -> str:
         """
-        Get an Azure AD access token for ARM API calls.
+        Get an Azure AD access token for ARM API calls (cached until shortly before expiry).
         """
-        token = self.credential.get_token("https://management.azure.com/.default")
-        return token.token
+        return get_arm_token(self.credential, self.tenant_id)
 
-    def create_custom_connection(self, connection_name: str, sig: str) -> str:
-        """
-        Create a custom connection in the Azure AI Projects service.
-        """
-        url = f"https://management.azure.com/subscriptions/{self.subscription_id}/resourceGroups/{self.resource_group}/providers/Microsoft.CognitiveServices/accounts/{self.foundry_name}/projects/{self.project_name}/connections/{connection_name}?api-version=2025-04-01-preview"
-        headers = {"Authorization": f"Bearer {self.get_access_token()}"}
-        data = {
+    def _connections_url(self) -> str:
+        return f"https://management.azure.com/subscriptions/{self.subscription_id}/resourceGroups/{self.resource_group}/providers/Microsoft.CognitiveServices/accounts/{self.foundry_name}/projects/{self.project_name}/connections"
+
+    def _connection_url(self, connection_name: str) -> str:
+        return f"{self._connections_url()}/{connection_name}?api-version=2025-04-01-preview"
+
+    @staticmethod
+    def sig_fingerprint(sig: Optional[str]) -> str:
+        """One-way fingerprint of a sig, stored in the connection metadata."""
+        return hashlib.sha256((sig or "").encode("utf-8")).hexdigest()[:32]
+
+    def _connection_body(self, sig: str, owner: Optional[str] = None) -> Dict[str, Any]:
+        # credentials aren't returned when listing connections, so the metadata
+        # carries a fingerprint of the sig to detect rotations without a PUT
+        metadata = {"sigFingerprint": self.sig_fingerprint(sig)}
+        if owner:
+            metadata["logicApp"] = owner
+        return {
             "properties": {
                 "authType": "CustomKeys",
                 "category": "CustomKeys",
                 "target": "_",
                 "isSharedToAll": True,
                 "credentials": {"keys": {"sig": sig}},
-                "metadata": {},
+                "metadata": metadata,
             }
         }
-        resp = requests.put(url, headers=headers, json=data)
+
+    def connection_matches(
+        self, connection: Dict[str, Any], sig: Optional[str]
+    ) -> bool:
+        """
+        Check if an existing connection already has the target / credential we would PUT.
+        """
+        props = connection.get("properties", {})
+        metadata = props.get("metadata") or {}
+        return (
+            props.get("category") == "CustomKeys"
+            and props.get("target") == "_"
+            and metadata.get("sigFingerprint") == self.sig_fingerprint(sig)
+        )
+
+    @staticmethod
+    def is_stale_connection(
+        connection: Dict[str, Any],
+        stale_prefix: str,
+        owner: Optional[str],
+        live_names: Iterable[str],
+        removed_names: Iterable[str] = (),
+    ) -> bool:
+        """
+        Check if a connection was created for a workflow that no longer exists.
+
+        Connections tagged with a `logicApp` must belong to `owner`. Untagged ones
+        (created before tagging) are only stale when named after a workflow known to
+        have been removed (`removed_names`) - the name prefix alone can't tell app
+        `foo`'s connections from app `foo-bar`'s.
+        """
+        name = connection.get("name", "")
+        if not name.startswith(stale_prefix) or name in live_names:
+            return False
+        tagged_owner = (connection.get("properties", {}).get("metadata") or {}).get(
+            "logicApp"
+        )
+        if tagged_owner is None:
+            return name in removed_names
+        return owner is not None and tagged_owner == owner
+
+    def create_custom_connection(
+        self, connection_name: str, sig: str, owner: Optional[str] = None
+    ) -> str:
+        """
+        Create a custom connection in the Azure AI Projects service.
+        """
+        url = self._connection_url(connection_name)
+        headers = {"Authorization": f"Bearer {self.get_access_token()}"}
+        data = self._connection_body(sig, owner)
+        resp = arm_request("PUT", url, session=self.session, headers=headers, json=data)
         resp.raise_for_status()
         return resp.json()["id"]
 
+    def list_connections(self) -> list[Dict[str, Any]]:
+        """
+        List all connections of the project (following `nextLink`).
+        """
+        url = f"{self._connections_url()}?api-version=2025-04-01-preview"
+        connections: list[Dict[str, Any]] = []
+        while url:
+            headers = {"Authorization": f"Bearer {self.get_access_token()}"}
+            resp = arm_request("GET", url, session=self.session, headers=headers)
+            resp.raise_for_status()
+            page = resp.json()
+            connections.extend(page.get("value", []))
+            url = page.get("nextLink")
+        return connections
+
+    def delete_connection(self, connection_name: str) -> None:
+        """
+        Delete a connection from the project.
+        """
+        url = self._connection_url(connection_name)
+        headers = {"Authorization": f"Bearer {self.get_access_token()}"}
+        resp = arm_request("DELETE", url, session=self.session, headers=headers)
+        if resp.status_code != 404:
+            resp.raise_for_status()
+
+    def _plan_reconcile(
+        self,
+        existing: Dict[str, Dict[str, Any]],
+        desired: Dict[str, Optional[str]],
+        keep: Iterable[str],
+        stale_prefix: Optional[str],
+        owner: Optional[str],
+        removed: Iterable[str],
+    ) -> Tuple[list[str], list[str], Dict[str, str]]:
+        """
+        Connections to PUT, connections to delete and the ids of the existing ones.
+        """
+        to_put = [
+            name
+            for name, sig in desired.items()
+            if name not in existing or not self.connection_matches(existing[name], sig)
+        ]
+        live_names = set(desired) | set(keep)
+        removed_names = set(removed)
+        to_delete = (
+            [
+                name
+                for name, connection in existing.items()
+                if self.is_stale_connection(
+                    connection, stale_prefix, owner, live_names, removed_names
+                )
+            ]
+            if stale_prefix
+            else []
+        )
+
+        connection_ids = {
+            name: existing[name]["id"] for name in live_names if name in existing
+        }
+        return to_put, to_delete, connection_ids
+
+    @staticmethod
+    def _print_reconcile(
+        desired: Dict[str, Optional[str]], to_put: list[str], to_delete: list[str]
+    ) -> None:
+        print(
+            f"Connections: {len(to_put)} created/updated, "
+            f"{len(desired) - len(to_put)} unchanged, {len(to_delete)} stale removed"
+        )
+
+    def reconcile_custom_connections(
+        self,
+        desired: Dict[str, Optional[str]],
+        keep: Iterable[str] = (),
+        stale_prefix: Optional[str] = None,
+        owner: Optional[str] = None,
+        max_workers: int = 8,
+        removed: Iterable[str] = (),
+        existing: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Dict[str, str]:
+        """
+        Make the project's custom connections match `desired` (connection name -> sig).
+
+        Connections are listed once (pass `existing`, name -> connection, if they
+        already were); only new connections or ones whose sig changed are PUT
+        (concurrently, at most `max_workers` at a time). Connections starting with
+        `stale_prefix` that are neither desired nor in `keep` are deleted when tagged
+        with `owner`, or untagged and listed in `removed` (see `is_stale_connection`).
+        Returns connection name -> id for every desired / kept connection that exists.
+        """
+        if existing is None:
+            existing = {c["name"]: c for c in self.list_connections()}
+        to_put, to_delete, connection_ids = self._plan_reconcile(
+            existing, desired, keep, stale_prefix, owner, removed
+        )
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            created = pool.map(
+                bind_priority(
+                    lambda name: self.create_custom_connection(
+                        name, desired[name], owner
+                    )
+                ),
+                to_put,
+            )
+            connection_ids.update(zip(to_put, created))
+            list(pool.map(bind_priority(self.delete_connection), to_delete))
+
+        self._print_reconcile(desired, to_put, to_delete)
+        return connection_ids
+
+
+class AsyncAzureStandardLogicAppTool(AzureStandardLogicAppTool):
+    """
+    Async variant of AzureStandardLogicAppTool for use from notebooks / event loops.
+
+    Uses an `azure.identity.aio` credential and a shared aiohttp session; an optional
+    semaphore bounds the number of ARM requests in flight.
+    """
+
+    def __init__(
+        self,
+        subscription_id: str,
+        resource_group: str,
+        credential,
+        session: aiohttp.ClientSession,
+        tenant_id: Optional[str] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ):
+        self.subscription_id = subscription_id
+        self.resource_group = resource_group
+        self.tenant_id = tenant_id
+        self.session = session
+        self.semaphore = semaphore or asyncio.Semaphore(8)
+
+        self.callback_urls: Dict[str, str] = {}
+
+        self.credential = credential
+        self.base_url = f"https://management.azure.com/subscriptions/{self.subscription_id}/resourceGroups/{self.resource_group}"
+
+    async def get_access_token(self) -> str:
+        return await get_arm_token_async(self.credential, self.tenant_id)
+
+    async def _request(self, method: str, url: str, **kwargs) -> Any:
+        headers = {"Authorization": f"Bearer {await self.get_access_token()}"}
+        async with self.semaphore:
+            return await arm_request_async(
+                self.session, method, url, headers=headers, **kwargs
+            )
+
+    async def iter_standard_logic_app_workflows(
+        self, logic_app_name: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the workflows page by page, following `nextLink`.
+        """
+        url = f"{self._workflows_url(logic_app_name)}?api-version=2018-11-01"
+        while url:
+            page = await self._request("GET", url)
+            # the runtime API returns a bare list; ARM style pages wrap it in "value"
+            if isinstance(page, list):
+                items, url = page, None
+            else:
+                items, url = page.get("value", []), page.get("nextLink")
+            for workflow in items:
+                yield workflow
+
+    async def list_standard_logic_app_workflows(
+        self, logic_app_name: str
+    ) -> list[Dict[str, Any]]:
+        return [
+            wf async for wf in self.iter_standard_logic_app_workflows(logic_app_name)
+        ]
+
+    async def get_workflow_trigger_definition(
+        self, logic_app_name: str, workflow_name: str, trigger_name: str
+    ) -> Dict[str, Any]:
+        url = f"{self._trigger_url(logic_app_name, workflow_name, trigger_name)}/schemas/json?api-version=2024-11-01"
+        return await self._request("GET", url)
+
+    async def get_workflow_callback_url(
+        self, logic_app_name: str, workflow_name: str, trigger_name: str
+    ) -> str:
+        url = f"{self._trigger_url(logic_app_name, workflow_name, trigger_name)}/listCallbackUrl?api-version=2024-11-01"
+        return (await self._request("POST", url)).get("value", "")
+
+
+class AsyncFoundryTool(FoundryTool):
+    """
+    Async variant of FoundryTool sharing the aiohttp session / semaphore of the discovery run.
+    """
+
+    def __init__(
+        self,
+        subscription_id: str,
+        resource_group: str,
+        foundry_name: str,
+        project_name: str,
+        credential,
+        session: aiohttp.ClientSession,
+        tenant_id: Optional[str] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ):
+        self.credential = credential
+        self.tenant_id = tenant_id
+        self.session = session
+        self.semaphore = semaphore or asyncio.Semaphore(8)
+        self.subscription_id = subscription_id
+        self.resource_group = resource_group
+        self.foundry_name = foundry_name
+        self.project_name = project_name
+
+    async def get_access_token(self) -> str:
+        return await get_arm_token_async(self.credential, self.tenant_id)
+
+    async def create_custom_connection(
+        self, connection_name: str, sig: str, owner: Optional[str] = None
+    ) -> str:
+        headers = {"Authorization": f"Bearer {await self.get_access_token()}"}
+        async with self.semaphore:
+            connection = await arm_request_async(
+                self.session,
+                "PUT",
+                self._connection_url(connection_name),
+                headers=headers,
+                json=self._connection_body(sig, owner),
+            )
+        return connection["id"]
+
+    async def list_connections(self) -> list[Dict[str, Any]]:
+        url = f"{self._connections_url()}?api-version=2025-04-01-preview"
+        connections: list[Dict[str, Any]] = []
+        while url:
+            headers = {"Authorization": f"Bearer {await self.get_access_token()}"}
+            async with self.semaphore:
+                page = await arm_request_async(
+                    self.session, "GET", url, headers=headers
+                )
+            connections.extend(page.get("value", []))
+            url = page.get("nextLink")
+        return connections
+
+    async def delete_connection(self, connection_name: str) -> None:
+        headers = {"Authorization": f"Bearer {await self.get_access_token()}"}
+        async with self.semaphore:
+            try:
+                await arm_request_async(
+                    self.session,
+                    "DELETE",
+                    self._connection_url(connection_name),
+                    headers=headers,
+                )
+            except aiohttp.ClientResponseError as e:
+                if e.status != 404:
+                    raise
+
+    async def reconcile_custom_connections(
+        self,
+        desired: Dict[str, Optional[str]],
+        keep: Iterable[str] = (),
+        stale_prefix: Optional[str] = None,
+        owner: Optional[str] = None,
+        max_workers: int = 8,
+        removed: Iterable[str] = (),
+        existing: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Dict[str, str]:
+        """
+        Async `FoundryTool.reconcile_custom_connections`, same rules.
+        """
+        if existing is None:
+            existing = {c["name"]: c for c in await self.list_connections()}
+        to_put, to_delete, connection_ids = self._plan_reconcile(
+            existing, desired, keep, stale_prefix, owner, removed
+        )
+        workers = asyncio.Semaphore(max_workers)
+
+        async def put(name: str) -> str:
+            async with workers:
+                return await self.create_custom_connection(name, desired[name], owner)
+
+        async def delete(name: str) -> None:
+            async with workers:
+                await self.delete_connection(name)
+
+        created = await asyncio.gather(*(put(name) for name in to_put))
+        connection_ids.update(zip(to_put, created))
+        await asyncio.gather(*(delete(name) for name in to_delete))
+
+        self._print_reconcile(desired, to_put, to_delete)
+        return connection_ids
 
+
+def find_http_trigger(workflow: Dict[str, Any]) -> Optional[str]:
+    """Get the name of the first HTTP trigger of a workflow, if any."""
+    triggers = workflow.get("triggers", {})
+    for trigger in triggers:
+        if triggers[trigger]["kind"] == "Http":
+            return trigger
+    return None
+
+
+def split_callback_url(callback_url: str) -> Tuple[str, Optional[str]]:
+    """Split a trigger callback URL into the base server URL and its `sig`."""
+    parsed_callback = urlparse(callback_url)
+    query_params = parse_qs(parsed_callback.query)
+    sig = query_params.get("sig", [None])[0]
+
+    base_callback_url = (
+        f"{parsed_callback.scheme}://{parsed_callback.netloc}{parsed_callback.path}"
+    )
+    # remove /invoke from path
+    if base_callback_url.endswith("/invoke"):
+        base_callback_url = base_callback_url[: -len("/invoke")]
+    return base_callback_url, sig
+
+
+def callback_server_root(base_callback_url: str, workflow_name: str) -> str:
+    """
+    Get the server root (`https://<site>/api`) of a workflow's base callback URL.
+    """
+    marker = f"/{workflow_name}/triggers/"
+    index = base_callback_url.find(marker)
+    if index < 0:
+        raise ValueError(
+            f"Unexpected callback URL for workflow '{workflow_name}': {base_callback_url}"
+        )
+    return base_callback_url[:index]
+
+
+def _discovery_scope(
+    logic_app_tool: AzureStandardLogicAppTool,
+    foundry_tool: FoundryTool,
+    logic_app_name: str,
+) -> str:
+    return discovery_scope(
+        logic_app_tool.subscription_id,
+        logic_app_tool.resource_group,
+        logic_app_name,
+        foundry_tool.subscription_id,
+        foundry_tool.resource_group,
+        foundry_tool.foundry_name,
+        foundry_tool.project_name,
+    )
+
+
+def create_workflow_openapi_tool(
+    workflow_name: str, openapi_spec: Dict[str, Any], connection_id: str
+) -> OpenApiTool:
+    """Create the OpenAPI tool for a workflow, authenticated via its connection."""
+    auth = OpenApiConnectionAuthDetails(
+        security_scheme=OpenApiConnectionSecurityScheme(
+            connection_id=connection_id,
+        ),
+    )
+    return OpenApiTool(
+        name=workflow_name.replace("-", "_").replace(" ", "_"),
+        spec=openapi_spec,
+        auth=auth,
+        description=f"{workflow_name} OpenAPI tool",
+        # allowed_tools=[],  # Optional: specify allowed tools
+    )
+
+
+@prioritized(BACKGROUND)
 def create_logic_app_tools(
     logic_app_subscription_id: str,
     logic_app_resource_group: str,
@@ -236,10 +848,29 @@ def create_logic_app_tools(
     foundry_resource_group: str,
     foundry_foundry_name: str,
     foundry_project_name: str,
+    credential=None,
+    use_cache: bool = True,
+    discovery_cache: Optional[DiscoveryCache] = None,
+    reconcile_connections: bool = False,
+    max_connection_workers: int = 8,
 ) -> list[OpenApiTool]:
+    # One credential for both tools, so ARM tokens come from the shared cache
+    credential = credential or DefaultAzureCredential()
+    # Workflows that didn't change since the last run are served from disk
+    cache = (discovery_cache or DiscoveryCache()) if use_cache else None
+
     # Create the tool
     logic_app_tool = AzureStandardLogicAppTool(
-        logic_app_subscription_id, logic_app_resource_group
+        logic_app_subscription_id, logic_app_resource_group, credential=credential
+    )
+
+    # there so SDK for connections - need to use REST API
+    foundry_tool = FoundryTool(
+        subscription_id=foundry_subscription_id,
+        resource_group=foundry_resource_group,
+        foundry_name=foundry_foundry_name,
+        project_name=foundry_project_name,
+        credential=credential,
     )
 
     # 1. List workflows
@@ -251,26 +882,39 @@ def create_logic_app_tools(
         print("No workflows found.")
         exit(1)
 
-    openapi_tools: list[OpenApiTool] = []
+    # discovered workflows in listing order; connections may be created after the loop
+    discovered: list[Dict[str, Any]] = []
+    scope = _discovery_scope(logic_app_tool, foundry_tool, logic_app_name)
+    connection_prefix = f"openapi-logicapp-{logic_app_name}-"
 
     for wf in workflows:
         workflow_name = wf["name"]
         triggers = wf["triggers"]
         trigger_names = list(triggers.keys())
         print(f"Workflow: {workflow_name}, Triggers: {trigger_names}")
-        trigger_name = None
 
         # find http trigger
-        for trigger in triggers:
-            if triggers[trigger]["kind"] == "Http":
-                trigger_name = trigger
-                break
+        trigger_name = find_http_trigger(wf)
         if not trigger_name:
             print("No HTTP trigger found in the workflow.")
             continue
 
         print(f"Trigger: {trigger_name}")
 
+        cached = cache.get(scope, wf) if cache else None
+        if cached:
+            print(f"Using cached discovery for workflow '{workflow_name}'")
+            discovered.append(
+                {
+                    "wf": wf,
+                    "connection_name": f"{connection_prefix}{workflow_name}",
+                    "openapi_spec": cached["openapi_spec"],
+                    "connection_id": cached["connection_id"],
+                    "cached": True,
+                }
+            )
+            continue
+
         # 3. Get trigger definition
         trigger_def = logic_app_tool.get_workflow_trigger_definition(
             logic_app_name, workflow_name, trigger_name
@@ -293,46 +937,358 @@ def create_logic_app_tools(
         # print(f"Found Callback URL for workflow '{workflow_name}'")
 
         # parse callback URL to get the base URL
-        parsed_callback = urlparse(callback_url)
-        query_params = parse_qs(parsed_callback.query)
-        sig = query_params.get("sig", [None])[0]
-
-        base_callback_url = (
-            f"{parsed_callback.scheme}://{parsed_callback.netloc}{parsed_callback.path}"
-        )
-        # remove /invoke from path
-        if base_callback_url.endswith("/invoke"):
-            base_callback_url = base_callback_url[: -len("/invoke")]
+        base_callback_url, sig = split_callback_url(callback_url)
 
         # update openapi spec server URL
         openapi_spec["servers"] = [{"url": base_callback_url}]
-        connection_name = f"openapi-logicapp-{logic_app_name}-{workflow_name}"
-
-        # there so SDK for connections - need to use REST API
-        foundry_tool = FoundryTool(
-            subscription_id=foundry_subscription_id,
-            resource_group=foundry_resource_group,
-            foundry_name=foundry_foundry_name,
-            project_name=foundry_project_name,
+        connection_name = f"{connection_prefix}{workflow_name}"
+
+        # in reconcile mode all connections are synced in one pass after the loop
+        connection_id = (
+            None
+            if reconcile_connections
+            else foundry_tool.create_custom_connection(
+                connection_name=connection_name, sig=sig, owner=logic_app_name
+            )
         )
-        connection_id = foundry_tool.create_custom_connection(
-            connection_name=connection_name, sig=sig
+        discovered.append(
+            {
+                "wf": wf,
+                "trigger_name": trigger_name,
+                "connection_name": connection_name,
+                "openapi_spec": openapi_spec,
+                "base_callback_url": base_callback_url,
+                "sig": sig,
+                "connection_id": connection_id,
+                "cached": False,
+            }
         )
 
-        auth = OpenApiConnectionAuthDetails(
-            security_scheme=OpenApiConnectionSecurityScheme(
-                connection_id=connection_id,
-            ),
+    # workflows discovered on an earlier run that are gone now
+    removed_workflows = (
+        cache.prune(scope, [wf["name"] for wf in workflows]) if cache else []
+    )
+
+    if reconcile_connections:
+        connection_ids = foundry_tool.reconcile_custom_connections(
+            desired={
+                d["connection_name"]: d["sig"] for d in discovered if not d["cached"]
+            },
+            keep=[d["connection_name"] for d in discovered if d["cached"]],
+            stale_prefix=connection_prefix,
+            owner=logic_app_name,
+            max_workers=max_connection_workers,
+            removed=[f"{connection_prefix}{name}" for name in removed_workflows],
         )
+        for d in discovered:
+            if d["connection_name"] not in connection_ids:
+                # cached entry whose connection was removed outside of this tool
+                print(
+                    f"Connection '{d['connection_name']}' is missing, it will be recreated on the next run."
+                )
+                if cache:
+                    cache.discard(scope, d["wf"]["name"])
+                continue
+            d["connection_id"] = connection_ids[d["connection_name"]]
+
+    openapi_tools: list[OpenApiTool] = []
+    for d in discovered:
+        if d["connection_id"] is None:
+            continue
+        if cache and not d["cached"]:
+            cache.put(
+                scope,
+                d["wf"],
+                d["trigger_name"],
+                d["openapi_spec"],
+                d["base_callback_url"],
+                d["connection_id"],
+            )
 
         # 6. Create OpenAPI tool and invoke
-        openapi_tool = OpenApiTool(
-            name=workflow_name.replace("-", "_").replace(" ", "_"),
-            spec=openapi_spec,
-            auth=auth,
-            description=f"{workflow_name} OpenAPI tool",
-            # allowed_tools=[],  # Optional: specify allowed tools
+        openapi_tool = create_workflow_openapi_tool(
+            d["wf"]["name"], d["openapi_spec"], d["connection_id"]
         )
         openapi_tools.append(openapi_tool)
 
+    if cache:
+        cache.save()
+
     return openapi_tools
+
+
+async def _discover_workflow_async(
+    logic_app_tool: AsyncAzureStandardLogicAppTool,
+    foundry_tool: AsyncFoundryTool,
+    logic_app_name: str,
+    wf: Dict[str, Any],
+    cache: Optional[DiscoveryCache] = None,
+    existing_connections: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Discover one workflow; returns its entry for `create_logic_app_tools_async`.
+
+    With `existing_connections` (reconcile mode) no connection is created here,
+    they are synced in one pass once every workflow is discovered.
+    """
+    workflow_name = wf["name"]
+    trigger_name = find_http_trigger(wf)
+    if not trigger_name:
+        print(f"Workflow: {workflow_name} has no HTTP trigger, skipping.")
+        return None
+
+    scope = _discovery_scope(logic_app_tool, foundry_tool, logic_app_name)
+    connection_name = f"openapi-logicapp-{logic_app_name}-{workflow_name}"
+    cached = cache.get(scope, wf) if cache else None
+    if (
+        cached
+        and existing_connections is not None
+        and connection_name not in existing_connections
+    ):
+        # cached entry whose connection was removed outside of this tool
+        print(f"Connection '{connection_name}' is missing, rediscovering.")
+        cache.discard(scope, workflow_name)
+        cached = None
+    if cached:
+        print(f"Workflow: {workflow_name}, Trigger: {trigger_name} (cached)")
+        connection_id = (
+            existing_connections[connection_name]["id"]
+            if existing_connections is not None
+            else cached["connection_id"]
+        )
+        return {
+            "wf": wf,
+            "connection_name": connection_name,
+            "openapi_spec": cached["openapi_spec"],
+            "connection_id": connection_id,
+            "cached": True,
+        }
+
+    # trigger schema and callback URL are independent - fetch both at once
+    trigger_def, callback_url = await asyncio.gather(
+        logic_app_tool.get_workflow_trigger_definition(
+            logic_app_name, workflow_name, trigger_name
+        ),
+        logic_app_tool.get_workflow_callback_url(
+            logic_app_name, workflow_name, trigger_name
+        ),
+    )
+
+    openapi_spec = logic_app_tool.generate_openapi_spec_from_trigger(
+        workflow_name, trigger_def
+    )
+    base_callback_url, sig = split_callback_url(callback_url)
+    openapi_spec["servers"] = [{"url": base_callback_url}]
+
+    # in reconcile mode all connections are synced in one pass after discovery
+    connection_id = (
+        None
+        if existing_connections is not None
+        else await foundry_tool.create_custom_connection(
+            connection_name=connection_name, sig=sig, owner=logic_app_name
+        )
+    )
+    print(f"Workflow: {workflow_name}, Trigger: {trigger_name}")
+    return {
+        "wf": wf,
+        "trigger_name": trigger_name,
+        "connection_name": connection_name,
+        "openapi_spec": openapi_spec,
+        "base_callback_url": base_callback_url,
+        "sig": sig,
+        "connection_id": connection_id,
+        "cached": False,
+    }
+
+
+@prioritized(BACKGROUND)
+async def create_logic_app_tools_async(
+    logic_app_subscription_id: str,
+    logic_app_resource_group: str,
+    logic_app_name: str,
+    foundry_subscription_id: str,
+    foundry_resource_group: str,
+    foundry_foundry_name: str,
+    foundry_project_name: str,
+    credential=None,
+    max_concurrency: int = 8,
+    use_cache: bool = True,
+    discovery_cache: Optional[DiscoveryCache] = None,
+    reconcile_connections: bool = False,
+) -> list[OpenApiTool]:
+    """
+    Async version of `create_logic_app_tools`.
+
+    Workflow pages are streamed (following `nextLink`) and each HTTP-triggered
+    workflow is discovered as soon as it is listed; at most `max_concurrency` ARM
+    requests are in flight at once. Tools are returned in listing order.
+
+    With `reconcile_connections`, existing project connections are listed once and
+    synced by `AsyncFoundryTool.reconcile_custom_connections`: unchanged connections
+    are not PUT again and connections of deleted workflows are removed.
+    """
+    cache = (discovery_cache or DiscoveryCache()) if use_cache else None
+    workflows: list[Dict[str, Any]] = []
+    owns_credential = credential is None
+    credential = credential or AsyncDefaultAzureCredential()
+    session = create_arm_session_async()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    logic_app_tool = AsyncAzureStandardLogicAppTool(
+        logic_app_subscription_id,
+        logic_app_resource_group,
+        credential=credential,
+        session=session,
+        semaphore=semaphore,
+    )
+    foundry_tool = AsyncFoundryTool(
+        subscription_id=foundry_subscription_id,
+        resource_group=foundry_resource_group,
+        foundry_name=foundry_foundry_name,
+        project_name=foundry_project_name,
+        credential=credential,
+        session=session,
+        semaphore=semaphore,
+    )
+    scope = _discovery_scope(logic_app_tool, foundry_tool, logic_app_name)
+    connection_prefix = f"openapi-logicapp-{logic_app_name}-"
+
+    try:
+        existing_connections = (
+            {c["name"]: c for c in await foundry_tool.list_connections()}
+            if reconcile_connections
+            else None
+        )
+        async with asyncio.TaskGroup() as tg:
+            tasks = []
+            async for wf in logic_app_tool.iter_standard_logic_app_workflows(
+                logic_app_name
+            ):
+                workflows.append(wf)
+                tasks.append(
+                    tg.create_task(
+                        _discover_workflow_async(
+                            logic_app_tool,
+                            foundry_tool,
+                            logic_app_name,
+                            wf,
+                            cache,
+                            existing_connections,
+                        )
+                    )
+                )
+
+        # discovered workflows in listing order
+        discovered = [d for d in (task.result() for task in tasks) if d is not None]
+
+        # workflows discovered on an earlier run that are gone now
+        removed_workflows = (
+            cache.prune(scope, [wf["name"] for wf in workflows]) if cache else []
+        )
+        if existing_connections is not None:
+            connection_ids = await foundry_tool.reconcile_custom_connections(
+                desired={
+                    d["connection_name"]: d["sig"]
+                    for d in discovered
+                    if not d["cached"]
+                },
+                keep=[d["connection_name"] for d in discovered if d["cached"]],
+                stale_prefix=connection_prefix,
+                owner=logic_app_name,
+                max_workers=max_concurrency,
+                removed=[f"{connection_prefix}{name}" for name in removed_workflows],
+                existing=existing_connections,
+            )
+            for d in discovered:
+                d["connection_id"] = connection_ids[d["connection_name"]]
+    finally:
+        await session.close()
+        if owns_credential:
+            await credential.close()
+
+    if not workflows:
+        print("No workflows found.")
+
+    openapi_tools: list[OpenApiTool] = []
+    for d in discovered:
+        if cache and not d["cached"]:
+            cache.put(
+                scope,
+                d["wf"],
+                d["trigger_name"],
+                d["openapi_spec"],
+                d["base_callback_url"],
+                d["connection_id"],
+            )
+        openapi_tools.append(
+            create_workflow_openapi_tool(
+                d["wf"]["name"], d["openapi_spec"], d["connection_id"]
+            )
+        )
+    if cache:
+        cache.save()
+    return openapi_tools
+
+
+@prioritized(BACKGROUND)
+def create_logic_app_consolidated_tool(
+    logic_app_subscription_id: str,
+    logic_app_resource_group: str,
+    logic_app_name: str,
+    audience: str,
+    credential=None,
+) -> Optional[OpenApiTool]:
+    """
+    Create one OpenAPI tool covering every HTTP-triggered workflow of a Logic App.
+
+    Instead of one tool + one connection per workflow, the agent gets a single tool
+    with one operation per workflow. Each workflow's SAS `sig` is different and a
+    connection can only hold one `sig` key, so this tool authenticates with the
+    agent's managed identity (`audience` is the App ID URI / client id configured
+    in the Logic App's Easy Auth) and no Foundry connections are created.
+    """
+    credential = credential or DefaultAzureCredential()
+    logic_app_tool = AzureStandardLogicAppTool(
+        logic_app_subscription_id, logic_app_resource_group, credential=credential
+    )
+
+    workflows: list[Dict[str, Any]] = []
+    server_url = None
+    for wf in logic_app_tool.list_standard_logic_app_workflows(logic_app_name):
+        trigger_name = find_http_trigger(wf)
+        if not trigger_name:
+            continue
+        workflow_name = wf["name"]
+        if server_url is None:
+            # every workflow is served from the same site root, one lookup is enough
+            callback_url = logic_app_tool.get_workflow_callback_url(
+                logic_app_name, workflow_name, trigger_name
+            )
+            base_callback_url, _ = split_callback_url(callback_url)
+            server_url = callback_server_root(base_callback_url, workflow_name)
+        workflows.append(
+            {
+                "workflow_name": workflow_name,
+                "trigger_name": trigger_name,
+                "trigger_def": logic_app_tool.get_workflow_trigger_definition(
+                    logic_app_name, workflow_name, trigger_name
+                ),
+            }
+        )
+
+    if not workflows:
+        print("No HTTP-triggered workflows found.")
+        return None
+
+    openapi_spec = logic_app_tool.generate_openapi_spec_for_logic_app(
+        logic_app_name, workflows, server_url
+    )
+    print(f"Logic App {logic_app_name}: {len(workflows)} workflows in one OpenAPI tool")
+    return OpenApiTool(
+        name=re.sub(r"[^A-Za-z0-9_]", "_", logic_app_name),
+        spec=openapi_spec,
+        auth=OpenApiManagedAuthDetails(
+            security_scheme=OpenApiManagedSecurityScheme(audience=audience)
+        ),
+        description=f"Workflows of the {logic_app_name} Logic App",
+    )
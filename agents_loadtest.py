@@ -0,0 +1,243 @@
+"""Load test our client-side agent stack against the local agents stand-in.
+
+Runs N concurrent conversations through `setup.create_agent` / `setup.test_agent`
+(pooled `AIProjectClient`, Semantic Kernel run polling, real `BooksTool` / `BooksSql`
+tool execution) against `agents_standin.StandinServer` and reports throughput and
+turn latency percentiles.
+
+    python agents_loadtest.py --conversations 50 --concurrency 10 --turns 3
+    python agents_loadtest.py --model-latency 0 --queue-latency 0   # client overhead only
+
+The stand-in runs on its own thread / event loop so its work isn't billed to the
+client. Pass `--endpoint` to use a stand-in started elsewhere instead.
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from agents_standin import (
+    LatencyProfile,
+    StandinCredential,
+    StandinServer,
+    standin_client_kwargs,
+)
+
+PROMPTS = [
+    "Find me books about Harry.",
+    "Which highly rated books have the most reviews?",
+    "What are Tolkien's best books, and what is book 1?",
+    "Thanks!",
+]
+
+INSTRUCTIONS = "You answer questions about the books dataset using the books tools."
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of `values`."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    if not latencies:
+        return {}
+    return {
+        "mean": statistics.fmean(latencies),
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies),
+    }
+
+
+async def run_load(
+    endpoint: str,
+    conversations: int = 20,
+    concurrency: int = 10,
+    turns: int = 2,
+    quiet: bool = True,
+    memoize: bool = False,
+) -> Dict[str, Any]:
+    """Drive `conversations` conversations of `turns` turns, `concurrency` at a time."""
+    # setup reads its settings on first use
+    os.environ.setdefault("AZURE_AI_FOUNDRY_CONNECTION_STRING", endpoint)
+    os.environ.setdefault("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME", "standin-model")
+    import setup
+    from books_sql import BooksSql
+    from books_tool import DEFAULT_CSV_PATH, BooksTool
+
+    if not os.path.exists(DEFAULT_CSV_PATH):
+        print(
+            f"warning: {DEFAULT_CSV_PATH} not found, tool calls will return errors",
+            file=sys.stderr,
+        )
+
+    pool = setup.ProjectClientPool(
+        endpoint=endpoint, credential=StandinCredential(), **standin_client_kwargs()
+    )
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    output = io.StringIO() if quiet else sys.stdout
+
+    async def conversation(index: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            thread = None
+            for turn in range(turns):
+                prompt = PROMPTS[(index + turn) % len(PROMPTS)]
+                started = time.perf_counter()
+                # test_agent reports failures by printing and returning None
+                thread = await setup.test_agent(
+                    client, agent, prompt, thread, display_files=False
+                )
+                if thread is None:
+                    errors += 1
+                    return
+                latencies.append(time.perf_counter() - started)
+            with contextlib.suppress(Exception):
+                await thread.delete()
+
+    with contextlib.redirect_stdout(output):
+        client = await pool.get_client()
+        agent = await setup.create_agent(
+            "loadtest-books",
+            INSTRUCTIONS,
+            client,
+            plugins=[BooksTool(), BooksSql()],
+            memoize=memoize,
+        )
+        started = time.perf_counter()
+        await asyncio.gather(*(conversation(i) for i in range(conversations)))
+        elapsed = time.perf_counter() - started
+        client_stats = pool.stats()
+        scheduler_stats = setup.get_scheduler_metrics()
+        tool_cache_stats = setup.get_tool_cache_stats() if memoize else None
+        await pool.close()
+
+    return {
+        "conversations": conversations,
+        "concurrency": concurrency,
+        "turns_per_conversation": turns,
+        "turns_completed": len(latencies),
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "turns_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_s": summarize(latencies),
+        "client_pool": client_stats,
+        "scheduler": scheduler_stats,
+        "tool_cache": tool_cache_stats,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"{report['turns_completed']} turns in {report['elapsed_s']:.2f}s "
+        f"({report['turns_per_s']:.2f} turns/s), "
+        f"{report['conversations']} conversations x {report['turns_per_conversation']} "
+        f"turns at concurrency {report['concurrency']}, {report['errors']} errors"
+    )
+    latency = report["latency_s"]
+    if latency:
+        print(
+            "turn latency: "
+            + ", ".join(f"{k} {v * 1000:.0f}ms" for k, v in latency.items())
+        )
+    for family, metrics in report["scheduler"].items():
+        wait = metrics["wait_ms"]
+        print(
+            f"scheduler [{family}]: {metrics['requests']} requests, "
+            f"{metrics['throttled']} throttled, concurrency limit "
+            f"{metrics['concurrency_limit']}"
+            + (
+                f", wait p50 {wait['p50']:.0f}ms p95 {wait['p95']:.0f}ms"
+                if wait
+                else ""
+            )
+        )
+    tool_cache = report.get("tool_cache")
+    if tool_cache:
+        print(
+            f"tool cache: {tool_cache['hits'] + tool_cache['store_hits']} hits, "
+            f"{tool_cache['misses']} misses ({tool_cache['hit_rate']:.0%})"
+        )
+    server = report.get("server")
+    if server:
+        print(
+            f"server: {server['requests']} requests, "
+            f"{server['runs_completed']} runs completed"
+        )
+        for route, count in server["requests_by_route"].items():
+            print(f"  {count:6d}  {route}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=2)
+    parser.add_argument("--queue-latency", type=float, default=0.05)
+    parser.add_argument("--model-latency", type=float, default=0.3)
+    parser.add_argument("--request-latency", type=float, default=0.0)
+    parser.add_argument(
+        "--endpoint", help="use an already running stand-in at this endpoint"
+    )
+    parser.add_argument("--memoize", action="store_true", help="memoize tool results")
+    parser.add_argument("--json", action="store_true", help="print the raw report")
+    parser.add_argument("--verbose", action="store_true", help="show agent output")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    server = None
+    endpoint = args.endpoint
+    if endpoint is None:
+        server = StandinServer(
+            latency=LatencyProfile(
+                request=args.request_latency,
+                queue=args.queue_latency,
+                model=args.model_latency,
+            )
+        )
+        endpoint = server.start_in_thread()
+
+    try:
+        report = asyncio.run(
+            run_load(
+                endpoint,
+                conversations=args.conversations,
+                concurrency=args.concurrency,
+                turns=args.turns,
+                quiet=not args.verbose,
+                memoize=args.memoize,
+            )
+        )
+    finally:
+        if server is not None:
+            server.stop_thread()
+    if server is not None:
+        report["server"] = server.stats()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,736 @@
+"""Local stand-in for the Azure AI Foundry agents REST surface.
+
+Implements enough of the assistants / threads / messages / runs / run steps /
+connections API for `AzureAIAgent.create_client` (and therefore `setup.create_agent`
+and `setup.test_agent`) to run against it, so the client-side stack can be measured
+without a live project:
+
+    server = StandinServer(latency=LatencyProfile(model=0.3))
+    endpoint = server.start_in_thread()          # http://127.0.0.1:<port>/api/projects/local
+    client = create_standin_client(endpoint)
+
+Runs are simulated: after a configurable queue / model latency a run either asks for
+scripted function tool calls (`requires_action`) - which the client executes with the
+real plugins, e.g. `BooksTool` / `BooksSql` - or completes with an assistant message.
+Only non-streaming runs are supported.
+"""
+
+from __future__ import annotations
+import asyncio
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+from azure.core.credentials import AccessToken
+from azure.core.pipeline.policies import SansIOHTTPPolicy
+
+DEFAULT_PROJECT = "local"
+
+
+@dataclass
+class LatencyProfile:
+    """Simulated service latencies, in seconds."""
+
+    request: float = 0.0  # added to every HTTP request
+    queue: float = 0.05  # run queued -> in_progress
+    model: float = 0.3  # each model "generation" (tool call round or final answer)
+    jitter: float = 0.1  # +/- fraction applied to every delay
+
+    def delay(self, seconds: float) -> float:
+        if seconds <= 0:
+            return 0.0
+        return max(0.0, seconds * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+
+@dataclass
+class ScriptedTurn:
+    """
+    Tool call rounds the simulated model makes before answering.
+
+    Each round is a list of (function name, arguments); the name is matched against the
+    end of the function tools sent with the run (e.g. `search_books` matches
+    `BooksTool-search_books`). Calls to functions the agent doesn't have are skipped.
+    """
+
+    rounds: List[List[tuple[str, Dict[str, Any]]]] = field(default_factory=list)
+    reply: str = "Here is what I found."
+
+
+DEFAULT_SCRIPT = [
+    ScriptedTurn(
+        rounds=[[("search_books", {"query": "harry", "limit": 5})]],
+        reply="These are the best rated books matching 'harry'.",
+    ),
+    ScriptedTurn(
+        rounds=[
+            [("books_schema", {})],
+            [
+                (
+                    "sql_books",
+                    {
+                        "sql": "SELECT * FROM books WHERE Rating >= 4 ORDER BY CountsOfReview DESC",
+                        "limit": 5,
+                    },
+                )
+            ],
+        ],
+        reply="These are the most reviewed books rated 4 or higher.",
+    ),
+    ScriptedTurn(
+        rounds=[
+            [
+                ("author_top", {"author_query": "tolkien", "limit": 3}),
+                ("get_book_by_id", {"book_id": 1}),
+            ]
+        ],
+        reply="Top rated Tolkien books, plus the book with Id 1.",
+    ),
+    ScriptedTurn(reply="Happy to help - ask me about books."),
+]
+
+
+class StandinCredential:
+    """Async credential handing out a fixed token (the stand-in doesn't check it)."""
+
+    async def get_token(self, *scopes, **kwargs) -> AccessToken:
+        return AccessToken("standin-token", int(time.time()) + 3600)
+
+    async def close(self) -> None:
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+
+class StandinAuthPolicy(SansIOHTTPPolicy):
+    """
+    Replaces the bearer token policy, which refuses to send tokens over plain http.
+    """
+
+    def on_request(self, request) -> None:
+        request.http_request.headers["Authorization"] = "Bearer standin-token"
+
+
+def standin_client_kwargs() -> Dict[str, Any]:
+    """Extra client kwargs needed to talk to the stand-in over http."""
+    return {"authentication_policy": StandinAuthPolicy()}
+
+
+def create_standin_client(endpoint: str, **kwargs):
+    """Create an AIProjectClient pointed at a stand-in endpoint."""
+    from semantic_kernel.agents import AzureAIAgent
+
+    return AzureAIAgent.create_client(
+        credential=StandinCredential(),
+        endpoint=endpoint,
+        **standin_client_kwargs(),
+        **kwargs,
+    )
+
+
+def _new_id(prefix: str) -> str:
+    return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+
+def _now() -> int:
+    return int(time.time())
+
+
+def _error(status: int, message: str, code: str = "invalid_request") -> web.Response:
+    return web.json_response(
+        {"error": {"code": code, "message": message}}, status=status
+    )
+
+
+def _text_content(content: Any) -> List[Dict[str, Any]]:
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content}]
+    else:
+        blocks = content or []
+    return [
+        {
+            "type": "text",
+            "text": {
+                "value": block.get("text") if isinstance(block, dict) else str(block),
+                "annotations": [],
+            },
+        }
+        for block in blocks
+        if not isinstance(block, dict) or block.get("type", "text") == "text"
+    ]
+
+
+def _paginate(request: web.Request, items: List[Dict[str, Any]]) -> web.Response:
+    limit = max(1, min(int(request.query.get("limit", "20")), 100))
+    if request.query.get("order", "desc") == "desc":
+        items = list(reversed(items))
+    after = request.query.get("after")
+    if after:
+        ids = [item["id"] for item in items]
+        items = items[ids.index(after) + 1 :] if after in ids else []
+    page = items[:limit]
+    has_more = len(items) > limit
+    return web.json_response(
+        {
+            "object": "list",
+            "data": page,
+            "first_id": page[0]["id"] if page else None,
+            # the SDK pages on last_id, so only hand it out while there is more
+            "last_id": page[-1]["id"] if page and has_more else None,
+            "has_more": has_more,
+        }
+    )
+
+
+class _Run:
+    def __init__(self, data: Dict[str, Any], turn: ScriptedTurn):
+        self.data = data
+        self.turn = turn
+        self.outputs_submitted = asyncio.Event()
+        self.tool_outputs: List[Dict[str, Any]] = []
+        self.task: Optional[asyncio.Task] = None
+
+
+class StandinServer:
+    """In-memory agents service with simulated latency and scripted tool calls."""
+
+    def __init__(
+        self,
+        latency: Optional[LatencyProfile] = None,
+        script: Optional[List[ScriptedTurn]] = None,
+        connections: Optional[List[Dict[str, Any]]] = None,
+        project: str = DEFAULT_PROJECT,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.latency = latency or LatencyProfile()
+        self.script = script if script is not None else DEFAULT_SCRIPT
+        self.project = project
+        self.host = host
+        self.port = port
+
+        self.agents: Dict[str, Dict[str, Any]] = {}
+        self.threads: Dict[str, Dict[str, Any]] = {}
+        self.messages: Dict[str, List[Dict[str, Any]]] = {}
+        self.runs: Dict[str, Dict[str, _Run]] = {}
+        self.steps: Dict[str, List[Dict[str, Any]]] = {}
+        self.connections = {c["name"]: c for c in connections or []}
+        self.request_counts: Counter = Counter()
+        self.runs_completed = 0
+
+        self._turns = itertools.cycle(self.script or [ScriptedTurn()])
+        self._runner: Optional[web.AppRunner] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://{self.host}:{self.port}/api/projects/{self.project}"
+
+    # region lifecycle
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        p = f"/api/projects/{self.project}"
+        app.add_routes(
+            [
+                web.get(f"{p}/assistants", self.list_agents),
+                web.post(f"{p}/assistants", self.create_agent),
+                web.get(f"{p}/assistants/{{agent_id}}", self.get_agent),
+                web.post(f"{p}/assistants/{{agent_id}}", self.update_agent),
+                web.delete(f"{p}/assistants/{{agent_id}}", self.delete_agent),
+                web.post(f"{p}/threads", self.create_thread),
+                web.get(f"{p}/threads/{{thread_id}}", self.get_thread),
+                web.delete(f"{p}/threads/{{thread_id}}", self.delete_thread),
+                web.get(f"{p}/threads/{{thread_id}}/messages", self.list_messages),
+                web.post(f"{p}/threads/{{thread_id}}/messages", self.create_message),
+                web.get(
+                    f"{p}/threads/{{thread_id}}/messages/{{message_id}}",
+                    self.get_message,
+                ),
+                web.get(f"{p}/threads/{{thread_id}}/runs", self.list_runs),
+                web.post(f"{p}/threads/{{thread_id}}/runs", self.create_run),
+                web.get(f"{p}/threads/{{thread_id}}/runs/{{run_id}}", self.get_run),
+                web.post(
+                    f"{p}/threads/{{thread_id}}/runs/{{run_id}}/submit_tool_outputs",
+                    self.submit_tool_outputs,
+                ),
+                web.post(
+                    f"{p}/threads/{{thread_id}}/runs/{{run_id}}/cancel",
+                    self.cancel_run,
+                ),
+                web.get(
+                    f"{p}/threads/{{thread_id}}/runs/{{run_id}}/steps", self.list_steps
+                ),
+                web.get(
+                    f"{p}/threads/{{thread_id}}/runs/{{run_id}}/steps/{{step_id}}",
+                    self.get_step,
+                ),
+                web.get(f"{p}/connections", self.list_connections),
+                web.get(f"{p}/connections/{{name}}", self.get_connection),
+                web.post(
+                    f"{p}/connections/{{name}}/getConnectionWithCredentials",
+                    self.get_connection,
+                ),
+            ]
+        )
+        return app
+
+    async def start(self) -> str:
+        """Start serving on the running loop; returns the project endpoint."""
+        self._runner = web.AppRunner(self.create_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._loop = asyncio.get_running_loop()
+        return self.endpoint
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def start_in_thread(self) -> str:
+        """
+        Serve from a background thread with its own event loop, so the server doesn't
+        compete with the client under test for the caller's loop.
+        """
+        started = threading.Event()
+        loop = asyncio.new_event_loop()
+
+        def run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="agents-standin", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.endpoint
+
+    def stop_thread(self) -> None:
+        if self._thread is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        route = request.match_info.route.resource
+        self.request_counts[
+            f"{request.method} {route.canonical if route else request.path}"
+        ] += 1
+        delay = self.latency.delay(self.latency.request)
+        if delay:
+            await asyncio.sleep(delay)
+        return await handler(request)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": sum(self.request_counts.values()),
+            "runs_completed": self.runs_completed,
+            "requests_by_route": {
+                route.split(f"/{self.project}", 1)[-1]: count
+                for route, count in self.request_counts.most_common()
+            },
+        }
+
+    # endregion
+
+    # region agents
+
+    async def list_agents(self, request: web.Request) -> web.Response:
+        return _paginate(request, list(self.agents.values()))
+
+    async def create_agent(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        agent = {
+            "id": _new_id("asst"),
+            "object": "assistant",
+            "created_at": _now(),
+            "name": body.get("name"),
+            "description": body.get("description"),
+            "model": body.get("model"),
+            "instructions": body.get("instructions"),
+            "tools": body.get("tools") or [],
+            "tool_resources": body.get("tool_resources") or {},
+            "temperature": body.get("temperature"),
+            "top_p": body.get("top_p"),
+            "response_format": body.get("response_format"),
+            "metadata": body.get("metadata") or {},
+        }
+        self.agents[agent["id"]] = agent
+        return web.json_response(agent)
+
+    async def get_agent(self, request: web.Request) -> web.Response:
+        agent = self.agents.get(request.match_info["agent_id"])
+        if agent is None:
+            return _error(404, "Agent not found", "not_found")
+        return web.json_response(agent)
+
+    async def update_agent(self, request: web.Request) -> web.Response:
+        agent = self.agents.get(request.match_info["agent_id"])
+        if agent is None:
+            return _error(404, "Agent not found", "not_found")
+        body = await request.json()
+        agent.update({k: v for k, v in body.items() if v is not None and k in agent})
+        return web.json_response(agent)
+
+    async def delete_agent(self, request: web.Request) -> web.Response:
+        agent_id = request.match_info["agent_id"]
+        deleted = self.agents.pop(agent_id, None) is not None
+        return web.json_response(
+            {"id": agent_id, "object": "assistant.deleted", "deleted": deleted}
+        )
+
+    # endregion
+
+    # region threads & messages
+
+    def _add_message(
+        self,
+        thread_id: str,
+        role: str,
+        content: Any,
+        run: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        message = {
+            "id": _new_id("msg"),
+            "object": "thread.message",
+            "created_at": _now(),
+            "thread_id": thread_id,
+            "status": "completed",
+            "incomplete_details": None,
+            "completed_at": _now(),
+            "incomplete_at": None,
+            "role": role,
+            "content": _text_content(content),
+            "assistant_id": run["assistant_id"] if run else None,
+            "run_id": run["id"] if run else None,
+            "attachments": [],
+            "metadata": {},
+        }
+        self.messages[thread_id].append(message)
+        return message
+
+    async def create_thread(self, request: web.Request) -> web.Response:
+        body = await request.json() if request.can_read_body else {}
+        thread = {
+            "id": _new_id("thread"),
+            "object": "thread",
+            "created_at": _now(),
+            "metadata": body.get("metadata") or {},
+            "tool_resources": body.get("tool_resources") or {},
+        }
+        self.threads[thread["id"]] = thread
+        self.messages[thread["id"]] = []
+        self.runs[thread["id"]] = {}
+        for message in body.get("messages") or []:
+            self._add_message(
+                thread["id"], message.get("role", "user"), message.get("content")
+            )
+        return web.json_response(thread)
+
+    async def get_thread(self, request: web.Request) -> web.Response:
+        thread = self.threads.get(request.match_info["thread_id"])
+        if thread is None:
+            return _error(404, "Thread not found", "not_found")
+        return web.json_response(thread)
+
+    async def delete_thread(self, request: web.Request) -> web.Response:
+        thread_id = request.match_info["thread_id"]
+        deleted = self.threads.pop(thread_id, None) is not None
+        self.messages.pop(thread_id, None)
+        for run in self.runs.pop(thread_id, {}).values():
+            if run.task:
+                run.task.cancel()
+        return web.json_response(
+            {"id": thread_id, "object": "thread.deleted", "deleted": deleted}
+        )
+
+    async def list_messages(self, request: web.Request) -> web.Response:
+        thread_id = request.match_info["thread_id"]
+        if thread_id not in self.threads:
+            return _error(404, "Thread not found", "not_found")
+        return _paginate(request, self.messages[thread_id])
+
+    async def create_message(self, request: web.Request) -> web.Response:
+        thread_id = request.match_info["thread_id"]
+        if thread_id not in self.threads:
+            return _error(404, "Thread not found", "not_found")
+        body = await request.json()
+        message = self._add_message(
+            thread_id, body.get("role", "user"), body.get("content")
+        )
+        return web.json_response(message)
+
+    async def get_message(self, request: web.Request) -> web.Response:
+        for message in self.messages.get(request.match_info["thread_id"], []):
+            if message["id"] == request.match_info["message_id"]:
+                return web.json_response(message)
+        return _error(404, "Message not found", "not_found")
+
+    # endregion
+
+    # region runs
+
+    def _get_run(self, request: web.Request) -> Optional[_Run]:
+        runs = self.runs.get(request.match_info["thread_id"], {})
+        return runs.get(request.match_info["run_id"])
+
+    async def list_runs(self, request: web.Request) -> web.Response:
+        runs = self.runs.get(request.match_info["thread_id"])
+        if runs is None:
+            return _error(404, "Thread not found", "not_found")
+        return _paginate(request, [run.data for run in runs.values()])
+
+    async def create_run(self, request: web.Request) -> web.Response:
+        thread_id = request.match_info["thread_id"]
+        if thread_id not in self.threads:
+            return _error(404, "Thread not found", "not_found")
+        body = await request.json()
+        if body.get("stream"):
+            return _error(400, "Streaming runs are not supported by the stand-in")
+        agent = self.agents.get(body.get("assistant_id"))
+        if agent is None:
+            return _error(404, "Agent not found", "not_found")
+        for message in body.get("additional_messages") or []:
+            self._add_message(
+                thread_id, message.get("role", "user"), message.get("content")
+            )
+
+        data = {
+            "id": _new_id("run"),
+            "object": "thread.run",
+            "thread_id": thread_id,
+            "assistant_id": agent["id"],
+            "status": "queued",
+            "required_action": None,
+            "last_error": None,
+            "model": body.get("model") or agent["model"],
+            "instructions": body.get("instructions") or agent["instructions"],
+            "tools": body.get("tools") or agent["tools"],
+            "created_at": _now(),
+            "expires_at": None,
+            "started_at": None,
+            "completed_at": None,
+            "cancelled_at": None,
+            "failed_at": None,
+            "incomplete_details": None,
+            "usage": None,
+            "temperature": body.get("temperature", agent["temperature"]),
+            "top_p": body.get("top_p", agent["top_p"]),
+            "max_prompt_tokens": body.get("max_prompt_tokens"),
+            "max_completion_tokens": body.get("max_completion_tokens"),
+            "truncation_strategy": body.get("truncation_strategy"),
+            "tool_choice": body.get("tool_choice"),
+            "response_format": body.get("response_format"),
+            "metadata": body.get("metadata") or {},
+            "tool_resources": agent["tool_resources"],
+            "parallel_tool_calls": body.get("parallel_tool_calls", True),
+        }
+        run = _Run(data, next(self._turns))
+        self.runs[thread_id][data["id"]] = run
+        self.steps[data["id"]] = []
+        run.task = asyncio.create_task(self._execute(run))
+        return web.json_response(data)
+
+    async def get_run(self, request: web.Request) -> web.Response:
+        run = self._get_run(request)
+        if run is None:
+            return _error(404, "Run not found", "not_found")
+        return web.json_response(run.data)
+
+    async def submit_tool_outputs(self, request: web.Request) -> web.Response:
+        run = self._get_run(request)
+        if run is None:
+            return _error(404, "Run not found", "not_found")
+        if run.data["status"] != "requires_action":
+            return _error(400, f"Run is {run.data['status']}, not requires_action")
+        body = await request.json()
+        run.tool_outputs = body.get("tool_outputs") or []
+        run.data["status"] = "queued"
+        run.data["required_action"] = None
+        run.outputs_submitted.set()
+        return web.json_response(run.data)
+
+    async def cancel_run(self, request: web.Request) -> web.Response:
+        run = self._get_run(request)
+        if run is None:
+            return _error(404, "Run not found", "not_found")
+        if run.task and not run.task.done():
+            run.task.cancel()
+        run.data.update(status="cancelled", cancelled_at=_now(), required_action=None)
+        return web.json_response(run.data)
+
+    async def list_steps(self, request: web.Request) -> web.Response:
+        steps = self.steps.get(request.match_info["run_id"])
+        if steps is None:
+            return _error(404, "Run not found", "not_found")
+        return _paginate(request, steps)
+
+    async def get_step(self, request: web.Request) -> web.Response:
+        for step in self.steps.get(request.match_info["run_id"], []):
+            if step["id"] == request.match_info["step_id"]:
+                return web.json_response(step)
+        return _error(404, "Run step not found", "not_found")
+
+    def _add_step(self, run: _Run, details: Dict[str, Any]) -> None:
+        data = run.data
+        self.steps[data["id"]].append(
+            {
+                "id": _new_id("step"),
+                "object": "thread.run.step",
+                "type": details["type"],
+                "assistant_id": data["assistant_id"],
+                "thread_id": data["thread_id"],
+                "run_id": data["id"],
+                "status": "completed",
+                "step_details": details,
+                "last_error": None,
+                "created_at": _now(),
+                "expired_at": None,
+                "completed_at": _now(),
+                "cancelled_at": None,
+                "failed_at": None,
+                "usage": {
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "total_tokens": 0,
+                },
+                "metadata": {},
+            }
+        )
+
+    def _resolve_calls(
+        self, run: _Run, calls: List[tuple[str, Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        functions = [
+            tool["function"]["name"]
+            for tool in run.data["tools"]
+            if tool.get("type") == "function"
+        ]
+        tool_calls = []
+        for name, arguments in calls:
+            match = next(
+                (f for f in functions if f == name or f.endswith(f"-{name}")), None
+            )
+            if match:
+                tool_calls.append(
+                    {
+                        "id": _new_id("call"),
+                        "type": "function",
+                        "function": {"name": match, "arguments": json.dumps(arguments)},
+                    }
+                )
+        return tool_calls
+
+    async def _execute(self, run: _Run) -> None:
+        data = run.data
+        latency = self.latency
+        await asyncio.sleep(latency.delay(latency.queue))
+        data.update(status="in_progress", started_at=_now())
+        prompt_chars = sum(
+            len(block["text"]["value"] or "")
+            for message in self.messages.get(data["thread_id"], [])
+            for block in message["content"]
+        )
+        completion_chars = 0
+
+        for calls in run.turn.rounds:
+            tool_calls = self._resolve_calls(run, calls)
+            if not tool_calls:
+                continue
+            await asyncio.sleep(latency.delay(latency.model))
+            run.outputs_submitted.clear()
+            data.update(
+                status="requires_action",
+                required_action={
+                    "type": "submit_tool_outputs",
+                    "submit_tool_outputs": {"tool_calls": tool_calls},
+                },
+            )
+            await run.outputs_submitted.wait()
+            outputs = {o.get("tool_call_id"): o.get("output") for o in run.tool_outputs}
+            prompt_chars += sum(len(str(o or "")) for o in outputs.values())
+            self._add_step(
+                run,
+                {
+                    "type": "tool_calls",
+                    "tool_calls": [
+                        {
+                            **call,
+                            "function": {
+                                **call["function"],
+                                "output": outputs.get(call["id"]),
+                            },
+                        }
+                        for call in tool_calls
+                    ],
+                },
+            )
+            data["status"] = "in_progress"
+
+        await asyncio.sleep(latency.delay(latency.model))
+        reply = run.turn.reply
+        completion_chars += len(reply)
+        message = self._add_message(data["thread_id"], "assistant", reply, data)
+        self._add_step(
+            run,
+            {
+                "type": "message_creation",
+                "message_creation": {"message_id": message["id"]},
+            },
+        )
+        prompt_tokens, completion_tokens = prompt_chars // 4, completion_chars // 4
+        data.update(
+            status="completed",
+            completed_at=_now(),
+            usage={
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        )
+        self.runs_completed += 1
+
+    # endregion
+
+    # region connections
+
+    async def list_connections(self, request: web.Request) -> web.Response:
+        return web.json_response({"value": list(self.connections.values())})
+
+    async def get_connection(self, request: web.Request) -> web.Response:
+        connection = self.connections.get(request.match_info["name"])
+        if connection is None:
+            return _error(404, "Connection not found", "not_found")
+        return web.json_response(connection)
+
+    # endregion
+
+
+__all__ = [
+    "DEFAULT_SCRIPT",
+    "LatencyProfile",
+    "ScriptedTurn",
+    "StandinAuthPolicy",
+    "StandinCredential",
+    "StandinServer",
+    "create_standin_client",
+    "standin_client_kwargs",
+]
@@ -0,0 +1,191 @@
+"""Pooled HTTP session with throttling-aware retries for ARM REST calls.
+
+All ARM traffic from the Logic App / Foundry helpers goes through one shared
+`requests.Session`, so HTTP/1.1 keep-alive connections to management.azure.com are
+reused instead of opening a new TCP+TLS connection per call.
+
+Throttled (429) and transient (5xx / connection) failures are retried with jittered
+exponential backoff; a `Retry-After` (or `x-ms-retry-after-ms`) header from ARM
+takes precedence over the computed delay. A server asking to wait longer than
+`max_retry_after` gets its response returned instead of blocking the caller.
+
+Every attempt is admitted by the shared `rate_limits` scheduler (ARM read / write
+token buckets, adaptive concurrency, priority lanes).
+
+`arm_request_async` applies the same retry policy to an `aiohttp.ClientSession`
+for the async discovery path.
+"""
+
+from __future__ import annotations
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Optional
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limits import classify_request, get_request_scheduler, parse_retry_after
+from settings import get_env
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def arm_pool_size() -> int:
+    """ARM_HTTP_POOL_SIZE, read on first use so the .env file applies."""
+    return int(get_env("ARM_HTTP_POOL_SIZE", "32"))
+
+
+def arm_timeout() -> float:
+    """ARM_HTTP_TIMEOUT (seconds), read on first use so the .env file applies."""
+    return float(get_env("ARM_HTTP_TIMEOUT", "60"))
+
+
+def create_arm_session(pool_size: Optional[int] = None) -> requests.Session:
+    """Create a session with a connection pool sized for concurrent ARM calls."""
+    pool_size = pool_size or arm_pool_size()
+    session = requests.Session()
+    # retries are handled by arm_request so Retry-After is honored
+    adapter = HTTPAdapter(
+        pool_connections=4, pool_maxsize=pool_size, max_retries=0, pool_block=False
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def get_arm_session() -> requests.Session:
+    """Get the process-wide ARM session."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_arm_session()
+    return _session
+
+
+def backoff_delay(attempt: int, base: float = 0.5, maximum: float = 30.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(maximum, base * (2**attempt)))
+
+
+def arm_request(
+    method: str,
+    url: str,
+    session: Optional[requests.Session] = None,
+    max_retries: int = 5,
+    backoff_base: float = 0.5,
+    backoff_max: float = 30.0,
+    max_retry_after: float = 60.0,
+    priority: Optional[int] = None,
+    **kwargs,
+) -> requests.Response:
+    """
+    Send a request over the pooled session, retrying throttled and transient failures.
+
+    The last response is returned as-is (callers still `raise_for_status()`), so a
+    request that keeps failing surfaces the same error it did before.
+    """
+    session = session or get_arm_session()
+    kwargs.setdefault("timeout", arm_timeout())
+    scheduler = get_request_scheduler()
+    family = classify_request(method, url)
+
+    attempt = 0
+    while True:
+        try:
+            with scheduler.slot(family, priority) as ticket:
+                resp = session.request(method, url, **kwargs)
+                ticket.observe(resp.status_code, resp.headers)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= max_retries:
+                raise
+            delay = backoff_delay(attempt, backoff_base, backoff_max)
+        else:
+            if resp.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                return resp
+            delay = parse_retry_after(resp.headers)
+            if delay is None:
+                delay = backoff_delay(attempt, backoff_base, backoff_max)
+            elif delay > max_retry_after:
+                return resp
+            # release the connection back to the pool before sleeping
+            resp.close()
+        time.sleep(delay)
+        attempt += 1
+
+
+def create_arm_session_async(
+    pool_size: Optional[int] = None,
+) -> aiohttp.ClientSession:
+    """Create an aiohttp session with a keep-alive pool for async ARM calls."""
+    connector = aiohttp.TCPConnector(
+        limit=pool_size or arm_pool_size(), keepalive_timeout=60
+    )
+    return aiohttp.ClientSession(
+        connector=connector, timeout=aiohttp.ClientTimeout(total=arm_timeout())
+    )
+
+
+async def arm_request_async(
+    session: aiohttp.ClientSession,
+    method: str,
+    url: str,
+    max_retries: int = 5,
+    backoff_base: float = 0.5,
+    backoff_max: float = 30.0,
+    max_retry_after: float = 60.0,
+    priority: Optional[int] = None,
+    **kwargs,
+) -> Any:
+    """
+    Async counterpart of `arm_request`; returns the parsed JSON body.
+
+    Raises `aiohttp.ClientResponseError` once retries are exhausted, like
+    `raise_for_status()` does on the sync path.
+    """
+    scheduler = get_request_scheduler()
+    family = classify_request(method, url)
+
+    attempt = 0
+    while True:
+        try:
+            async with scheduler.aslot(family, priority) as ticket:
+                async with session.request(method, url, **kwargs) as resp:
+                    ticket.observe(resp.status, resp.headers)
+                    delay = parse_retry_after(resp.headers)
+                    if (
+                        resp.status not in RETRY_STATUSES
+                        or attempt >= max_retries
+                        or (delay is not None and delay > max_retry_after)
+                    ):
+                        resp.raise_for_status()
+                        return await resp.json(content_type=None)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt >= max_retries:
+                raise
+            delay = None
+        if delay is None:
+            delay = backoff_delay(attempt, backoff_base, backoff_max)
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+__all__ = [
+    "RETRY_STATUSES",
+    "arm_pool_size",
+    "arm_request",
+    "arm_request_async",
+    "arm_timeout",
+    "create_arm_session_async",
+    "backoff_delay",
+    "create_arm_session",
+    "get_arm_session",
+    "parse_retry_after",
+]
@@ -0,0 +1,131 @@
+"""Benchmark the books query engines (`books_engine.ENGINES`) head-to-head.
+
+Every engine runs the same workload of plugin calls against the same CSV; the
+benchmark reports load time and per function latency (`next_page`: fetching the
+following page with a `next_cursor`), and fails (exit code 1) when an engine's JSON
+output differs from the first engine's.
+
+    python books_benchmark.py
+    python books_benchmark.py --csv docs/book1-100k.csv --engines pandas duckdb --repeat 50
+
+Engines whose dependencies aren't installed (e.g. pyarrow for `arrow`) are skipped.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import books_engine
+from books_engine import ENGINES, default_csv_path, get_engine
+
+WORKLOAD: List[Tuple[str, Dict[str, Any]]] = [
+    ("search_books", {"query": "harry", "limit": 5}),
+    ("search_books", {"query": "the", "limit": 20}),
+    ("search_books", {"query": "no such title", "limit": 5}),
+    # non-ASCII case folding must agree between engines ("ß" vs "SS", "İ")
+    ("search_books", {"query": "STRASSE", "limit": 5}),
+    ("search_books", {"query": "straße", "limit": 5}),
+    ("search_books", {"query": "İstanbul", "limit": 5}),
+    ("author_top", {"author_query": "tolkien", "limit": 5}),
+    ("author_top", {"author_query": "king", "limit": 20}),
+    ("author_top", {"author_query": "GARCÍA MÁRQUEZ", "limit": 5}),
+    ("get_book_by_id", {"book_id": 1}),
+    ("get_book_by_id", {"book_id": 1000}),
+    (
+        "sql_books",
+        {
+            "sql": "SELECT Authors, count(*) AS CountsOfReview FROM books "
+            "GROUP BY Authors ORDER BY 2 DESC, 1",
+            "limit": 10,
+        },
+    ),
+    (
+        "sql_books",
+        {"sql": "SELECT * FROM books WHERE Rating >= 4.5 ORDER BY Id", "limit": 20},
+    ),
+    ("books_schema", {}),
+]
+
+
+def run_engine(
+    name: str, csv_path: str, repeat: int
+) -> Tuple[float, Dict[str, List[float]], List[str]]:
+    """Load time (s), latencies (s) per function and the outputs of one workload run."""
+    started = time.perf_counter()
+    get_engine(name, csv_path)
+    load_s = time.perf_counter() - started
+
+    latencies: Dict[str, List[float]] = {}
+    outputs: List[str] = []
+    for iteration in range(repeat):
+        for function, kwargs in WORKLOAD:
+            started = time.perf_counter()
+            output = getattr(books_engine, function)(
+                csv_path=csv_path, engine=name, **kwargs
+            )
+            latencies.setdefault(function, []).append(time.perf_counter() - started)
+            if iteration == 0:
+                outputs.append(output)
+
+            # following pages are slices of the cursor's stored result
+            next_cursor = json.loads(output).get("next_cursor")
+            if next_cursor:
+                started = time.perf_counter()
+                getattr(books_engine, function)(
+                    csv_path=csv_path, engine=name, cursor=next_cursor, **kwargs
+                )
+                latencies.setdefault("next_page", []).append(
+                    time.perf_counter() - started
+                )
+    return load_s, latencies, outputs
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", default=None, help="default: BOOKS_CSV_PATH")
+    parser.add_argument("--engines", nargs="*", default=list(ENGINES))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+    csv_path = args.csv or default_csv_path()
+
+    functions = list(dict.fromkeys(function for function, _ in WORKLOAD))
+    functions.append("next_page")
+    print(
+        f"{'engine':8} {'load':>9}  "
+        + "  ".join(f"{f:>14}" for f in functions)
+        + "  (median per call)"
+    )
+    baseline: Optional[Tuple[str, List[str]]] = None
+    mismatches = 0
+    for name in args.engines:
+        try:
+            load_s, latencies, outputs = run_engine(name, csv_path, args.repeat)
+        except ImportError as e:
+            print(f"{name:8} skipped: {e}")
+            continue
+        print(
+            f"{name:8} {load_s * 1000:7.1f}ms  "
+            + "  ".join(
+                f"{statistics.median(latencies.get(f) or [0.0]) * 1000:12.2f}ms"
+                for f in functions
+            )
+        )
+        if baseline is None:
+            baseline = (name, outputs)
+            continue
+        for (function, kwargs), output, expected in zip(WORKLOAD, outputs, baseline[1]):
+            if output != expected:
+                mismatches += 1
+                print(
+                    f"  {name} differs from {baseline[0]} for {function}({kwargs}):\n"
+                    f"    {output[:200]}\n    {expected[:200]}"
+                )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,760 @@
+"""Query engines behind the books plugins (`books_tool`, `books_sql`, `helpers.books_tool`).
+
+The plugins only parse their arguments and format JSON; loading the CSV and running
+the searches is done by a `BooksEngine`, selected with the `BOOKS_ENGINE` env var:
+
+ - pandas (default): dataframe in memory, SQL through DuckDB over the dataframe
+ - duckdb: native DuckDB table, everything is SQL
+ - arrow: pyarrow table + Arrow compute kernels (`arrow` extra), SQL through DuckDB
+
+All engines return the same rows in the same order - matches are case-insensitive
+(both sides lowercased a character at a time, see `fold_case`), sorted by rating,
+then number of reviews (descending, missing values last), then CSV row order - and
+rows are serialized here, so every engine produces identical JSON.
+
+Results longer than a page come with a `next_cursor`; the ordered row ids (or, for
+SQL, the result rows) are kept in `cursor_store`, so later pages are slices instead
+of re-running the filter + sort. SQL results are only materialized once a cursor is
+used - a single page reads just one row more than it returns.
+"""
+
+from __future__ import annotations
+import json
+import math
+import os
+import threading
+import hashlib
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from settings import get_env
+
+DEFAULT_ENGINE = "pandas"
+MAX_LIMIT = 20
+# rows kept per cursor, i.e. at most CURSOR_MAX_ROWS / limit pages
+CURSOR_MAX_ROWS = 1000
+
+COLUMN_DESCRIPTIONS = {
+    "Id": "Unique numeric identifier",
+    "Name": "Book title",
+    "Authors": "Author name(s), possibly multiple separated by commas",
+    "Rating": "Average reader rating (float)",
+    "CountsOfReview": "Number of reviews",
+    "pagesNumber": "Number of pages",
+    "PublishYear": "Publication year",
+}
+SORT_COLUMNS = ("Rating", "CountsOfReview")
+
+
+def default_csv_path() -> str:
+    """BOOKS_CSV_PATH, read on first use so the .env file applies."""
+    return get_env("BOOKS_CSV_PATH", "docs/book1-100k.csv")
+
+
+def dataset_version(csv_path: Optional[str] = None) -> str:
+    """Identify the dataset contents (path, mtime, size) for result caching."""
+    path = csv_path or default_csv_path()
+    try:
+        st = os.stat(path)
+    except OSError:
+        return f"{path}:missing"
+    return f"{path}:{st.st_mtime_ns}:{st.st_size}"
+
+
+@lru_cache(maxsize=None)
+def _lowercase_table() -> Dict[int, str]:
+    # cased letters are all in the BMP / SMP; "İ".lower() is "i̇", DuckDB keeps "i"
+    table = {}
+    for code in range(0x20000):
+        lowered = chr(code).lower()
+        if lowered != chr(code):
+            table[code] = lowered[0]
+    return table
+
+
+def fold_case(text: str) -> str:
+    """
+    Lowercase `text` one character at a time, like DuckDB's / Arrow's `lower()`.
+
+    `str.lower()` / `str.upper()` apply multi-character and context rules ("ß" ->
+    "SS", final "Σ" -> "ς") the other engines don't.
+    """
+    return text.translate(_lowercase_table())
+
+
+def _check_path(csv_path: str) -> None:
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(
+            f"Books CSV not found at '{csv_path}'. Set BOOKS_CSV_PATH env var or pass path explicitly."  # noqa: E501
+        )
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+@dataclass
+class ColumnInfo:
+    name: str
+    # int / float / bool / str
+    kind: str
+    has_nulls: bool
+    # first non-null value of the first 50 rows
+    sample: Any = None
+
+
+class BooksEngine:
+    """Loads the books CSV and answers the plugins' queries as lists of row dicts."""
+
+    name = ""
+
+    def __init__(self, csv_path: str):
+        _check_path(csv_path)
+        self.csv_path = csv_path
+
+    def row_count(self) -> int:
+        raise NotImplementedError
+
+    def columns(self) -> List[ColumnInfo]:
+        raise NotImplementedError
+
+    def search_ids(self, column: str, query: str, limit: int) -> Sequence[int]:
+        """
+        Row ids of the rows whose `column` contains `query` (case-insensitive, see
+        `fold_case`), best rated first. Row ids are CSV row positions, the same for
+        every engine.
+        """
+        raise NotImplementedError
+
+    def rows(self, ids: Sequence[int]) -> List[Dict[str, Any]]:
+        """The rows with the given row ids, in that order."""
+        raise NotImplementedError
+
+    def search(self, column: str, query: str, limit: int) -> List[Dict[str, Any]]:
+        return self.rows(self.search_ids(column, query, limit))
+
+    def get_by_id(self, book_id: int) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def sql(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Run `query` against table `books`, at most `limit` rows."""
+        raise NotImplementedError
+
+    def _duckdb_sql(self, table: Any, query: str, limit: int) -> List[Dict[str, Any]]:
+        # a fresh connection per query, the user's SQL never sees other state
+        import duckdb
+
+        con = duckdb.connect(database=":memory:")
+        try:
+            con.register("books", table)
+            cursor = con.execute(f"SELECT * FROM ({query}) t LIMIT {limit}")
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+        finally:
+            con.close()
+
+
+class PandasEngine(BooksEngine):
+    name = "pandas"
+
+    def __init__(self, csv_path: str):
+        super().__init__(csv_path)
+        import pandas as pd
+
+        df = pd.read_csv(csv_path)
+        df.columns = [c.strip() for c in df.columns]
+        self.df = df
+        # column -> case folded values, computed on first search
+        self._folded: Dict[str, Any] = {}
+
+    def _records(self, df: Any) -> List[Dict[str, Any]]:
+        # NaN stays NaN, serialize_row treats it as missing
+        return df.to_dict("records")
+
+    def row_count(self) -> int:
+        return int(len(self.df))
+
+    def columns(self) -> List[ColumnInfo]:
+        from pandas.api import types
+
+        infos = []
+        for name in self.df.columns:
+            series = self.df[name]
+            if types.is_bool_dtype(series):
+                kind = "bool"
+            elif types.is_integer_dtype(series):
+                kind = "int"
+            elif types.is_float_dtype(series):
+                kind = "float"
+            else:
+                kind = "str"
+            head = series.head(50)
+            present = head[head.notna()]
+            sample = present.iloc[0] if len(present) else None
+            if hasattr(sample, "item"):
+                sample = sample.item()  # numpy scalar
+            infos.append(ColumnInfo(name, kind, bool(series.isna().any()), sample))
+        return infos
+
+    def search_ids(self, column: str, query: str, limit: int) -> Sequence[int]:
+        df = self.df
+        folded = self._folded.get(column)
+        if folded is None:
+            folded = self._folded[column] = df[column].str.translate(_lowercase_table())
+        mask = folded.str.contains(fold_case(query), na=False, regex=False)
+        result = df.loc[mask].sort_values(
+            by=list(SORT_COLUMNS),
+            ascending=[False] * len(SORT_COLUMNS),
+            na_position="last",
+            kind="stable",
+        )
+        # read_csv's RangeIndex: labels are row positions
+        return result.index.to_numpy()[:limit]
+
+    def rows(self, ids: Sequence[int]) -> List[Dict[str, Any]]:
+        return self._records(self.df.iloc[ids])
+
+    def get_by_id(self, book_id: int) -> Optional[Dict[str, Any]]:
+        rows = self._records(self.df.loc[self.df["Id"] == book_id].head(1))
+        return rows[0] if rows else None
+
+    def sql(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        return self._duckdb_sql(self.df, query, limit)
+
+
+class DuckDBEngine(BooksEngine):
+    name = "duckdb"
+
+    _KINDS = {
+        "TINYINT": "int",
+        "SMALLINT": "int",
+        "INTEGER": "int",
+        "BIGINT": "int",
+        "HUGEINT": "int",
+        "UTINYINT": "int",
+        "USMALLINT": "int",
+        "UINTEGER": "int",
+        "UBIGINT": "int",
+        "FLOAT": "float",
+        "DOUBLE": "float",
+        "BOOLEAN": "bool",
+    }
+
+    def __init__(self, csv_path: str):
+        super().__init__(csv_path)
+        import duckdb
+
+        self._con = duckdb.connect(database=":memory:")
+        escaped = csv_path.replace("'", "''")
+        # insertion order is kept, so rowid is the CSV row order
+        self._con.execute(
+            f"CREATE TABLE books AS SELECT * FROM read_csv_auto('{escaped}')"
+        )
+        for name, *_ in self._con.execute("DESCRIBE books").fetchall():
+            if name != name.strip():
+                self._con.execute(
+                    f"ALTER TABLE books RENAME COLUMN {_quote(name)} "
+                    f"TO {_quote(name.strip())}"
+                )
+        self._lock = threading.Lock()
+
+    def _query(self, sql: str, parameters: Optional[list] = None) -> Any:
+        # DuckDB connections aren't safe to share between threads, cursors are
+        with self._lock:
+            cursor = self._con.cursor()
+        try:
+            result = cursor.execute(sql, parameters or [])
+            names = [d[0] for d in result.description]
+            return [dict(zip(names, row)) for row in result.fetchall()]
+        finally:
+            cursor.close()
+
+    def row_count(self) -> int:
+        return self._query("SELECT count(*) AS n FROM books")[0]["n"]
+
+    def columns(self) -> List[ColumnInfo]:
+        infos = []
+        for column in self._query("DESCRIBE books"):
+            name = column["column_name"]
+            kind = self._KINDS.get(column["column_type"], "str")
+            if column["column_type"].startswith("DECIMAL"):
+                kind = "float"
+            stats = self._query(
+                f"SELECT count(*) - count({_quote(name)}) AS nulls, "
+                f"(SELECT {_quote(name)} FROM (SELECT {_quote(name)}, rowid FROM books "
+                f"ORDER BY rowid LIMIT 50) WHERE {_quote(name)} IS NOT NULL "
+                f"ORDER BY rowid LIMIT 1) AS sample FROM books"
+            )[0]
+            infos.append(ColumnInfo(name, kind, stats["nulls"] > 0, stats["sample"]))
+        return infos
+
+    def search_ids(self, column: str, query: str, limit: int) -> Sequence[int]:
+        order = ", ".join(f"{_quote(c)} DESC NULLS LAST" for c in SORT_COLUMNS)
+        rows = self._query(
+            f"SELECT rowid AS id FROM books "
+            f"WHERE contains(lower(CAST({_quote(column)} AS VARCHAR)), lower(?)) "
+            f"ORDER BY {order}, rowid LIMIT ?",
+            [query, limit],
+        )
+        return array("q", (row["id"] for row in rows))
+
+    def rows(self, ids: Sequence[int]) -> List[Dict[str, Any]]:
+        rows = self._query(
+            'SELECT rowid AS "__rowid", * FROM books WHERE list_contains(?, rowid)',
+            [list(ids)],
+        )
+        by_id = {row.pop("__rowid"): row for row in rows}
+        return [by_id[i] for i in ids]
+
+    def get_by_id(self, book_id: int) -> Optional[Dict[str, Any]]:
+        rows = self._query(
+            'SELECT * FROM books WHERE "Id" = ? ORDER BY rowid LIMIT 1', [book_id]
+        )
+        return rows[0] if rows else None
+
+    def sql(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        # wrapped as a subquery, so it can only read
+        return self._query(f"SELECT * FROM ({query}) t LIMIT {limit}")
+
+
+class ArrowEngine(BooksEngine):
+    name = "arrow"
+
+    def __init__(self, csv_path: str):
+        super().__init__(csv_path)
+        try:
+            import pyarrow.csv
+        except ImportError as e:
+            raise ImportError(
+                "BOOKS_ENGINE=arrow needs pyarrow (uv sync --extra arrow)"
+            ) from e
+
+        # empty text cells are missing values, like in pandas / DuckDB
+        table = pyarrow.csv.read_csv(
+            csv_path,
+            convert_options=pyarrow.csv.ConvertOptions(strings_can_be_null=True),
+        )
+        self.table = table.rename_columns([c.strip() for c in table.column_names])
+
+    def row_count(self) -> int:
+        return self.table.num_rows
+
+    def columns(self) -> List[ColumnInfo]:
+        import pyarrow as pa
+
+        infos = []
+        for name in self.table.column_names:
+            column = self.table[name]
+            if pa.types.is_boolean(column.type):
+                kind = "bool"
+            elif pa.types.is_integer(column.type):
+                kind = "int"
+            elif pa.types.is_floating(column.type) or pa.types.is_decimal(column.type):
+                kind = "float"
+            else:
+                kind = "str"
+            sample = next(
+                (v for v in column.slice(0, 50).to_pylist() if v is not None), None
+            )
+            infos.append(ColumnInfo(name, kind, column.null_count > 0, sample))
+        return infos
+
+    def search_ids(self, column: str, query: str, limit: int) -> Sequence[int]:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        values = self.table[column]
+        if not pa.types.is_string(values.type):
+            values = pc.cast(values, pa.string())
+        mask = pc.fill_null(
+            pc.match_substring(pc.utf8_lower(values), fold_case(query)), False
+        )
+        ids = pc.indices_nonzero(mask)
+        # stable, so ties keep the CSV row order; nulls are placed at the end
+        order = pc.sort_indices(
+            self.table.take(ids), sort_keys=[(c, "descending") for c in SORT_COLUMNS]
+        )
+        return ids.take(order[:limit]).to_numpy()
+
+    def rows(self, ids: Sequence[int]) -> List[Dict[str, Any]]:
+        import pyarrow as pa
+
+        return self.table.take(pa.array(ids, type=pa.int64())).to_pylist()
+
+    def get_by_id(self, book_id: int) -> Optional[Dict[str, Any]]:
+        import pyarrow.compute as pc
+
+        rows = self.table.filter(pc.equal(self.table["Id"], book_id)).slice(0, 1)
+        return rows.to_pylist()[0] if rows.num_rows else None
+
+    def sql(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        return self._duckdb_sql(self.table, query, limit)
+
+
+ENGINES: Dict[str, Type[BooksEngine]] = {
+    engine.name: engine for engine in (PandasEngine, DuckDBEngine, ArrowEngine)
+}
+
+_engines: Dict[Tuple[str, str], Tuple[str, BooksEngine]] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(
+    name: Optional[str] = None, csv_path: Optional[str] = None
+) -> BooksEngine:
+    """
+    Shared engine `name` (`BOOKS_ENGINE`, pandas by default) for `csv_path`.
+
+    Loaded on first use and reloaded when the CSV changes.
+    """
+    if not name:
+        name = get_env("BOOKS_ENGINE") or DEFAULT_ENGINE
+    name = name.lower()
+    if name not in ENGINES:
+        raise ValueError(
+            f"Unknown books engine '{name}', expected one of {', '.join(ENGINES)}"
+        )
+    path = csv_path or default_csv_path()
+    version = dataset_version(path)
+    with _engines_lock:
+        cached = _engines.get((name, path))
+        if cached is None or cached[0] != version:
+            cached = _engines[(name, path)] = (version, ENGINES[name](path))
+        return cached[1]
+
+
+# region cursors
+
+
+class CursorStore:
+    """
+    Ordered results of recent queries, for paging.
+
+    Bounded by entries and total rows (least recently used first) and expired after
+    `ttl` seconds without use.
+    """
+
+    def __init__(
+        self, max_entries: int = 256, max_rows: int = 200_000, ttl: float = 900.0
+    ):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Sequence[Any]]]" = OrderedDict()
+        self._rows = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Sequence[Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries[key] = (time.monotonic(), entry[1])
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, items: Sequence[Any]) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic(), items)
+            self._rows += len(items)
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._rows > self.max_rows
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, items = self._entries.pop(key)
+        self._rows -= len(items)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "rows": self._rows,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+cursor_store = CursorStore()
+
+
+def _cursor_key(*parts: Any) -> str:
+    # deterministic, so a cursor from a memoized result can be recomputed
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _page(
+    key: str,
+    cursor: Optional[str],
+    limit: int,
+    compute: Callable[[int], Sequence[Any]],
+    serialize: Callable[[Sequence[Any]], List[Dict[str, Any]]],
+    store_first: bool = True,
+) -> str:
+    """
+    One page of an ordered result, starting at `cursor` (a `next_cursor`).
+
+    `compute(count)` returns the first `count` items of the result. With
+    `store_first` the first call computes `CURSOR_MAX_ROWS` items and keeps them in
+    `cursor_store` while there are more pages; otherwise it computes one item more
+    than the page and the result is only stored once its cursor is used. A cursor of
+    an evicted result is recomputed from the same query.
+    """
+    offset = 0
+    if cursor:
+        cursor_key, _, position = cursor.partition(":")
+        if cursor_key != key or not position.isdigit():
+            return json.dumps(
+                {
+                    "error": "Invalid cursor: pass next_cursor together with the "
+                    "same query it was returned for"
+                }
+            )
+        offset = int(position)
+
+    store = store_first or cursor is not None
+    items = cursor_store.get(key) if cursor else None
+    if items is None:
+        items = compute(CURSOR_MAX_ROWS if store else limit + 1)
+    page = items[offset : offset + limit]
+    end = offset + len(page)
+    payload = serialize(page)
+    out: Dict[str, Any] = {"count": len(payload), "items": payload}
+    if end < len(items):
+        if store:
+            cursor_store.put(key, items)
+        out["next_cursor"] = f"{key}:{end}"
+    return json.dumps(out)
+
+
+def _search_page(
+    function: str,
+    column: str,
+    query: str,
+    limit: int,
+    csv_path: Optional[str],
+    cursor: Optional[str],
+    engine: Optional[str],
+) -> str:
+    books = get_engine(engine, csv_path)
+    key = _cursor_key(function, query, dataset_version(books.csv_path))
+    return _page(
+        key,
+        cursor,
+        limit,
+        # the sort dominates, keeping CURSOR_MAX_ROWS ids costs about the same
+        lambda count: array("q", books.search_ids(column, query, count)),
+        lambda ids: [serialize_row(row) for row in books.rows(list(ids))],
+    )
+
+
+# endregion
+
+# region JSON output shared by the plugins
+
+
+def _missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _int(value: Any) -> Optional[int]:
+    return None if _missing(value) else int(value)
+
+
+def _text(value: Any, length: int) -> Optional[str]:
+    return None if _missing(value) else str(value)[:length]
+
+
+def serialize_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Concise, stable JSON object for a book row."""
+    rating = row.get("Rating")
+    return {
+        "Id": _int(row.get("Id")),
+        "Name": _text(row.get("Name"), 200),
+        "Authors": _text(row.get("Authors"), 120),
+        "Rating": None if _missing(rating) else float(rating),
+        "Pages": _int(row.get("pagesNumber")),
+        "Year": _int(row.get("PublishYear")),
+        "Reviews": _int(row.get("CountsOfReview")),
+    }
+
+
+def _clamp(limit: int) -> int:
+    return max(1, min(int(limit), MAX_LIMIT))
+
+
+def search_books(
+    query: str,
+    limit: int = 5,
+    csv_path: Optional[str] = None,
+    cursor: Optional[str] = None,
+    engine: Optional[str] = None,
+) -> str:
+    limit = _clamp(limit)
+    # load first, a missing CSV is reported before an empty query
+    get_engine(engine, csv_path)
+    if not query:
+        return json.dumps({"error": "Empty query"})
+    return _search_page("search_books", "Name", query, limit, csv_path, cursor, engine)
+
+
+def get_book_by_id(
+    book_id: int, csv_path: Optional[str] = None, engine: Optional[str] = None
+) -> str:
+    books = get_engine(engine, csv_path)
+    try:
+        book_id = int(book_id)
+    except Exception:
+        return json.dumps({"error": "book_id must be an integer"})
+    row = books.get_by_id(book_id)
+    if row is None:
+        return json.dumps({"error": f"No book with Id {book_id}"})
+    return json.dumps(serialize_row(row))
+
+
+def author_top(
+    author_query: str,
+    limit: int = 5,
+    csv_path: Optional[str] = None,
+    cursor: Optional[str] = None,
+    engine: Optional[str] = None,
+) -> str:
+    limit = _clamp(limit)
+    if not author_query:
+        return json.dumps({"error": "Empty author_query"})
+    return _search_page(
+        "author_top", "Authors", author_query, limit, csv_path, cursor, engine
+    )
+
+
+def sql_books(
+    sql: str,
+    limit: int = 5,
+    csv_path: Optional[str] = None,
+    cursor: Optional[str] = None,
+    engine: Optional[str] = None,
+) -> str:
+    """
+    Execute a limited, read-only SQL query against the books CSV using DuckDB.
+
+    Simplified limit logic (consistent with other functions):
+    - Clamp limit parameter to 1..20
+    - Ignore any LIMIT inside user SQL; we wrap as subquery and enforce our own
+    - Allow SELECT or WITH queries; single statement only
+    - A page reads one row more than it returns; once its next_cursor is used, up to
+      CURSOR_MAX_ROWS rows are materialized and later pages are read from them
+    """
+    if not sql or not isinstance(sql, str):
+        return json.dumps({"error": "Empty sql"})
+
+    user_sql = sql.strip().rstrip(";")
+    # Disallow multiple statements rudimentarily
+    if user_sql.count(";") > 0:
+        return json.dumps({"error": "Multiple statements not allowed"})
+
+    limit = _clamp(limit)
+
+    lowered = user_sql.lower()
+    # Require starts with select or with (still basic guard)
+    if not (lowered.startswith("select") or lowered.startswith("with")):
+        return json.dumps({"error": "Query must start with SELECT or WITH"})
+
+    books = get_engine(engine, csv_path)
+    key = _cursor_key("sql_books", user_sql, dataset_version(books.csv_path))
+    try:
+        return _page(
+            key,
+            cursor,
+            limit,
+            lambda count: books.sql(user_sql, count),
+            lambda rows: [serialize_row(row) for row in rows],
+            store_first=False,
+        )
+    except Exception as e:
+        return json.dumps({"error": f"SQL error: {e}"})
+
+
+def _dtype(column: ColumnInfo) -> str:
+    # pandas dtype names, as reported before the engines existed
+    if column.kind == "int":
+        return "float64" if column.has_nulls else "int64"
+    if column.kind == "float":
+        return "float64"
+    if column.kind == "bool":
+        return "object" if column.has_nulls else "bool"
+    return "object"
+
+
+def _sample(column: ColumnInfo) -> Optional[str]:
+    if column.sample is None:
+        return None
+    sample = column.sample
+    if column.kind == "int" and column.has_nulls:
+        sample = float(sample)
+    return str(sample)[:60]
+
+
+def books_schema(csv_path: Optional[str] = None, engine: Optional[str] = None) -> str:
+    books = get_engine(engine, csv_path)
+    columns = {column.name: column for column in books.columns()}
+    out = {
+        "table": "books",
+        "row_count": books.row_count(),
+        "columns": [
+            {
+                "name": name,
+                "dtype": _dtype(columns[name]),
+                "description": description,
+                "sample": _sample(columns[name]),
+            }
+            for name, description in COLUMN_DESCRIPTIONS.items()
+            if name in columns
+        ],
+        "guidance": "Use table name 'books'. Limit result rows; heavy aggregations are fine. Primary key: Id.",
+    }
+    return json.dumps(out)
+
+
+# endregion
+
+
+__all__ = [
+    "ArrowEngine",
+    "BooksEngine",
+    "ColumnInfo",
+    "CursorStore",
+    "DuckDBEngine",
+    "ENGINES",
+    "PandasEngine",
+    "author_top",
+    "books_schema",
+    "cursor_store",
+    "dataset_version",
+    "default_csv_path",
+    "fold_case",
+    "get_book_by_id",
+    "get_engine",
+    "search_books",
+    "serialize_row",
+    "sql_books",
+]
@@ -9,20 +9,16 @@ Functions exposed:
  - author_top: list top rated books for an author
 
 Design goals:
- - Fast load: lazily load the dataframe on first use (singleton pattern)
+ - Fast load: lazily load the dataset on first use (singleton pattern), with the
+   engine chosen by BOOKS_ENGINE (pandas / duckdb / arrow, see books_engine.py)
  - Safe output: limit rows & truncate long text to keep LLM context small
  - Deterministic: sorting and stable field ordering
 """
 
 from __future__ import annotations
-import os
-from functools import lru_cache
-from typing import List, Optional
-import pandas as pd
-from semantic_kernel.functions import kernel_function
-import json
-
-DEFAULT_CSV_PATH = os.environ.get("BOOKS_CSV_PATH", "docs/book1-100k.csv")
+from typing import Optional
+import books_engine
+from kernel_functions import kernel_function, register_kernel_functions
 
 
 class BooksTool:
@@ -31,105 +27,60 @@ class BooksTool:
     Use register(kernel) to expose the decorated methods to Semantic Kernel.
     """
 
+    def __init__(self, engine: Optional[str] = None):
+        # Semantic Kernel is only imported once the plugin is actually used
+        register_kernel_functions(type(self))
+        # None: BOOKS_ENGINE
+        self.engine = engine
+
     @staticmethod
-    @lru_cache(maxsize=1)
-    def _load_df(csv_path: str = DEFAULT_CSV_PATH) -> pd.DataFrame:
-        if not os.path.exists(csv_path):
-            raise FileNotFoundError(
-                f"Books CSV not found at '{csv_path}'. Set BOOKS_CSV_PATH env var or pass path explicitly."  # noqa: E501
-            )
-        df = pd.read_csv(csv_path)
-        df.columns = [c.strip() for c in df.columns]
-        return df
-
-    def _serialize_rows(self, df: pd.DataFrame, limit: int = 5) -> List[dict]:
-        rows = []
-        for _, r in df.head(limit).iterrows():
-            rows.append(
-                {
-                    "Id": int(r.get("Id")) if not pd.isna(r.get("Id")) else None,
-                    "Name": str(r.get("Name"))[:200],
-                    "Authors": str(r.get("Authors"))[:120],
-                    "Rating": (
-                        float(r.get("Rating")) if not pd.isna(r.get("Rating")) else None
-                    ),
-                    "Pages": (
-                        int(r.get("pagesNumber"))
-                        if not pd.isna(r.get("pagesNumber"))
-                        else None
-                    ),
-                    "Year": (
-                        int(r.get("PublishYear"))
-                        if not pd.isna(r.get("PublishYear"))
-                        else None
-                    ),
-                    "Reviews": (
-                        int(r.get("CountsOfReview"))
-                        if not pd.isna(r.get("CountsOfReview"))
-                        else None
-                    ),
-                }
-            )
-        return rows
+    def dataset_version(csv_path: Optional[str] = None) -> str:
+        """Identify the dataset contents (path, mtime, size) for result caching."""
+        return books_engine.dataset_version(csv_path)
 
     @kernel_function(
         name="search_books",
-        description="Search books by a query string contained in title (case-insensitive) and return concise JSON rows.",
+        description="Search books by a query string contained in title (case-insensitive) and return concise JSON rows. Results with more rows include next_cursor; pass it as cursor (with the same query) to get the next page.",
     )
     def search_books(
-        self, query: str, limit: int = 5, csv_path: Optional[str] = None
+        self,
+        query: str,
+        limit: int = 5,
+        csv_path: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> str:
-
-        limit = max(1, min(int(limit), 20))
-        df = self._load_df(csv_path or DEFAULT_CSV_PATH)
-        if not query:
-            return json.dumps({"error": "Empty query"})
-        mask = df["Name"].str.contains(query, case=False, na=False)
-        result = df.loc[mask].copy()
-        result = result.sort_values(
-            by=["Rating", "CountsOfReview"], ascending=[False, False]
+        return books_engine.search_books(
+            query, limit, csv_path, cursor, engine=self.engine
         )
-        payload = self._serialize_rows(result, limit)
-        return json.dumps({"count": len(payload), "items": payload})
 
     @kernel_function(
         name="get_book_by_id",
         description="Lookup a single book record by numeric Id and return a concise JSON object.",
     )
     def get_book_by_id(self, book_id: int, csv_path: Optional[str] = None) -> str:
-
-        df = self._load_df(csv_path or DEFAULT_CSV_PATH)
-        try:
-            book_id = int(book_id)
-        except Exception:
-            return json.dumps({"error": "book_id must be an integer"})
-        row = df.loc[df["Id"] == book_id]
-        if row.empty:
-            return json.dumps({"error": f"No book with Id {book_id}"})
-        payload = self._serialize_rows(row, 1)[0]
-        return json.dumps(payload)
+        return books_engine.get_book_by_id(book_id, csv_path, engine=self.engine)
 
     @kernel_function(
         name="author_top",
-        description="List top rated books for an author name (substring match) ordered by rating then reviews.",
+        description="List top rated books for an author name (substring match) ordered by rating then reviews. Results with more rows include next_cursor; pass it as cursor (with the same query) to get the next page.",
     )
     def author_top(
-        self, author_query: str, limit: int = 5, csv_path: Optional[str] = None
+        self,
+        author_query: str,
+        limit: int = 5,
+        csv_path: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> str:
-
-        limit = max(1, min(int(limit), 20))
-        if not author_query:
-            return json.dumps({"error": "Empty author_query"})
-        df = self._load_df(csv_path or DEFAULT_CSV_PATH)
-        mask = df["Authors"].str.contains(author_query, case=False, na=False)
-        subset = df.loc[mask].copy()
-        if subset.empty:
-            return json.dumps({"count": 0, "items": []})
-        subset = subset.sort_values(
-            by=["Rating", "CountsOfReview"], ascending=[False, False]
+        return books_engine.author_top(
+            author_query, limit, csv_path, cursor, engine=self.engine
         )
-        payload = self._serialize_rows(subset, limit)
-        return json.dumps({"count": len(payload), "items": payload})
 
 
-__all__ = ["BooksTool"]
+def __getattr__(name: str):
+    # BOOKS_CSV_PATH is read on first use, see books_engine.default_csv_path
+    if name == "DEFAULT_CSV_PATH":
+        return books_engine.default_csv_path()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["BooksTool", "DEFAULT_CSV_PATH"]
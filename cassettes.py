@@ -0,0 +1,548 @@
+"""Record / replay HTTP cassettes for offline performance regression tests.
+
+A `Cassette` captures request/response pairs - with their observed timings - from
+the two HTTP stacks our startup paths use:
+
+ - ARM calls made through `requests` (`AzureStandardLogicAppTool` / `FoundryTool`,
+   via the shared `arm_session`), by mounting a recording/replaying adapter, and
+ - Foundry calls made through azure-core (`AIProjectClient` / agents), by wrapping
+   the transport (`ProjectClientPool(cassette=...)`).
+
+Secrets are scrubbed before anything is written: `Authorization` / key headers are
+dropped, `sig=` query parameters are redacted in URLs and in bodies, and JSON fields
+like `sig`, `key` or `access_token` are replaced. Requests are matched on method and
+scrubbed URL, in recorded order.
+
+Replay serves the recorded responses without touching the network, sleeping for
+the originally observed duration multiplied by `time_scale` (1.0 = real timings,
+0.1 = 10x compressed, 0 = as fast as possible), so both the round-trip count and the
+wall time of e.g. `create_logic_app_tools` can be asserted on:
+
+    cassette = Cassette("cassettes/logicapp_tools.json", mode="auto", time_scale=0.1)
+    with cassette.use():
+        tools = create_logic_app_tools(..., credential=cassette.credential(), use_cache=False)
+    print(cassette.stats())
+
+Replay needs credentials that don't go to Entra ID - `cassette.credential()` /
+`cassette.async_credential()` hand out a fake token when replaying.
+"""
+
+from __future__ import annotations
+import asyncio
+import base64
+import contextlib
+import datetime
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from azure.core.credentials import AccessToken
+from azure.core.exceptions import HttpResponseError
+from azure.core.pipeline.transport import AsyncHttpTransport
+from azure.core.rest import AsyncHttpResponse
+
+REDACTED = "REDACTED"
+
+# headers never written to a cassette
+SECRET_HEADERS = frozenset(
+    {
+        "authorization",
+        "cookie",
+        "set-cookie",
+        "api-key",
+        "x-functions-key",
+        "ocp-apim-subscription-key",
+    }
+)
+# JSON fields whose values are replaced
+SECRET_FIELDS = frozenset(
+    {
+        "sig",
+        "key",
+        "api_key",
+        "apikey",
+        "password",
+        "secret",
+        "client_secret",
+        "access_token",
+        "refresh_token",
+        "sas_token",
+    }
+)
+_SIG_PATTERN = re.compile(r"([?&](?:amp;)?sig=)[^&\"'\s]+", re.IGNORECASE)
+
+
+class CassetteError(Exception):
+    """Raised when a replayed request has no recorded response."""
+
+
+def scrub_text(text: str) -> str:
+    """Redact `sig=` values in URLs embedded anywhere in the text."""
+    return _SIG_PATTERN.sub(rf"\g<1>{REDACTED}", text)
+
+
+def scrub_json(value: Any) -> Any:
+    """Recursively redact secret fields and signed URLs in a JSON document."""
+    if isinstance(value, dict):
+        return {
+            k: (
+                REDACTED
+                if k.lower() in SECRET_FIELDS and isinstance(v, str)
+                else scrub_json(v)
+            )
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [scrub_json(v) for v in value]
+    if isinstance(value, str):
+        return scrub_text(value)
+    return value
+
+
+def scrub_headers(headers) -> Dict[str, str]:
+    return {
+        k: scrub_text(str(v))
+        for k, v in dict(headers or {}).items()
+        if k.lower() not in SECRET_HEADERS
+    }
+
+
+def _encode_body(body: Optional[bytes]) -> Tuple[Optional[str], str]:
+    if not body:
+        return None, "text"
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError:
+        return base64.b64encode(body).decode("ascii"), "base64"
+    try:
+        return json.dumps(scrub_json(json.loads(text))), "text"
+    except ValueError:
+        return scrub_text(text), "text"
+
+
+def _as_bytes(body: Any) -> Optional[bytes]:
+    if body is None or isinstance(body, bytes):
+        return body
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    return None  # streams / files aren't recorded
+
+
+def _decode_body(body: Optional[str], encoding: str) -> bytes:
+    if body is None:
+        return b""
+    if encoding == "base64":
+        return base64.b64decode(body)
+    return body.encode("utf-8")
+
+
+class ReplayCredential:
+    """Sync credential that never leaves the process (used while replaying)."""
+
+    def get_token(self, *scopes, **kwargs) -> AccessToken:
+        return AccessToken(REDACTED, int(time.time()) + 3600)
+
+
+class AsyncReplayCredential:
+    """Async counterpart of ReplayCredential."""
+
+    async def get_token(self, *scopes, **kwargs) -> AccessToken:
+        return AccessToken(REDACTED, int(time.time()) + 3600)
+
+    async def close(self) -> None:
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+
+class Cassette:
+    """
+    A file of recorded HTTP interactions.
+
+    mode: "record" (always hit the network and overwrite), "replay" (never hit the
+    network), or "auto" (replay if the file exists, record otherwise).
+    """
+
+    def __init__(self, path: str, mode: str = "auto", time_scale: float = 1.0):
+        if mode not in ("record", "replay", "auto"):
+            raise ValueError(f"Unknown cassette mode '{mode}'")
+        if mode == "auto":
+            mode = "replay" if os.path.exists(path) else "record"
+        self.path = path
+        self.mode = mode
+        self.time_scale = time_scale
+
+        self.interactions: List[Dict[str, Any]] = []
+        self.round_trips = 0
+        self.simulated_time = 0.0
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._queues: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._last: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        if self.replaying:
+            self._load()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _load(self) -> None:
+        with open(self.path, "r") as f:
+            self.interactions = json.load(f)["interactions"]
+        for interaction in self.interactions:
+            self._queues[self._key(interaction["method"], interaction["url"])].append(
+                interaction
+            )
+
+    def save(self) -> None:
+        """Write the recorded interactions (record mode only)."""
+        if self.replaying:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            interactions = sorted(self.interactions, key=lambda i: i["offset"])
+        with open(self.path, "w") as f:
+            json.dump({"version": 1, "interactions": interactions}, f, indent=1)
+
+    @staticmethod
+    def _key(method: str, url: str) -> Tuple[str, str]:
+        return method.upper(), scrub_text(url)
+
+    def credential(self, fallback=None):
+        """Sync credential to use: a fake one when replaying, `fallback` otherwise."""
+        if self.replaying:
+            return ReplayCredential()
+        if fallback is None:
+            from azure.identity import DefaultAzureCredential
+
+            fallback = DefaultAzureCredential()
+        return fallback
+
+    def async_credential(self, fallback=None):
+        """Async credential to use: a fake one when replaying, `fallback` otherwise."""
+        if self.replaying:
+            return AsyncReplayCredential()
+        if fallback is None:
+            from azure.identity.aio import DefaultAzureCredential
+
+            fallback = DefaultAzureCredential()
+        return fallback
+
+    # region record / replay
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        request_body: Optional[bytes],
+        status: int,
+        reason: Optional[str],
+        headers,
+        body: Optional[bytes],
+        started: float,
+        elapsed: float,
+    ) -> None:
+        request_text, _ = _encode_body(request_body)
+        response_text, encoding = _encode_body(body)
+        interaction = {
+            "method": method.upper(),
+            "url": scrub_text(url),
+            "request_body": request_text,
+            "status": status,
+            "reason": reason,
+            "headers": scrub_headers(headers),
+            "body": response_text,
+            "body_encoding": encoding,
+            "offset": started - self._started,
+            "elapsed": elapsed,
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+            self.round_trips += 1
+
+    def match(self, method: str, url: str) -> Dict[str, Any]:
+        """
+        Get the next recorded interaction for a request.
+
+        When a request is replayed more often than it was recorded (e.g. polling) the
+        last response is repeated.
+        """
+        key = self._key(method, url)
+        with self._lock:
+            self.round_trips += 1
+            queue = self._queues.get(key)
+            if queue:
+                interaction = self._last[key] = queue.popleft()
+            elif key in self._last:
+                interaction = self._last[key]
+            else:
+                raise CassetteError(
+                    f"No recorded response for {key[0]} {key[1]} in {self.path}"
+                )
+            delay = interaction["elapsed"] * self.time_scale
+            self.simulated_time += delay
+        return {**interaction, "delay": delay}
+
+    def unused(self) -> int:
+        """Number of recorded interactions that weren't replayed."""
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "round_trips": self.round_trips,
+            "recorded_interactions": len(self.interactions),
+            "unused_interactions": self.unused() if self.replaying else 0,
+            "wall_time": time.perf_counter() - self._started,
+            "simulated_time": self.simulated_time,
+        }
+
+    def reset_clock(self) -> None:
+        """Restart wall time / round trip accounting (e.g. after warm-up)."""
+        with self._lock:
+            self._started = time.perf_counter()
+            self.round_trips = 0
+            self.simulated_time = 0.0
+
+    # endregion
+
+    # region integration
+
+    def adapter(self, inner: Optional[HTTPAdapter] = None) -> "CassetteAdapter":
+        return CassetteAdapter(self, inner)
+
+    def wrap_transport(self, transport: AsyncHttpTransport) -> "CassetteTransport":
+        return CassetteTransport(self, transport)
+
+    @contextlib.contextmanager
+    def use(self, session: Optional[requests.Session] = None) -> Iterator["Cassette"]:
+        """
+        Route a requests session (the shared ARM session by default) through the
+        cassette for the duration of the block; saves the recording on exit.
+        """
+        if session is None:
+            from arm_session import get_arm_session
+
+            session = get_arm_session()
+        previous = {
+            prefix: session.get_adapter(prefix) for prefix in ("https://", "http://")
+        }
+        for prefix, inner in previous.items():
+            session.mount(prefix, self.adapter(inner))
+        try:
+            yield self
+        finally:
+            for prefix, inner in previous.items():
+                session.mount(prefix, inner)
+            self.save()
+
+    # endregion
+
+
+class CassetteAdapter(HTTPAdapter):
+    """requests transport adapter that records through, or replays from, a cassette."""
+
+    def __init__(self, cassette: Cassette, inner: Optional[HTTPAdapter] = None):
+        super().__init__()
+        self.cassette = cassette
+        self.inner = inner or HTTPAdapter()
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if self.cassette.replaying:
+            interaction = self.cassette.match(request.method, request.url)
+            if interaction["delay"]:
+                time.sleep(interaction["delay"])
+            return self._build_response(request, interaction)
+
+        started = time.perf_counter()
+        response = self.inner.send(request, **kwargs)
+        content = response.content
+        self.cassette.record(
+            request.method,
+            request.url,
+            _as_bytes(request.body),
+            response.status_code,
+            response.reason,
+            response.headers,
+            content,
+            started,
+            time.perf_counter() - started,
+        )
+        return response
+
+    @staticmethod
+    def _build_response(
+        request: requests.PreparedRequest, interaction: Dict[str, Any]
+    ) -> requests.Response:
+        response = requests.Response()
+        response.status_code = interaction["status"]
+        response.reason = interaction["reason"]
+        response.headers = CaseInsensitiveDict(interaction["headers"])
+        response._content = _decode_body(
+            interaction["body"], interaction["body_encoding"]
+        )
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.elapsed = datetime.timedelta(seconds=interaction["elapsed"])
+        return response
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class _ReplayedAsyncResponse(AsyncHttpResponse):
+    """A recorded response, already read, on azure-core's public response interface."""
+
+    def __init__(self, request, interaction: Dict[str, Any]):
+        self._request = request
+        self._status_code = interaction["status"]
+        self._reason = interaction["reason"] or ""
+        self._headers = CaseInsensitiveDict(interaction["headers"])
+        self._content = _decode_body(interaction["body"], interaction["body_encoding"])
+        self._encoding: Optional[str] = None
+        self._is_closed = False
+
+    @property
+    def request(self):
+        return self._request
+
+    @property
+    def url(self) -> str:
+        return self._request.url
+
+    @property
+    def status_code(self) -> int:
+        return self._status_code
+
+    @property
+    def reason(self) -> str:
+        return self._reason
+
+    @property
+    def headers(self) -> CaseInsensitiveDict:
+        return self._headers
+
+    @property
+    def content_type(self) -> Optional[str]:
+        return self._headers.get("Content-Type")
+
+    @property
+    def encoding(self) -> Optional[str]:
+        return self._encoding
+
+    @encoding.setter
+    def encoding(self, value: Optional[str]) -> None:
+        self._encoding = value
+
+    @property
+    def is_closed(self) -> bool:
+        return self._is_closed
+
+    @property
+    def is_stream_consumed(self) -> bool:
+        return True
+
+    @property
+    def content(self) -> bytes:
+        return self._content
+
+    def text(self, encoding: Optional[str] = None) -> str:
+        return self._content.decode(encoding or self._encoding or "utf-8-sig")
+
+    def json(self) -> Any:
+        return json.loads(self.text()) if self._content else None
+
+    def raise_for_status(self) -> None:
+        if self._status_code >= 400:
+            raise HttpResponseError(response=self)
+
+    async def read(self) -> bytes:
+        return self._content
+
+    async def iter_raw(self, **kwargs) -> AsyncIterator[bytes]:
+        yield self._content
+
+    async def iter_bytes(self, **kwargs) -> AsyncIterator[bytes]:
+        yield self._content
+
+    async def close(self) -> None:
+        self._is_closed = True
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+
+class CassetteTransport(AsyncHttpTransport):
+    """azure-core async transport that records through, or replays from, a cassette."""
+
+    def __init__(self, cassette: Cassette, inner: AsyncHttpTransport):
+        self.cassette = cassette
+        self.inner = inner
+
+    async def send(self, request, **kwargs):
+        if self.cassette.replaying:
+            interaction = self.cassette.match(request.method, request.url)
+            if interaction["delay"]:
+                await asyncio.sleep(interaction["delay"])
+            return _ReplayedAsyncResponse(request, interaction)
+
+        started = time.perf_counter()
+        response = await self.inner.send(request, **kwargs)
+        # buffer the body (also for streams) so it can be written to the cassette
+        content = await response.read()
+        self.cassette.record(
+            request.method,
+            request.url,
+            _as_bytes(getattr(request, "content", None)),
+            response.status_code,
+            response.reason,
+            response.headers,
+            content,
+            started,
+            time.perf_counter() - started,
+        )
+        return response
+
+    async def open(self) -> None:
+        if not self.cassette.replaying:
+            await self.inner.open()
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def sleep(self, duration: float) -> None:
+        await asyncio.sleep(duration)
+
+
+__all__ = [
+    "AsyncReplayCredential",
+    "Cassette",
+    "CassetteAdapter",
+    "CassetteError",
+    "CassetteTransport",
+    "ReplayCredential",
+    "scrub_json",
+    "scrub_text",
+]
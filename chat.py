@@ -0,0 +1,558 @@
+"""Chat completion helper for the inference notebooks, with a persistent response cache.
+
+The notebooks' `chat()` used to build a new `AzureAIInferenceChatCompletion` for
+every prompt and always call the model, even for a (model, system message,
+other_messages, input) combination it had answered before. `ChatClient` keeps one
+`ChatCompletionsClient` and one completion service per model, and answers repeated
+requests from a `ResponseCache`:
+
+    from chat import chat
+    await chat("Tell me a joke.", model="gpt-4.1")
+
+Cache keys are a sha256 of the model, the execution settings and the full chat
+history. Message text is whitespace-normalized for the key, so re-indented prompts
+hit too (`ResponseCache(normalize=False)` only accepts exact matches); the stats tell
+exact and normalized hits apart. Entries live in sqlite under `AGENTS_CACHE_DIR`
+and are evicted least recently used first when `max_entries` / `max_bytes` are
+exceeded.
+
+Non-deterministic requests bypass the cache, as does `use_cache=False`: tools /
+function calling, and sampling without a `seed` - `temperature > 0` or no temperature
+at all (the service then samples at its default of ~1, so the notebooks' default
+settings aren't cached). Pass `temperature=0` or a `seed` (or `use_cache=True`) to
+cache responses.
+
+Prompt suites run concurrently with `chat_batch` / `ChatClient.run_batch`: results
+come back in job order, each with its latency, token usage and error (a failing job
+doesn't fail the batch), and at most `max_concurrency_per_model` requests are in
+flight per model deployment:
+
+    results = await chat_batch(
+        [ChatJob(q, model=m) for q in questions for m in ("gpt-35-turbo", "gpt-4.1")]
+    )
+    print_batch_summary(results)
+"""
+
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from semantic_kernel.connectors.ai.azure_ai_inference import (
+    AzureAIInferenceChatCompletion,
+    AzureAIInferenceChatPromptExecutionSettings,
+)
+from semantic_kernel.contents import ChatHistory, ChatMessageContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+from settings import get_cache_dir, get_env
+
+DEFAULT_SYSTEM_MESSAGE = "You are a helpful assistant."
+DEFAULT_MODEL = "gpt-35-turbo"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def default_cache_path() -> str:
+    """`chat_responses.sqlite` under AGENTS_CACHE_DIR, read on first use."""
+    return os.path.join(get_cache_dir(), "chat_responses.sqlite")
+
+
+def _history_payload(history: ChatHistory, normalize: bool) -> List[Tuple[str, str]]:
+    payload = []
+    for message in history.messages:
+        content = message.content or ""
+        if normalize:
+            content = _WHITESPACE_RE.sub(" ", content).strip()
+        payload.append((str(message.role.value), content))
+    return payload
+
+
+def _settings_payload(settings: Any) -> Dict[str, Any]:
+    if settings is None:
+        return {}
+    return settings.model_dump(exclude_none=True, exclude={"service_id"})
+
+
+def cache_key(
+    model: str, settings: Any, history: ChatHistory, normalize: bool = True
+) -> str:
+    """Canonical hash of model + settings + full chat history."""
+    payload = json.dumps(
+        [model, _settings_payload(settings), _history_payload(history, normalize)],
+        sort_keys=True,
+        default=str,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(settings: Any) -> bool:
+    """False for settings whose responses are meant to vary between calls."""
+    if settings is None:
+        # the service's default temperature samples
+        return False
+    if getattr(settings, "function_choice_behavior", None) or getattr(
+        settings, "tools", None
+    ):
+        return False
+    if getattr(settings, "seed", None) is not None:
+        return True
+    temperature = getattr(settings, "temperature", None)
+    return temperature is not None and temperature <= 0
+
+
+class ResponseCache:
+    """sqlite backed LRU cache of chat responses, bounded by entries and bytes."""
+
+    def __init__(
+        self,
+        path: Optional[str] = "",
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        normalize: bool = True,
+    ):
+        # "" (default): `default_cache_path()`, None keeps the cache in memory for
+        # this process only
+        self.path = default_cache_path() if path == "" else path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.normalize = normalize
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.exact_hits = 0
+        self.normalized_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+
+    def _open(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.path:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(
+                self.path or ":memory:", timeout=5.0, check_same_thread=False
+            )
+            if self.path:
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, exact_key TEXT, model TEXT, value TEXT, "
+                "size INTEGER, created_at REAL, last_used REAL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_last_used "
+                "ON responses (last_used)"
+            )
+        return self._db
+
+    def keys(self, model: str, settings: Any, history: ChatHistory) -> Tuple[str, str]:
+        """(lookup key, exact key) for a request."""
+        exact_key = cache_key(model, settings, history, normalize=False)
+        if not self.normalize:
+            return exact_key, exact_key
+        return cache_key(model, settings, history, normalize=True), exact_key
+
+    def get(self, key: str, exact_key: str) -> Optional[str]:
+        with self._lock:
+            db = self._open()
+            row = db.execute(
+                "SELECT exact_key, value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            db.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            db.commit()
+            if row[0] == exact_key:
+                self.exact_hits += 1
+            else:
+                self.normalized_hits += 1
+            return row[1]
+
+    def put(self, key: str, exact_key: str, model: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            db = self._open()
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, exact_key, model, value, size, now, now),
+            )
+            self._evict(db)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        count, total = db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in db.execute(
+            "SELECT key, size FROM responses ORDER BY last_used"
+        ):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            count -= 1
+            total -= size
+        db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self.evictions += len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._open()
+            db.execute("DELETE FROM responses")
+            db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total = (
+                self._open()
+                .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses")
+                .fetchone()
+            )
+        hits = self.exact_hits + self.normalized_hits
+        lookups = hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "normalized_hits": self.normalized_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": count,
+            "bytes": total,
+            "evictions": self.evictions,
+        }
+
+
+@dataclass
+class ChatJob:
+    input: str
+    system_message: str = DEFAULT_SYSTEM_MESSAGE
+    model: str = DEFAULT_MODEL
+    other_messages: Sequence[str] = ()
+    settings: Any = None
+    use_cache: Optional[bool] = None
+
+
+@dataclass
+class ChatJobResult:
+    index: int
+    job: ChatJob
+    content: Optional[str] = None
+    error: Optional[BaseException] = None
+    latency: float = 0.0
+    queued: float = 0.0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class _ModelStats:
+    jobs: int = 0
+    failed: int = 0
+    cached: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latencies: List[float] = field(default_factory=list)
+
+
+def summarize_batch(results: Iterable[ChatJobResult]) -> Dict[str, Dict[str, Any]]:
+    """Per-model job / failure / cache / token counts and latency percentiles."""
+    by_model: Dict[str, _ModelStats] = {}
+    for result in results:
+        stats = by_model.setdefault(result.job.model, _ModelStats())
+        stats.jobs += 1
+        stats.failed += 0 if result.ok else 1
+        stats.cached += 1 if result.cached else 0
+        stats.prompt_tokens += result.prompt_tokens or 0
+        stats.completion_tokens += result.completion_tokens or 0
+        if result.ok:
+            stats.latencies.append(result.latency)
+
+    summary = {}
+    for model, stats in by_model.items():
+        latencies = sorted(stats.latencies)
+        summary[model] = {
+            "jobs": stats.jobs,
+            "failed": stats.failed,
+            "cached": stats.cached,
+            "prompt_tokens": stats.prompt_tokens,
+            "completion_tokens": stats.completion_tokens,
+            "latency_p50": latencies[len(latencies) // 2] if latencies else None,
+            "latency_max": latencies[-1] if latencies else None,
+        }
+    return summary
+
+
+def print_batch_summary(results: List[ChatJobResult]) -> None:
+    for result in results:
+        if not result.ok:
+            print(
+                f"#{result.index} [{result.job.model}] failed: "
+                f"{type(result.error).__name__}: {result.error}"
+            )
+    for model, stats in summarize_batch(results).items():
+        latency = (
+            f", p50 {stats['latency_p50']:.2f}s max {stats['latency_max']:.2f}s"
+            if stats["latency_p50"] is not None
+            else ""
+        )
+        print(
+            f"[{model}] {stats['jobs']} jobs, {stats['failed']} failed, "
+            f"{stats['cached']} cached, {stats['prompt_tokens']} prompt / "
+            f"{stats['completion_tokens']} completion tokens{latency}"
+        )
+
+
+class ChatClient:
+    """One `ChatCompletionsClient` and one completion service per model, plus caching."""
+
+    def __init__(
+        self,
+        endpoint: Optional[str] = None,
+        credential: Any = None,
+        cache: Optional[ResponseCache] = None,
+        settings: Any = None,
+    ):
+        if endpoint is None:
+            foundry_name = get_env("AZURE_AI_FOUNDRY_NAME")
+            endpoint = f"https://{foundry_name}.services.ai.azure.com/models"
+        self.endpoint = endpoint
+        self._credential = credential
+        self.cache = cache
+        self.settings = settings or AzureAIInferenceChatPromptExecutionSettings()
+        self._client = None
+        self._services: Dict[str, AzureAIInferenceChatCompletion] = {}
+        self.calls = 0
+
+    @property
+    def client(self):
+        if self._client is None:
+            from azure.ai.inference.aio import ChatCompletionsClient
+
+            credential = self._credential
+            if credential is None:
+                from setup import get_credentials
+
+                credential = get_credentials()
+            self._client = ChatCompletionsClient(
+                endpoint=self.endpoint,
+                credential=credential,
+                credential_scopes=["https://cognitiveservices.azure.com/.default"],
+            )
+        return self._client
+
+    def service(self, model: str) -> AzureAIInferenceChatCompletion:
+        """The completion service for `model`, created once."""
+        service = self._services.get(model)
+        if service is None:
+            service = AzureAIInferenceChatCompletion(
+                ai_model_id=model, client=self.client
+            )
+            self._services[model] = service
+        return service
+
+    @staticmethod
+    def build_history(
+        input: str,
+        system_message: str = DEFAULT_SYSTEM_MESSAGE,
+        other_messages: Iterable[str] = (),
+    ) -> ChatHistory:
+        chat_history = ChatHistory(system_message=system_message)
+        for message in other_messages:
+            chat_history.add_system_message(message)
+        chat_history.add_user_message(input)
+        return chat_history
+
+    async def complete(
+        self,
+        chat_history: ChatHistory,
+        model: str = DEFAULT_MODEL,
+        settings: Any = None,
+        use_cache: Optional[bool] = None,
+    ) -> Optional[ChatMessageContent]:
+        """Get the response for a chat history, from the cache when possible."""
+        settings = settings or self.settings
+        cacheable = self.cache is not None and use_cache is not False
+        if cacheable and not is_cacheable(settings) and use_cache is not True:
+            self.cache.bypassed += 1
+            cacheable = False
+
+        if cacheable:
+            key, exact_key = self.cache.keys(model, settings, chat_history)
+            cached = self.cache.get(key, exact_key)
+            if cached is not None:
+                return ChatMessageContent(
+                    role=AuthorRole.ASSISTANT,
+                    content=cached,
+                    ai_model_id=model,
+                    metadata={"cached": True},
+                )
+
+        self.calls += 1
+        response = await self.service(model).get_chat_message_content(
+            chat_history=chat_history,
+            settings=settings,
+        )
+        if cacheable and response is not None and response.content:
+            self.cache.put(key, exact_key, model, response.content)
+        return response
+
+    async def chat(
+        self,
+        input: str,
+        system_message: str = DEFAULT_SYSTEM_MESSAGE,
+        model: str = DEFAULT_MODEL,
+        other_messages: Iterable[str] = (),
+        settings: Any = None,
+        use_cache: Optional[bool] = None,
+    ) -> Optional[str]:
+        """The notebooks' `chat()`: returns `"LLM:> <response>"`."""
+        print(f"User:> {input}")
+        response = await self.complete(
+            self.build_history(input, system_message, other_messages),
+            model=model,
+            settings=settings,
+            use_cache=use_cache,
+        )
+        if response:
+            return f"LLM:> {response}"
+        return None
+
+    async def run_batch(
+        self,
+        jobs: Iterable[ChatJob],
+        max_concurrency_per_model: int = 4,
+    ) -> List[ChatJobResult]:
+        """
+        Run `jobs` concurrently over the shared client, results in job order.
+
+        Failures are recorded on the job's result instead of cancelling the batch.
+        """
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+        results = [ChatJobResult(index=i, job=job) for i, job in enumerate(jobs)]
+
+        async def run(result: ChatJobResult) -> None:
+            job = result.job
+            semaphore = semaphores.setdefault(
+                job.model, asyncio.Semaphore(max_concurrency_per_model)
+            )
+            submitted = time.perf_counter()
+            async with semaphore:
+                started = time.perf_counter()
+                result.queued = started - submitted
+                try:
+                    response = await self.complete(
+                        self.build_history(
+                            job.input, job.system_message, job.other_messages
+                        ),
+                        model=job.model,
+                        settings=job.settings,
+                        use_cache=job.use_cache,
+                    )
+                except Exception as e:
+                    result.error = e
+                    return
+                finally:
+                    result.latency = time.perf_counter() - started
+
+            if response is None:
+                return
+            result.content = response.content
+            metadata = response.metadata or {}
+            result.cached = bool(metadata.get("cached"))
+            usage = metadata.get("usage")
+            if usage is not None:
+                result.prompt_tokens = usage.prompt_tokens
+                result.completion_tokens = usage.completion_tokens
+
+        await asyncio.gather(*(run(result) for result in results))
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model_calls": self.calls,
+            "services": sorted(self._services),
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._services.clear()
+
+
+_chat_client: Optional[ChatClient] = None
+
+
+def get_chat_client() -> ChatClient:
+    """The shared `ChatClient` (with the persistent response cache)."""
+    global _chat_client
+    if _chat_client is None:
+        _chat_client = ChatClient(cache=ResponseCache())
+    return _chat_client
+
+
+async def chat(
+    input: str,
+    system_message: str = DEFAULT_SYSTEM_MESSAGE,
+    model: str = DEFAULT_MODEL,
+    other_messages: Iterable[str] = (),
+    settings: Any = None,
+    use_cache: Optional[bool] = None,
+) -> Optional[str]:
+    return await get_chat_client().chat(
+        input,
+        system_message=system_message,
+        model=model,
+        other_messages=other_messages,
+        settings=settings,
+        use_cache=use_cache,
+    )
+
+
+async def chat_batch(
+    jobs: Iterable[ChatJob], max_concurrency_per_model: int = 4
+) -> List[ChatJobResult]:
+    return await get_chat_client().run_batch(
+        jobs, max_concurrency_per_model=max_concurrency_per_model
+    )
+
+
+__all__ = [
+    "ChatClient",
+    "ChatJob",
+    "ChatJobResult",
+    "ResponseCache",
+    "cache_key",
+    "chat",
+    "chat_batch",
+    "default_cache_path",
+    "get_chat_client",
+    "is_cacheable",
+    "print_batch_summary",
+    "summarize_batch",
+]
@@ -0,0 +1,176 @@
+"""On-disk cache of Logic App workflow discovery results.
+
+`create_logic_app_tools` needs three ARM round trips per HTTP-triggered workflow
+(trigger schema, callback URL, Foundry connection PUT), yet workflows rarely change.
+This cache stores, per logic app + workflow, the generated OpenAPI spec, the base
+callback URL and the Foundry connection id together with the workflow version
+(`changedTime`, or a hash of the listing entry when ARM doesn't return one).
+Entries are keyed by a `scope` (see `discovery_scope`) naming both the logic app and
+the Foundry project, so a connection id is never served for another project and a
+same-named logic app in another resource group is discovered on its own.
+
+On the next run only the workflow listing is fetched; workflows whose version still
+matches are served from the cache and only changed / new workflows are rediscovered.
+
+Secrets are never written: the `sig` lives only in the Foundry connection.
+"""
+
+from __future__ import annotations
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from settings import get_cache_dir
+
+# listing fields that change without the workflow itself changing
+_VOLATILE_FIELDS = ("health", "state")
+# version 1 entries were keyed by logic app name only
+_FORMAT_VERSION = 2
+
+
+def default_cache_path() -> str:
+    """`logicapp_discovery.json` under AGENTS_CACHE_DIR, read on first use."""
+    return os.path.join(get_cache_dir(), "logicapp_discovery.json")
+
+
+def workflow_version(workflow: Dict[str, Any]) -> str:
+    """Get a version marker for a workflow listing entry."""
+    for field in ("changedTime", "etag"):
+        if workflow.get(field):
+            return str(workflow[field])
+    stable = {k: v for k, v in workflow.items() if k not in _VOLATILE_FIELDS}
+    digest = hashlib.sha256(json.dumps(stable, sort_keys=True).encode("utf-8"))
+    return f"sha256:{digest.hexdigest()}"
+
+
+def discovery_scope(
+    logic_app_subscription_id: str,
+    logic_app_resource_group: str,
+    logic_app_name: str,
+    foundry_subscription_id: str,
+    foundry_resource_group: str,
+    foundry_name: str,
+    foundry_project_name: str,
+) -> str:
+    """Cache scope of a logic app whose connections live in a Foundry project."""
+    # ARM resource names are case-insensitive
+    return (
+        f"{logic_app_subscription_id}/{logic_app_resource_group}/{logic_app_name}"
+        f"@{foundry_subscription_id}/{foundry_resource_group}/{foundry_name}"
+        f"/{foundry_project_name}"
+    ).lower()
+
+
+class DiscoveryCache:
+    """JSON file backed cache of per-workflow discovery results."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_cache_path()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+        self._dirty = False
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if data.get("version") != _FORMAT_VERSION:
+            return {}
+        return data.get("entries", {})
+
+    @staticmethod
+    def _key(scope: str, workflow_name: str) -> str:
+        return f"{scope}/{workflow_name}"
+
+    def get(self, scope: str, workflow: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached discovery entry if it matches the workflow's current version.
+        """
+        with self._lock:
+            entry = self._entries.get(self._key(scope, workflow["name"]))
+            if entry is None or entry.get("version") != workflow_version(workflow):
+                self.misses += 1
+                return None
+            self.hits += 1
+            # callers mutate the spec (servers etc.), hand out a copy
+            return copy.deepcopy(entry)
+
+    def put(
+        self,
+        scope: str,
+        workflow: Dict[str, Any],
+        trigger_name: str,
+        openapi_spec: Dict[str, Any],
+        base_callback_url: str,
+        connection_id: str,
+    ) -> None:
+        """Store the discovery result for a workflow."""
+        with self._lock:
+            self._entries[self._key(scope, workflow["name"])] = {
+                "version": workflow_version(workflow),
+                "trigger_name": trigger_name,
+                "openapi_spec": copy.deepcopy(openapi_spec),
+                "base_callback_url": base_callback_url,
+                "connection_id": connection_id,
+                "cached_at": time.time(),
+            }
+            self._dirty = True
+
+    def discard(self, scope: str, workflow_name: str) -> None:
+        """Forget a single workflow so it is rediscovered on the next run."""
+        with self._lock:
+            if self._entries.pop(self._key(scope, workflow_name), None):
+                self._dirty = True
+
+    def prune(self, scope: str, workflow_names: Iterable[str]) -> list[str]:
+        """Drop entries for workflows of the logic app that no longer exist."""
+        live = {self._key(scope, name) for name in workflow_names}
+        prefix = f"{scope}/"
+        with self._lock:
+            stale = [k for k in self._entries if k.startswith(prefix) and k not in live]
+            for key in stale:
+                del self._entries[key]
+            self._dirty = self._dirty or bool(stale)
+        return [key[len(prefix) :] for key in stale]
+
+    def invalidate(self, scope: Optional[str] = None) -> None:
+        """Forget everything (or everything for one logic app scope)."""
+        with self._lock:
+            if scope is None:
+                self._entries = {}
+            else:
+                prefix = f"{scope}/"
+                self._entries = {
+                    k: v for k, v in self._entries.items() if not k.startswith(prefix)
+                }
+            self._dirty = True
+
+    def save(self) -> None:
+        """Persist the cache (atomically) if anything changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"version": _FORMAT_VERSION, "entries": self._entries}, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+
+__all__ = [
+    "DiscoveryCache",
+    "default_cache_path",
+    "discovery_scope",
+    "workflow_version",
+]
@@ -0,0 +1,175 @@
+"""Background, deduplicated downloads of files produced by agents.
+
+When an agent returns file references (e.g. code interpreter charts) the content is
+fetched in the background while the rest of the response is still being processed,
+at most `max_concurrency` downloads at a time.
+
+Downloads are stored content-addressed (`objects/<sha256><ext>`) with an index of
+file id -> sha256, so asking for the same file id again - e.g. when re-running a
+notebook cell - is served from disk without touching the service, and identical
+content produced under different file ids is stored once.
+"""
+
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, Optional
+
+from settings import get_cache_dir
+
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"GIF8", ".gif"),
+    (b"%PDF", ".pdf"),
+)
+
+
+def default_download_dir() -> str:
+    """`files` under AGENTS_CACHE_DIR, read on first use."""
+    return os.path.join(get_cache_dir(), "files")
+
+
+def _sniff_extension(head: bytes) -> str:
+    for signature, extension in _SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    return ".bin"
+
+
+class FileDownloadManager:
+    """Downloads agent files concurrently into a content-addressed local cache."""
+
+    def __init__(
+        self,
+        client: Any,
+        cache_dir: Optional[str] = None,
+        max_concurrency: int = 4,
+    ):
+        cache_dir = cache_dir or default_download_dir()
+        self.client = client
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.hits = 0
+        self.downloads = 0
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._index: Dict[str, Dict[str, Any]] = self._load_index()
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def cached_path(self, file_id: str) -> Optional[str]:
+        """Get the local path of an already downloaded file id, if any."""
+        entry = self._index.get(file_id)
+        if not entry:
+            return None
+        path = os.path.join(self.objects_dir, entry["object"])
+        return path if os.path.exists(path) else None
+
+    def submit(self, file_id: str) -> asyncio.Task:
+        """
+        Start downloading a file in the background (no-op if already cached / in flight).
+
+        The returned task resolves to the local path of the file.
+        """
+        task = self._tasks.get(file_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(file_id))
+            self._tasks[file_id] = task
+        return task
+
+    async def get(self, file_id: str) -> str:
+        """Download (or get from cache) a file and return its local path."""
+        return await self.submit(file_id)
+
+    async def drain(self, file_ids: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Wait for submitted downloads (all, or only `file_ids`); returns file id -> local path.
+
+        Failed downloads are reported and left out of the result.
+        """
+        if file_ids is None:
+            tasks = dict(self._tasks)
+        else:
+            tasks = {file_id: self.submit(file_id) for file_id in file_ids}
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        self._tasks = {
+            file_id: task
+            for file_id, task in self._tasks.items()
+            if file_id not in tasks
+        }
+        paths: Dict[str, str] = {}
+        for file_id, result in zip(tasks, results):
+            if isinstance(result, BaseException):
+                print(f"Failed to download file {file_id}: {result}")
+            else:
+                paths[file_id] = result
+        return paths
+
+    async def _fetch(self, file_id: str) -> str:
+        path = self.cached_path(file_id)
+        if path:
+            self.hits += 1
+            return path
+
+        async with self._semaphore:
+            stream = await self.client.agents.files.get_content(file_id)
+            chunks = [chunk async for chunk in stream]
+        content = b"".join(chunks)
+        if not content:
+            raise RuntimeError(f"No content retrievable for file ID '{file_id}'.")
+
+        digest = hashlib.sha256(content).hexdigest()
+        object_name = f"{digest}{_sniff_extension(content[:16])}"
+        path = os.path.join(self.objects_dir, object_name)
+        if not os.path.exists(path):
+            await asyncio.to_thread(self._write_object, path, content)
+
+        self.downloads += 1
+        self._index[file_id] = {
+            "sha256": digest,
+            "size": len(content),
+            "object": object_name,
+        }
+        self._save_index()
+        return path
+
+    def _write_object(self, path: str, content: bytes) -> None:
+        os.makedirs(self.objects_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+
+def display_file(path: str) -> None:
+    """Show a downloaded image inline when running under IPython."""
+    try:
+        from IPython.display import Image, display
+    except ImportError:
+        return
+    if path.endswith((".png", ".jpg", ".gif")):
+        display(Image(path))
+
+
+__all__ = [
+    "FileDownloadManager",
+    "default_download_dir",
+    "display_file",
+]
@@ -0,0 +1,153 @@
+"""Guard the cold-start import time of `setup` and the tool modules.
+
+Every notebook starts with `from setup import ...` and the tool imports, so their
+import time is paid on every kernel (re)start. Each module is imported in a fresh
+interpreter with `python -X importtime`; the benchmark fails (exit code 1) when a
+module takes longer than its budget or eagerly imports one of its forbidden
+(heavy) dependencies - those must be imported on first use instead.
+
+    python import_benchmark.py                  # check all modules
+    python import_benchmark.py setup --top 10   # profile one module
+    python import_benchmark.py --scale 2        # slower machine / CI runner
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+HEAVY = ("semantic_kernel", "azure.ai.projects", "azure.identity", "aiohttp", "mcp")
+# the books engines load their dataframe library on first query
+DATA = ("pandas", "duckdb", "pyarrow")
+
+# module -> (cumulative import time budget in ms, modules it must not import)
+BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    "setup": (300, HEAVY + DATA + ("jsonref", "cassettes")),
+    "settings": (50, HEAVY + DATA + ("setup",)),
+    "books_engine": (100, HEAVY + DATA),
+    "books_tool": (100, HEAVY + DATA),
+    "books_sql": (100, HEAVY + DATA),
+    "helpers.books_tool": (100, HEAVY + DATA),
+    "kernel_functions": (50, HEAVY),
+    "retrieval": (100, HEAVY),
+}
+
+
+@dataclass
+class ImportProfile:
+    module: str
+    cumulative_ms: float
+    # (self ms, cumulative ms, name) of every module in the module's import tree
+    imports: List[Tuple[float, float, str]] = field(default_factory=list)
+    # the same for the modules the module imports directly
+    direct: List[Tuple[float, float, str]] = field(default_factory=list)
+
+    def imported(self, name: str) -> bool:
+        return any(
+            imported == name or imported.startswith(name + ".")
+            for _, _, imported in self.imports
+        )
+
+    def top(self, count: int) -> List[Tuple[float, float, str]]:
+        """The direct imports with the largest cumulative time."""
+        return sorted(self.direct, key=lambda i: i[1], reverse=True)[:count]
+
+
+def profile_import(module: str, cwd: Optional[str] = None) -> ImportProfile:
+    """Import `module` in a fresh interpreter with `-X importtime`."""
+    cwd = cwd or os.path.dirname(os.path.abspath(__file__))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        env=dict(os.environ, PYTHONPATH=cwd),
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+    # "import time: self [us] | cumulative | imported package", children are listed
+    # before their parent and indented by two spaces per level
+    subtree: List[Tuple[float, float, str, int]] = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        entry = (int(self_us) / 1000, int(cumulative_us) / 1000, name.strip(), depth)
+        if depth > 0:
+            subtree.append(entry)
+        elif entry[2] == module:
+            return ImportProfile(
+                module,
+                entry[1],
+                imports=[e[:3] for e in subtree],
+                direct=[e[:3] for e in subtree if e[3] == 1],
+            )
+        else:
+            subtree = []  # an unrelated top level import (e.g. site)
+    # already imported at interpreter startup
+    return ImportProfile(module, 0.0)
+
+
+def best_of(module: str, repeat: int) -> ImportProfile:
+    """Fastest of `repeat` imports; the first one may be compiling .pyc files."""
+    return min(
+        (profile_import(module) for _ in range(max(1, repeat))),
+        key=lambda p: p.cumulative_ms,
+    )
+
+
+def check(modules: List[str], repeat: int = 3, scale: float = 1.0, top: int = 5) -> int:
+    failures = 0
+    for module in modules:
+        budget, forbidden = BUDGETS.get(module, (float("inf"), ()))
+        try:
+            profile = best_of(module, repeat)
+        except RuntimeError as e:
+            failures += 1
+            print(f"FAIL  {module:20} {str(e).strip().splitlines()[-1]}")
+            continue
+        problems = []
+        if profile.cumulative_ms > budget * scale:
+            problems.append(f"over budget ({budget * scale:.0f}ms)")
+        eager = [name for name in forbidden if profile.imported(name)]
+        if eager:
+            problems.append(f"imports {', '.join(eager)} eagerly")
+        failures += bool(problems)
+
+        print(
+            f"{'FAIL' if problems else 'ok':4}  {module:20} "
+            f"{profile.cumulative_ms:7.1f}ms"
+            + (f"  {'; '.join(problems)}" if problems else "")
+        )
+        if problems or top and len(modules) == 1:
+            for _, cumulative_ms, name in profile.top(top):
+                print(f"      {cumulative_ms:7.1f}ms  {name}")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply the time budgets"
+    )
+    parser.add_argument(
+        "--top", type=int, default=5, help="slowest imports shown per module"
+    )
+    args = parser.parse_args(argv)
+    failures = check(args.modules, args.repeat, args.scale, args.top)
+    return 1 if failures else 0
+
+
+__all__ = ["BUDGETS", "ImportProfile", "check", "profile_import"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
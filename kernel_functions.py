@@ -0,0 +1,60 @@
+"""Semantic Kernel's `kernel_function` decorator, without importing Semantic Kernel.
+
+Importing `semantic_kernel` takes over a second, which the tool modules (`books_tool`,
+`books_sql`, ...) used to pay at import time just for the decorator. The
+`kernel_function` here only records its arguments; `register_kernel_functions`
+applies the real decorator - importing Semantic Kernel - when the plugin is first
+instantiated / registered with a kernel:
+
+    class BooksTool:
+        def __init__(self):
+            register_kernel_functions(type(self))
+
+        @kernel_function(name="search_books", description="...")
+        def search_books(self, query: str) -> str: ...
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Optional
+
+_DEFERRED = "__deferred_kernel_function__"
+
+
+def kernel_function(
+    func: Optional[Callable[..., Any]] = None,
+    name: Optional[str] = None,
+    description: Optional[str] = None,
+) -> Callable[..., Any]:
+    """Same arguments as `semantic_kernel.functions.kernel_function`, applied later."""
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        setattr(func, _DEFERRED, {"name": name, "description": description})
+        return func
+
+    if func:
+        return decorator(func)
+    return decorator
+
+
+def register_kernel_functions(*targets: Any) -> None:
+    """Apply the real decorator to the deferred functions of classes / functions."""
+    functions = []
+    for target in targets:
+        if isinstance(target, type):
+            for klass in target.__mro__:
+                functions.extend(vars(klass).values())
+        else:
+            functions.append(target)
+
+    for function in functions:
+        arguments = getattr(function, _DEFERRED, None)
+        if arguments is None:
+            continue
+        from semantic_kernel.functions import kernel_function as sk_kernel_function
+
+        # sets the __kernel_function_*__ attributes on the function itself
+        sk_kernel_function(function, **arguments)
+        delattr(function, _DEFERRED)
+
+
+__all__ = ["kernel_function", "register_kernel_functions"]
@@ -0,0 +1,519 @@
+"""Rate-limit aware scheduling for Foundry (agents) and ARM traffic.
+
+Every outgoing request takes a slot from the shared `RequestScheduler` before it is
+sent. Requests are grouped into endpoint families (ARM reads, ARM writes, agents,
+other Foundry data plane calls), and each family has:
+
+ - a token bucket capping the request rate (burst + refill per second), paused
+   when the service answers 429 with `Retry-After` (for at most `max_pause`),
+ - an adaptive concurrency limit (AIMD): +1 per "window" of successful requests,
+   halved on a 429,
+ - priority lanes: waiting requests are served interactive first, then default,
+   then background - so user turns (`test_agent`) beat provisioning
+   (`create_agent`, `create_logic_app_tools`).
+
+ARM calls go through it from `arm_session.arm_request(_async)`, Foundry calls via
+`SchedulerPolicy` in the `AIProjectClient` pipeline. The priority of a request comes
+from the `request_priority(...)` context (or the `prioritized(...)` decorator).
+
+`scheduler_metrics()` reports queue depth per lane, in-flight requests, current
+concurrency limits, 429 counts and wait time percentiles per family.
+"""
+
+from __future__ import annotations
+import asyncio
+import contextlib
+import contextvars
+import functools
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+from azure.core.pipeline.policies import AsyncHTTPPolicy
+
+from settings import get_env
+
+INTERACTIVE = 0
+DEFAULT = 1
+BACKGROUND = 2
+LANES = {INTERACTIVE: "interactive", DEFAULT: "default", BACKGROUND: "background"}
+
+THROTTLE_STATUSES = frozenset({429})
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "request_priority", default=DEFAULT
+)
+
+
+@dataclass
+class FamilyLimits:
+    rate: float  # sustained requests per second
+    burst: float  # bucket size
+    concurrency: int  # initial concurrency limit
+    min_concurrency: int = 1
+    max_concurrency: int = 64
+
+
+# ARM documents a per-principal token bucket of 250 reads (25/s refill) and
+# 200 writes (10/s refill); the Foundry numbers are conservative defaults.
+DEFAULT_LIMITS: Dict[str, FamilyLimits] = {
+    "arm-read": FamilyLimits(rate=25, burst=250, concurrency=16),
+    "arm-write": FamilyLimits(rate=10, burst=200, concurrency=8, max_concurrency=32),
+    "agents": FamilyLimits(rate=50, burst=100, concurrency=32, max_concurrency=128),
+    "foundry": FamilyLimits(rate=10, burst=30, concurrency=8),
+    "default": FamilyLimits(rate=100, burst=200, concurrency=32),
+}
+
+_AGENTS_PATHS = ("/assistants", "/threads", "/files", "/vector_stores")
+
+
+def classify_request(method: str, url: str) -> str:
+    """Map a request to its endpoint family."""
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host == "management.azure.com" or host.endswith(".management.azure.com"):
+        return "arm-read" if method.upper() in ("GET", "HEAD") else "arm-write"
+    if "/api/projects/" in parts.path:
+        if any(segment in parts.path for segment in _AGENTS_PATHS):
+            return "agents"
+        return "foundry"
+    return "default"
+
+
+def parse_retry_after(headers) -> Optional[float]:
+    """
+    Get the server requested delay in seconds from Retry-After style headers.
+    """
+    retry_after_ms = headers.get("x-ms-retry-after-ms") or headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000.0)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("Retry-After")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# region priorities
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+@contextlib.contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Send the requests made inside the block with the given priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def prioritized(priority: int) -> Callable:
+    """Decorator running a (sync or async) function under `request_priority`."""
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with request_priority(priority):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with request_priority(priority):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def bind_priority(func: Callable) -> Callable:
+    """
+    Wrap `func` to run with the caller's current priority, e.g. in a thread pool
+    (worker threads don't inherit the submitting thread's context).
+    """
+    priority = current_priority()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with request_priority(priority):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+# endregion
+
+
+class TokenBucket:
+    """Request rate limiter; `reserve` returns how long the caller has to wait."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def reserve(self, now: float) -> float:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        return max(wait, self.paused_until - now)
+
+    def pause(self, now: float, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, now + seconds)
+
+
+class AIMDLimit:
+    """Additive increase / multiplicative decrease concurrency limit."""
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 64,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        # one burst of 429s should only shrink the limit once
+        self.cooldown = cooldown
+        self.last_decrease = float("-inf")
+
+    @property
+    def value(self) -> int:
+        return max(self.minimum, math.floor(self.limit))
+
+    def on_success(self) -> None:
+        # +1 after roughly `limit` successful requests
+        self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_throttle(self, now: float) -> None:
+        if now - self.last_decrease < self.cooldown:
+            return
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        self.last_decrease = now
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "enqueued", "notify", "granted", "cancelled")
+
+    def __init__(self, priority: int, seq: int, notify: Callable[[], None]):
+        self.priority = priority
+        self.seq = seq
+        self.enqueued = time.monotonic()
+        self.notify = notify
+        self.granted = False
+        self.cancelled = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class _Family:
+    def __init__(self, name: str, limits: FamilyLimits):
+        self.name = name
+        self.bucket = TokenBucket(limits.rate, limits.burst)
+        self.limit = AIMDLimit(
+            limits.concurrency, limits.min_concurrency, limits.max_concurrency
+        )
+        self.in_flight = 0
+        self.waiters: List[_Waiter] = []
+        self.depth: Counter = Counter()
+        self.requests = 0
+        self.throttled = 0
+        self.waits: Deque[float] = deque(maxlen=1024)
+
+
+class Ticket:
+    """A granted slot; report the response with `observe`."""
+
+    def __init__(self, scheduler: "RequestScheduler", family: Optional[_Family]):
+        self.scheduler = scheduler
+        self.family = family
+        self.waited = 0.0
+        self.status: Optional[int] = None
+        self.retry_after: Optional[float] = None
+
+    def observe(self, status: int, headers=None) -> None:
+        self.status = status
+        if status in THROTTLE_STATUSES and headers is not None:
+            self.retry_after = parse_retry_after(headers)
+
+
+class RequestScheduler:
+    """Shared (thread and asyncio safe) scheduler for outgoing requests."""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, FamilyLimits]] = None,
+        enabled: Optional[bool] = True,
+        throttle_pause: float = 1.0,
+        max_pause: float = 60.0,
+    ):
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        # None: AGENTS_SCHEDULER, read on first use
+        self._enabled = enabled
+        # bucket pause after a 429 without Retry-After
+        self.throttle_pause = throttle_pause
+        # cap on a Retry-After pause, callers give up on longer ones
+        self.max_pause = max_pause
+        self._families: Dict[str, _Family] = {}
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is None:
+            self._enabled = get_env("AGENTS_SCHEDULER", "true").lower() == "true"
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, enabled: bool) -> None:
+        self._enabled = enabled
+
+    def configure(self, family: str, limits: FamilyLimits) -> None:
+        """Change the limits of a family (resets its state)."""
+        with self._lock:
+            self.limits[family] = limits
+            self._families.pop(family, None)
+
+    def _family(self, name: str) -> _Family:
+        family = self._families.get(name)
+        if family is None:
+            limits = self.limits.get(name) or self.limits["default"]
+            family = self._families[name] = _Family(name, limits)
+        return family
+
+    # region slot handling (call with the lock held)
+
+    def _dispatch(self, family: _Family) -> None:
+        while family.waiters and family.in_flight < family.limit.value:
+            waiter = heapq.heappop(family.waiters)
+            if waiter.cancelled:
+                continue
+            family.depth[waiter.priority] -= 1
+            family.in_flight += 1
+            waiter.granted = True
+            waiter.notify()
+
+    def _enqueue(self, family: _Family, priority: int, notify) -> _Waiter:
+        waiter = _Waiter(priority, next(self._seq), notify)
+        heapq.heappush(family.waiters, waiter)
+        family.depth[priority] += 1
+        self._dispatch(family)
+        return waiter
+
+    def _admit(self, family: _Family, waiter: _Waiter) -> float:
+        """Account for a granted waiter; returns the token bucket delay."""
+        now = time.monotonic()
+        delay = family.bucket.reserve(now)
+        family.requests += 1
+        family.waits.append(now - waiter.enqueued + delay)
+        return delay
+
+    def _cancel(self, family: _Family, waiter: _Waiter) -> None:
+        if waiter.granted:
+            family.in_flight -= 1
+            self._dispatch(family)
+        else:
+            waiter.cancelled = True
+            family.depth[waiter.priority] -= 1
+
+    def _release(self, ticket: Ticket) -> None:
+        family = ticket.family
+        with self._lock:
+            family.in_flight -= 1
+            if ticket.status in THROTTLE_STATUSES:
+                now = time.monotonic()
+                family.throttled += 1
+                family.limit.on_throttle(now)
+                pause = min(ticket.retry_after or self.throttle_pause, self.max_pause)
+                family.bucket.pause(now, pause)
+            elif ticket.status is not None and ticket.status < 500:
+                family.limit.on_success()
+            self._dispatch(family)
+
+    # endregion
+
+    @contextlib.contextmanager
+    def slot(self, family: str, priority: Optional[int] = None) -> Iterator[Ticket]:
+        """Wait (blocking) for a slot in the family; released on exit."""
+        if not self.enabled:
+            yield Ticket(self, None)
+            return
+        priority = current_priority() if priority is None else priority
+        granted = threading.Event()
+        with self._lock:
+            state = self._family(family)
+            waiter = self._enqueue(state, priority, granted.set)
+        try:
+            granted.wait()
+            with self._lock:
+                delay = self._admit(state, waiter)
+            if delay > 0:
+                time.sleep(delay)
+        except BaseException:
+            with self._lock:
+                self._cancel(state, waiter)
+            raise
+
+        ticket = Ticket(self, state)
+        ticket.waited = time.monotonic() - waiter.enqueued
+        try:
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    @contextlib.asynccontextmanager
+    async def aslot(self, family: str, priority: Optional[int] = None):
+        """Wait (without blocking the loop) for a slot in the family."""
+        if not self.enabled:
+            yield Ticket(self, None)
+            return
+        priority = current_priority() if priority is None else priority
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def notify() -> None:
+            # may be called from another thread releasing a slot
+            loop.call_soon_threadsafe(
+                lambda: granted.done() or granted.set_result(None)
+            )
+
+        with self._lock:
+            state = self._family(family)
+            waiter = self._enqueue(state, priority, notify)
+        try:
+            await granted
+            with self._lock:
+                delay = self._admit(state, waiter)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            with self._lock:
+                self._cancel(state, waiter)
+            raise
+
+        ticket = Ticket(self, state)
+        ticket.waited = time.monotonic() - waiter.enqueued
+        try:
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, concurrency and wait time statistics per family."""
+        with self._lock:
+            result = {}
+            for name, family in self._families.items():
+                waits = sorted(family.waits)
+                result[name] = {
+                    "in_flight": family.in_flight,
+                    "concurrency_limit": family.limit.value,
+                    "queue_depth": sum(family.depth.values()),
+                    "queue_depth_by_lane": {
+                        LANES.get(p, str(p)): family.depth[p]
+                        for p in sorted(family.depth)
+                    },
+                    "requests": family.requests,
+                    "throttled": family.throttled,
+                    "wait_ms": (
+                        {
+                            "mean": 1000 * sum(waits) / len(waits),
+                            "p50": 1000 * waits[len(waits) // 2],
+                            "p95": 1000
+                            * waits[min(len(waits) - 1, int(len(waits) * 0.95))],
+                            "max": 1000 * waits[-1],
+                        }
+                        if waits
+                        else {}
+                    ),
+                }
+            return result
+
+
+class SchedulerPolicy(AsyncHTTPPolicy):
+    """
+    azure-core pipeline policy routing every attempt through the scheduler.
+
+    Add it as a per-retry policy so each retry of a throttled request waits for the
+    bucket again and its 429 feeds the concurrency limit.
+    """
+
+    def __init__(self, scheduler: Optional[RequestScheduler] = None):
+        super().__init__()
+        self.scheduler = scheduler
+
+    async def send(self, request):
+        scheduler = self.scheduler or request_scheduler
+        http_request = request.http_request
+        family = classify_request(http_request.method, http_request.url)
+        async with scheduler.aslot(family) as ticket:
+            response = await self.next.send(request)
+            ticket.observe(
+                response.http_response.status_code, response.http_response.headers
+            )
+        return response
+
+
+request_scheduler = RequestScheduler(enabled=None)
+
+
+def get_request_scheduler() -> RequestScheduler:
+    return request_scheduler
+
+
+def scheduler_metrics() -> Dict[str, Any]:
+    """Queue depth / wait time metrics of the shared scheduler."""
+    return request_scheduler.metrics()
+
+
+__all__ = [
+    "BACKGROUND",
+    "DEFAULT",
+    "INTERACTIVE",
+    "AIMDLimit",
+    "FamilyLimits",
+    "RequestScheduler",
+    "SchedulerPolicy",
+    "TokenBucket",
+    "bind_priority",
+    "classify_request",
+    "current_priority",
+    "get_request_scheduler",
+    "parse_retry_after",
+    "prioritized",
+    "request_priority",
+    "request_scheduler",
+    "scheduler_metrics",
+]
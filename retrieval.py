@@ -0,0 +1,414 @@
+"""Local retrieval over the files in `docs/`.
+
+Instead of pasting whole manuals into the system prompt (prompt tokens grow with
+the size of `docs/`), `DocumentIndex` chunks every prose file (`.md`, `.txt`,
+`.html` up to 1 MB by default - data files like the books CSV or OpenAPI specs are
+left to the tools), indexes the chunks with a BM25 + hashed bag-of-words vector
+hybrid and returns only the best chunks for a question, packed into a fixed token
+budget:
+
+    index = DocumentIndex("docs")
+    await chat(question, other_messages=index.context(question, token_budget=1500))
+
+The index is persisted to `.cache/retrieval/<docs dir>.json` and refreshed
+incrementally: files are re-chunked only when their size / mtime and content hash
+change, deleted files are dropped.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from settings import get_cache_dir
+
+INDEX_VERSION = 1
+
+DEFAULT_EXTENSIONS = (".md", ".txt", ".html")
+MAX_FILE_BYTES = 1_000_000
+VECTOR_DIMENSIONS = 1024
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how i if in is it of on or the this to "
+    "was what when where which who why with you your".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough model token count (~4 characters per token)."""
+    return max(1, math.ceil(len(text) / 4))
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word terms without stopwords."""
+    return [
+        term
+        for term in _TOKEN_RE.findall(text.lower())
+        if term not in _STOPWORDS and len(term) > 1
+    ]
+
+
+def hashed_vector(terms: List[str]) -> Dict[int, float]:
+    """L2 normalized sparse vector of hashed unigrams + bigrams."""
+    features = Counter(terms)
+    features.update(f"{a} {b}" for a, b in zip(terms, terms[1:]))
+    vector: Dict[int, float] = {}
+    for feature, count in features.items():
+        digest = hashlib.md5(feature.encode("utf-8")).digest()
+        bucket = int.from_bytes(digest[:4], "little") % VECTOR_DIMENSIONS
+        sign = 1.0 if digest[4] & 1 else -1.0
+        vector[bucket] = vector.get(bucket, 0.0) + sign * (1.0 + math.log(count))
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    return {k: v / norm for k, v in vector.items() if v} if norm else {}
+
+
+def chunk_text(text: str, max_tokens: int = 200, overlap: int = 1) -> List[str]:
+    """
+    Split text into chunks of about `max_tokens`, on paragraph / line boundaries.
+
+    The last `overlap` lines of a chunk are repeated at the start of the next one so
+    a heading stays next to the text it introduces.
+    """
+    lines = [line.rstrip() for line in text.splitlines()]
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in lines:
+        if not line.strip():
+            if current and current[-1]:
+                current.append("")
+            continue
+        line_tokens = estimate_tokens(line)
+        if current and size + line_tokens > max_tokens:
+            chunks.append("\n".join(current).strip())
+            current = [l for l in current[-overlap:] if l] if overlap else []
+            size = sum(estimate_tokens(l) for l in current)
+        current.append(line)
+        size += line_tokens
+    if current and any(current):
+        chunks.append("\n".join(current).strip())
+    return chunks
+
+
+@dataclass
+class SearchResult:
+    source: str
+    chunk: int
+    text: str
+    score: float
+    tokens: int
+
+    def as_message(self) -> str:
+        return f"[{self.source}#{self.chunk}]\n{self.text}"
+
+
+class DocumentIndex:
+    """Persisted, incrementally refreshed hybrid (BM25 + vector) index of a directory."""
+
+    def __init__(
+        self,
+        docs_dir: str = "docs",
+        index_path: Optional[str] = None,
+        extensions: Iterable[str] = DEFAULT_EXTENSIONS,
+        max_file_bytes: Optional[int] = MAX_FILE_BYTES,
+        chunk_tokens: int = 200,
+        k1: float = 1.5,
+        b: float = 0.75,
+        auto_refresh: bool = True,
+    ):
+        self.docs_dir = docs_dir
+        if index_path is None:
+            index_path = os.path.join(
+                get_cache_dir(),
+                "retrieval",
+                f"{os.path.basename(os.path.abspath(docs_dir)) or 'docs'}.json",
+            )
+        self.index_path = index_path
+        self.extensions = tuple(e.lower() for e in extensions)
+        # larger files are skipped (None: no limit)
+        self.max_file_bytes = max_file_bytes
+        self.chunk_tokens = chunk_tokens
+        self.k1 = k1
+        self.b = b
+        self.auto_refresh = auto_refresh
+
+        self._lock = threading.Lock()
+        self._files: Dict[str, Dict[str, Any]] = self._load()
+        self._stats: Optional[Dict[str, Any]] = None
+        self.indexed_files = 0
+        self.reused_files = 0
+        self.skipped_files = 0
+
+    # region persistence
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if (
+            data.get("version") != INDEX_VERSION
+            or data.get("chunk_tokens") != self.chunk_tokens
+        ):
+            return {}
+        return data.get("files", {})
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "version": INDEX_VERSION,
+                    "chunk_tokens": self.chunk_tokens,
+                    "files": self._files,
+                },
+                f,
+            )
+        os.replace(tmp_path, self.index_path)
+
+    # endregion
+
+    # region indexing
+
+    def _walk(self) -> Dict[str, os.stat_result]:
+        found = {}
+        skipped = 0
+        for root, _, names in os.walk(self.docs_dir):
+            for name in names:
+                if not name.lower().endswith(self.extensions):
+                    continue
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                if (
+                    self.max_file_bytes is not None
+                    and stat.st_size > self.max_file_bytes
+                ):
+                    skipped += 1
+                    continue
+                found[os.path.relpath(path, self.docs_dir)] = stat
+        self.skipped_files = skipped
+        return found
+
+    def _index_file(self, relative_path: str, content: str) -> List[Dict[str, Any]]:
+        chunks = []
+        for text in chunk_text(content, self.chunk_tokens):
+            # the file name is searchable too
+            terms = tokenize(f"{relative_path}\n{text}")
+            chunks.append(
+                {
+                    "text": text,
+                    "tokens": estimate_tokens(text),
+                    "length": len(terms),
+                    "terms": dict(Counter(terms)),
+                    "vector": {str(k): v for k, v in hashed_vector(terms).items()},
+                }
+            )
+        return chunks
+
+    def refresh(self) -> Dict[str, int]:
+        """Re-index changed / new files and drop deleted ones. Returns counts."""
+        with self._lock:
+            found = self._walk()
+            changes = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+            dirty = False
+            for relative_path in list(self._files):
+                if relative_path not in found:
+                    del self._files[relative_path]
+                    changes["removed"] += 1
+
+            for relative_path, stat in found.items():
+                entry = self._files.get(relative_path)
+                if (
+                    entry
+                    and entry["size"] == stat.st_size
+                    and entry["mtime_ns"] == stat.st_mtime_ns
+                ):
+                    changes["unchanged"] += 1
+                    continue
+
+                with open(os.path.join(self.docs_dir, relative_path), "rb") as f:
+                    raw = f.read()
+                digest = hashlib.sha256(raw).hexdigest()
+                if entry and entry["sha256"] == digest:
+                    # touched but not modified
+                    entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                    changes["unchanged"] += 1
+                    self.reused_files += 1
+                    dirty = True
+                    continue
+
+                self._files[relative_path] = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "sha256": digest,
+                    "chunks": self._index_file(
+                        relative_path, raw.decode("utf-8", errors="replace")
+                    ),
+                }
+                self.indexed_files += 1
+                changes["updated" if entry else "added"] += 1
+
+            if changes["added"] or changes["updated"] or changes["removed"]:
+                self._stats = None
+                dirty = True
+            if dirty:
+                self.save()
+            return changes
+
+    def _corpus_stats(self) -> Dict[str, Any]:
+        if self._stats is None:
+            document_frequency: Counter = Counter()
+            total_length = 0
+            count = 0
+            for entry in self._files.values():
+                for chunk in entry["chunks"]:
+                    document_frequency.update(chunk["terms"].keys())
+                    total_length += chunk["length"]
+                    count += 1
+            self._stats = {
+                "df": document_frequency,
+                "count": count,
+                "avg_length": total_length / count if count else 0.0,
+            }
+        return self._stats
+
+    # endregion
+
+    # region search
+
+    def search(self, query: str, k: int = 5, alpha: float = 0.7) -> List[SearchResult]:
+        """
+        Top `k` chunks for `query`.
+
+        Scores are `alpha * bm25 / max(bm25) + (1 - alpha) * cosine(query, chunk)`.
+        """
+        if self.auto_refresh:
+            self.refresh()
+        stats = self._corpus_stats()
+        terms = tokenize(query)
+        if not terms or not stats["count"]:
+            return []
+        query_vector = hashed_vector(terms)
+        query_terms = Counter(terms)
+        idf = {
+            term: math.log(
+                1
+                + (stats["count"] - stats["df"][term] + 0.5) / (stats["df"][term] + 0.5)
+            )
+            for term in query_terms
+        }
+
+        candidates = []
+        for source, entry in self._files.items():
+            for number, chunk in enumerate(entry["chunks"]):
+                length_norm = self.k1 * (
+                    1 - self.b + self.b * chunk["length"] / (stats["avg_length"] or 1)
+                )
+                bm25 = 0.0
+                for term, query_count in query_terms.items():
+                    frequency = chunk["terms"].get(term)
+                    if frequency:
+                        bm25 += (
+                            query_count
+                            * idf[term]
+                            * frequency
+                            * (self.k1 + 1)
+                            / (frequency + length_norm)
+                        )
+                cosine = sum(
+                    weight * chunk["vector"].get(str(bucket), 0.0)
+                    for bucket, weight in query_vector.items()
+                )
+                if bm25 > 0 or cosine > 0:
+                    candidates.append((bm25, cosine, source, number, chunk))
+
+        if not candidates:
+            return []
+        max_bm25 = max(c[0] for c in candidates) or 1.0
+        results = [
+            SearchResult(
+                source=source,
+                chunk=number,
+                text=chunk["text"],
+                score=alpha * bm25 / max_bm25 + (1 - alpha) * max(cosine, 0.0),
+                tokens=chunk["tokens"],
+            )
+            for bm25, cosine, source, number, chunk in candidates
+        ]
+        results.sort(key=lambda r: r.score, reverse=True)
+        return results[:k]
+
+    def context(
+        self,
+        query: str,
+        k: int = 5,
+        token_budget: int = 1500,
+        min_score: float = 0.0,
+    ) -> List[str]:
+        """Best chunks for `query` as messages (e.g. `other_messages`), within budget."""
+        messages = []
+        used = 0
+        for result in self.search(query, k=k):
+            if result.score < min_score:
+                break
+            message = result.as_message()
+            cost = estimate_tokens(message)
+            if used + cost > token_budget:
+                continue  # a smaller lower ranked chunk may still fit
+            messages.append(message)
+            used += cost
+        return messages
+
+    # endregion
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "files": len(self._files),
+            "chunks": sum(len(e["chunks"]) for e in self._files.values()),
+            "tokens": sum(
+                c["tokens"] for e in self._files.values() for c in e["chunks"]
+            ),
+            "indexed_files": self.indexed_files,
+            "reused_files": self.reused_files,
+            "skipped_files": self.skipped_files,
+        }
+
+
+_indexes: Dict[str, DocumentIndex] = {}
+
+
+def get_document_index(docs_dir: str = "docs") -> DocumentIndex:
+    """Shared index per docs directory."""
+    key = os.path.abspath(docs_dir)
+    if key not in _indexes:
+        _indexes[key] = DocumentIndex(docs_dir)
+    return _indexes[key]
+
+
+def retrieve_context(
+    query: str, docs_dir: str = "docs", k: int = 5, token_budget: int = 1500
+) -> List[str]:
+    """Top `k` chunks of `docs_dir` for `query`, packed into `token_budget` tokens."""
+    return get_document_index(docs_dir).context(query, k=k, token_budget=token_budget)
+
+
+__all__ = [
+    "DocumentIndex",
+    "SearchResult",
+    "chunk_text",
+    "estimate_tokens",
+    "get_document_index",
+    "retrieve_context",
+    "tokenize",
+]
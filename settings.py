@@ -0,0 +1,57 @@
+"""Settings read from the environment, after loading the `.env` file once.
+
+Only depends on python-dotenv, so library modules and scripts read their settings
+on first use through `get_env` / `get_cache_dir` without importing `setup` (which
+re-exports them for the notebooks).
+"""
+
+from __future__ import annotations
+import os
+from functools import lru_cache
+from typing import Any
+
+from dotenv import load_dotenv
+
+
+@lru_cache(maxsize=None)
+def _environment() -> dict[str, Any]:
+    # Load environment variables from the .env file
+    load_dotenv(override=True)
+    return {
+        "endpoint": os.environ.get("AZURE_AI_FOUNDRY_CONNECTION_STRING"),
+        "deployment_name": os.environ.get("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"),
+        "api_version": os.environ.get("AZURE_OPENAI_API_VERSION", None),
+        "tenant_id": os.environ.get("AZURE_TENANT_ID", None),
+        "is_debug": os.environ.get("DEBUG", "false").lower() == "true",
+        "http_pool_size": int(os.environ.get("AZURE_AI_HTTP_POOL_SIZE", "100")),
+        "http_keepalive_timeout": float(
+            os.environ.get("AZURE_AI_HTTP_KEEPALIVE_TIMEOUT", "60")
+        ),
+    }
+
+
+def load_environment() -> dict[str, Any]:
+    """Load the .env file (once) and return the settings read from the environment."""
+    return _environment()
+
+
+def get_env(name: str, default: str | None = None) -> str | None:
+    """Read an environment variable, after loading the .env file (once).
+
+    Modules read their settings through this on first use instead of at import
+    time, so values from the .env file apply.
+    """
+    _environment()
+    return os.environ.get(name, default)
+
+
+def get_cache_dir() -> str:
+    """Root of the on-disk caches (AGENTS_CACHE_DIR, `.cache` by default)."""
+    return get_env("AGENTS_CACHE_DIR", ".cache")
+
+
+__all__ = [
+    "get_cache_dir",
+    "get_env",
+    "load_environment",
+]
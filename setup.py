@@ -1,85 +1,320 @@
+from __future__ import annotations
+import asyncio
+import contextlib
+import hashlib
+import json
+import time
+import weakref
+import zipfile
+from dataclasses import dataclass, field
 from datetime import date
-from dotenv import load_dotenv
-from azure.identity.aio import DefaultAzureCredential, AzureDeveloperCliCredential
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Iterable
 import os
-from semantic_kernel import Kernel
-from semantic_kernel.agents import (
-    AzureAIAgent,
-    AzureAIAgentSettings,
-)
-from semantic_kernel.functions.kernel_plugin import KernelPlugin
-from azure.ai.agents.models import ToolDefinition, Tool, ToolResources
-from semantic_kernel.agents import (
-    AzureAIAgentThread,
-)
-from azure.ai.projects.aio import AIProjectClient
-from semantic_kernel.contents import FunctionCallContent, FunctionResultContent
-from semantic_kernel.contents.chat_message_content import (
-    ChatMessageContent,
-    TextContent,
-)
-from semantic_kernel.contents.file_reference_content import FileReferenceContent
-import jsonref
-from azure.ai.agents.models import (
-    OpenApiTool,
-    OpenApiAnonymousAuthDetails,
+from rate_limits import (
+    BACKGROUND,
+    INTERACTIVE,
+    prioritized,
+    scheduler_metrics,
 )
 
-# Load environment variables from the .env file
-load_dotenv(override=True)
-endpoint = os.environ.get("AZURE_AI_FOUNDRY_CONNECTION_STRING")
-deployment_name = os.environ.get("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME")
-api_version = os.environ.get("AZURE_OPENAI_API_VERSION", None)
-tenant_id = os.environ.get("AZURE_TENANT_ID", None)
-is_debug = os.environ.get("DEBUG", "false").lower() == "true"
-
-ai_agent_settings = AzureAIAgentSettings(
-    endpoint=endpoint,
-    model_deployment_name=deployment_name,
-    api_version=api_version,
+# get_env / get_cache_dir / load_environment are re-exported for the notebooks
+from settings import (  # noqa: F401
+    _environment,
+    get_cache_dir,
+    get_env,
+    load_environment,
 )
 
-creds = (
-    AzureDeveloperCliCredential(tenant_id=os.environ.get("AZURE_TENANT_ID", None))
-    if os.environ.get("USE_AZURE_DEV_CLI") == "true"
-    else DefaultAzureCredential()
+# Semantic Kernel, the azure SDKs, aiohttp and mcp take ~2s to import, so they are
+# imported where they are first used - `import setup` stays cheap (see
+# import_benchmark.py)
+if TYPE_CHECKING:
+    import aiohttp
+    from azure.ai.agents.models import FilePurpose, Tool, ToolDefinition
+    from azure.ai.projects.aio import AIProjectClient
+    from semantic_kernel import Kernel
+    from semantic_kernel.agents import (
+        AzureAIAgent,
+        AzureAIAgentSettings,
+        AzureAIAgentThread,
+    )
+    from semantic_kernel.connectors.mcp import MCPStdioPlugin
+    from semantic_kernel.contents import FunctionCallContent, FunctionResultContent
+    from semantic_kernel.contents.chat_message_content import ChatMessageContent
+    from semantic_kernel.functions.kernel_plugin import KernelPlugin
+    from cassettes import Cassette
+    from file_downloads import FileDownloadManager
+    from thread_budget import ThreadContextBudget, TurnRecord
+    from tool_cache import ToolResultCache
+    from tracing import ToolCallTracer
+
+# read from the .env file / environment on first use, see `_environment`
+_SETTING_NAMES = (
+    "endpoint",
+    "deployment_name",
+    "api_version",
+    "tenant_id",
+    "is_debug",
+    "http_pool_size",
+    "http_keepalive_timeout",
 )
 
 
+def _uploads_dir() -> str:
+    return os.path.join(get_cache_dir(), "uploads")
+
+
+@lru_cache(maxsize=None)
+def get_ai_agent_settings() -> AzureAIAgentSettings:
+    from semantic_kernel.agents import AzureAIAgentSettings
+
+    env = _environment()
+    return AzureAIAgentSettings(
+        endpoint=env["endpoint"],
+        model_deployment_name=env["deployment_name"],
+        api_version=env["api_version"],
+    )
+
+
+@lru_cache(maxsize=None)
 def get_credentials():
-    return creds
+    _environment()
+    from azure.identity.aio import AzureDeveloperCliCredential, DefaultAzureCredential
+
+    return (
+        AzureDeveloperCliCredential(tenant_id=os.environ.get("AZURE_TENANT_ID", None))
+        if os.environ.get("USE_AZURE_DEV_CLI") == "true"
+        else DefaultAzureCredential()
+    )
+
+
+def __getattr__(name: str) -> Any:
+    # module level settings / credentials of earlier versions, created on first access
+    if name == "ai_agent_settings":
+        return get_ai_agent_settings()
+    if name == "creds":
+        return get_credentials()
+    if name in _SETTING_NAMES:
+        return _environment()[name]
+    if name == "uploads_dir":
+        return _uploads_dir()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class ProjectClientPool:
+    """
+    Owns a single, process-wide AIProjectClient backed by a tuned aiohttp connection pool.
+
+    Every caller of `get_project_client` gets the same client, so agent traffic reuses
+    warm keep-alive connections instead of paying a TLS handshake per notebook/worker.
+    Use `async with managed_project_client()` (or `await close_project_client()`) to
+    shut the pool down cleanly.
+    """
+
+    def __init__(
+        self,
+        pool_size: int | None = None,
+        keepalive_timeout: float | None = None,
+        endpoint: str | None = None,
+        credential: Any = None,
+        cassette: Cassette | None = None,
+        **client_kwargs,
+    ):
+        # None: AZURE_AI_HTTP_POOL_SIZE / AZURE_AI_HTTP_KEEPALIVE_TIMEOUT
+        self._pool_size = pool_size
+        self._keepalive_timeout = keepalive_timeout
+        # overrides for pointing the pool somewhere else, e.g. agents_standin
+        self.endpoint = endpoint
+        self.credential = credential
+        self.client_kwargs = client_kwargs
+        # record / replay Foundry traffic for offline benchmarks
+        self.cassette = cassette
+
+        self._client: AIProjectClient | None = None
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # one lock per event loop, created synchronously so first callers share it
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+        self._requests = 0
+        self._reuses = 0
+
+    @property
+    def pool_size(self) -> int:
+        if self._pool_size is None:
+            return _environment()["http_pool_size"]
+        return self._pool_size
+
+    @property
+    def keepalive_timeout(self) -> float:
+        if self._keepalive_timeout is None:
+            return _environment()["http_keepalive_timeout"]
+        return self._keepalive_timeout
+
+    def _is_usable(self) -> bool:
+        # aiohttp sessions are bound to the loop they were created on
+        return (
+            self._client is not None
+            and self._loop is asyncio.get_running_loop()
+            and not self._session.closed
+        )
+
+    async def get_client(self) -> AIProjectClient:
+        """Get the pooled client, creating it on first use."""
+        self._requests += 1
+        if self._is_usable():
+            self._reuses += 1
+            return self._client
+
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        async with self._lock:
+            if self._is_usable():
+                self._reuses += 1
+                return self._client
+
+            if self._client is not None and self._loop is loop:
+                await self.close()
+            # a client from another (finished) loop can't be closed here, just drop it
+            self._client = None
+            self._session = None
+            self._client = await self._create_client()
+            self._loop = loop
+        return self._client
+
+    async def _create_client(self) -> AIProjectClient:
+        import aiohttp
+        from azure.core.pipeline.transport import AioHttpTransport
+        from semantic_kernel.agents import AzureAIAgent
+        from rate_limits import SchedulerPolicy
+
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            keepalive_timeout=self.keepalive_timeout,
+            enable_cleanup_closed=True,
+        )
+        self._session = aiohttp.ClientSession(connector=connector)
+
+        # uncomment to test token aquisition
+        # token_test  = creds.get_token("https://ai.azure.com")
+        # print(f"Token for https://ai.azure.com: {token_test.token[:10]}...")
+
+        credential = self.credential or get_credentials()
+        transport = AioHttpTransport(session=self._session, session_owner=False)
+        if self.cassette is not None:
+            credential = self.cassette.async_credential(credential)
+            transport = self.cassette.wrap_transport(transport)
+
+        settings = get_ai_agent_settings()
+        client = AzureAIAgent.create_client(
+            credential=credential,
+            endpoint=self.endpoint or settings.endpoint,
+            api_version=settings.api_version,
+            transport=transport,
+            # every attempt (incl. retries) is admitted by the shared scheduler
+            per_retry_policies=[SchedulerPolicy()],
+            **self.client_kwargs,
+        )
+
+        # List agents
+        if _environment()["is_debug"]:
+            print("\n --- Agents ---")
+            async for agent in client.agents.list_agents():
+                print(
+                    f"Agent ID: {agent.id}, Name: {agent.name}, Description: {agent.description}, Deployment Name: {agent.model}"
+                )
+
+            print("\n --- Connections ---")
+            # List connections
+            async for connection in client.connections.list():
+                print(
+                    f"Connection ID: {connection.id}, Name: {connection.name}, Type: {connection.type} Default: {connection.is_default}"
+                )
+        return client
+
+    def _connection_counts(self) -> tuple[int | None, int | None]:
+        """Connections in use / idle, None when aiohttp doesn't expose them."""
+        if self._session is None or self._session.closed:
+            return 0, 0
+        # aiohttp has no public API for this; its private fields may change
+        connector = self._session.connector
+        try:
+            in_use = len(connector._acquired)
+            idle = sum(len(conns) for conns in connector._conns.values())
+        except (AttributeError, TypeError):
+            return None, None
+        return in_use, idle
+
+    def stats(self) -> dict[str, Any]:
+        """Report pool utilization (connections in use / idle) and client reuse."""
+        in_use, idle = self._connection_counts()
+        return {
+            "pool_size": self.pool_size,
+            "keepalive_timeout": self.keepalive_timeout,
+            "connections_in_use": in_use,
+            "connections_idle": idle,
+            "utilization": (
+                in_use / self.pool_size
+                if in_use is not None and self.pool_size
+                else None
+            ),
+            "client_requests": self._requests,
+            "client_reuses": self._reuses,
+            "open": self._client is not None,
+        }
+
+    async def close(self) -> None:
+        """Close the pooled client and its connection pool."""
+        client, session = self._client, self._session
+        self._client = None
+        self._session = None
+        self._loop = None
+        if client is not None:
+            await client.close()
+        if session is not None and not session.closed:
+            await session.close()
+
+
+project_client_pool = ProjectClientPool()
 
 
 async def get_project_client() -> AIProjectClient:
-    """Get the Azure AI Agent client."""
+    """Get the shared Azure AI Agent client.
 
-    # uncomment to test token aquisition
-    # token_test  = creds.get_token("https://ai.azure.com")
-    # print(f"Token for https://ai.azure.com: {token_test.token[:10]}...")
+    The client is pooled for the whole process - don't close it directly,
+    use `close_project_client` or `managed_project_client` instead.
+    """
+    return await project_client_pool.get_client()
 
-    client = AzureAIAgent.create_client(
-        credential=creds,
-        endpoint=ai_agent_settings.endpoint,
-        api_version=ai_agent_settings.api_version,
-    )
 
-    # List agents
-    if is_debug:
-        print("\n --- Agents ---")
-        async for agent in client.agents.list_agents():
-            print(
-                f"Agent ID: {agent.id}, Name: {agent.name}, Description: {agent.description}, Deployment Name: {agent.model}"
-            )
+async def close_project_client() -> None:
+    """Shut down the shared client and release its connections."""
+    await project_client_pool.close()
 
-        print("\n --- Connections ---")
-        # List connections
-        async for connection in client.connections.list():
-            print(
-                f"Connection ID: {connection.id}, Name: {connection.name}, Type: {connection.type} Default: {connection.is_default}"
-            )
-    return client
+
+@contextlib.asynccontextmanager
+async def managed_project_client():
+    """Async context manager yielding the shared client and closing it on exit."""
+    try:
+        yield await project_client_pool.get_client()
+    finally:
+        await project_client_pool.close()
+
+
+def get_project_client_stats() -> dict[str, Any]:
+    """Report the shared client's connection pool utilization."""
+    return project_client_pool.stats()
 
 
+def get_scheduler_metrics() -> dict[str, Any]:
+    """Report request queue depth / wait times / 429s per endpoint family."""
+    return scheduler_metrics()
+
+
+@prioritized(BACKGROUND)
 async def create_agent(
     agent_name: str,
     agent_instructions: str,
@@ -87,7 +322,19 @@ async def create_agent(
     tools: list[Tool | ToolDefinition] = [],
     plugins: list[KernelPlugin] = [],
     kernel: Kernel = None,
+    memoize: bool | Iterable[str] = False,
+    tool_cache: ToolResultCache | None = None,
 ) -> AzureAIAgent:
+    """
+    Create (or update) the agent and wrap it for Semantic Kernel.
+
+    With `memoize=True` (or a list of plugin names) the plugins' function results are
+    memoized in `tool_cache` (the shared `get_tool_result_cache()` by default).
+    """
+    from azure.ai.agents.models import ToolResources
+    from semantic_kernel import Kernel
+    from semantic_kernel.agents import AzureAIAgent
+
     tool_definitions: list[ToolDefinition] = []
     tool_resources = ToolResources()
 
@@ -110,6 +357,7 @@ async def create_agent(
             agent_definition = agent
             break
 
+    model = get_ai_agent_settings().model_deployment_name
     if agent_definition:
         print(
             f"Found existing agent with ID: {agent_definition.id} and name: {agent_definition.name}"
@@ -117,17 +365,17 @@ async def create_agent(
         agent_definition = await client.agents.update_agent(
             agent_id=agent_definition.id,
             instructions=agent_instructions,
-            model=ai_agent_settings.model_deployment_name,
+            model=model,
             tools=tool_definitions,
             tool_resources=tool_resources,
             temperature=0.2,
         )
         print(
-            f"Updated agent with id {agent_definition.id} name: {agent_name} with model {ai_agent_settings.model_deployment_name}"
+            f"Updated agent with id {agent_definition.id} name: {agent_name} with model {model}"
         )
     else:
         agent_definition = await client.agents.create_agent(
-            model=ai_agent_settings.model_deployment_name,
+            model=model,
             name=agent_name,
             instructions=agent_instructions,
             tools=tool_definitions,
@@ -135,7 +383,7 @@ async def create_agent(
             temperature=0.2,
         )
         print(
-            f"Created agent with id {agent_definition.id} name: {agent_name} with model {ai_agent_settings.model_deployment_name}"
+            f"Created agent with id {agent_definition.id} name: {agent_name} with model {model}"
         )
 
     agent = AzureAIAgent(
@@ -144,21 +392,66 @@ async def create_agent(
         plugins=plugins,
         kernel=kernel if kernel else Kernel(),
     )
+    if memoize:
+        _install_tool_cache(agent.kernel, plugins, memoize, tool_cache)
     return agent
 
 
-async def on_intermediate_message(agent_response: ChatMessageContent):
-    print(f"Intermediate response from Agent: {agent_response}")
-    for item in agent_response.items or []:
-        if isinstance(item, FunctionResultContent):
-            print(f"Function Result:> {item.result} for function: {item.name}")
-        elif isinstance(item, FunctionCallContent):
-            print(f"Function Call:> {item.name} with arguments: {item.arguments}")
-        else:
-            print(f"{item}")
+def _install_tool_cache(
+    kernel: Kernel,
+    plugins: list[KernelPlugin | object],
+    memoize: bool | Iterable[str],
+    tool_cache: ToolResultCache | None,
+) -> None:
+    from tool_cache import get_tool_result_cache
+
+    cache = tool_cache or get_tool_result_cache()
+    names = []
+    for plugin in plugins:
+        name = getattr(plugin, "name", plugin.__class__.__name__)
+        if memoize is not True and name not in memoize:
+            continue
+        names.append(name)
+        # plugins like BooksTool version their data so stale results are skipped
+        dataset_version = getattr(plugin, "dataset_version", None)
+        if callable(dataset_version):
+            cache.register_version(name, dataset_version)
+    cache.install(kernel, names)
+
+
+def get_tool_cache_stats(tool_cache: ToolResultCache | None = None) -> dict[str, Any]:
+    """Report hit / miss counts of the tool result cache."""
+    from tool_cache import get_tool_result_cache
+
+    return (tool_cache or get_tool_result_cache()).stats()
+
+
+async def on_intermediate_message(
+    agent_response: ChatMessageContent, tracer: ToolCallTracer | None = None
+):
+    """Record function calls / results on the tool call timeline (no printing)."""
+    from tracing import get_tool_tracer
+
+    (tracer or get_tool_tracer()).on_message(agent_response)
+
+
+async def _end_traced_turn(tracer: ToolCallTracer, client: Any, turn: int) -> None:
+    """End the tracer's turn and print its per tool summary."""
+    collecting = tracer.end_turn(client)
+    if collecting is not None:
+        # server-side tool calls only show up once the run steps are read
+        await asyncio.gather(collecting, return_exceptions=True)
+    for total in tracer.summary(turn):
+        print(
+            f"Tool:> {total['name']} ({total['agent']}) x{total['calls']} "
+            f"{total['total_s'] * 1000:.0f}ms, {total['result_bytes']} bytes"
+        )
 
 
 def create_weather_openapi_tool() -> Tool:
+    import jsonref
+    from azure.ai.agents.models import OpenApiAnonymousAuthDetails, OpenApiTool
+
     with open("docs/weather.json", "r") as f:
         openapi_weather = jsonref.loads(f.read())
         openapi_server_url = openapi_weather["servers"][0]["url"]
@@ -173,26 +466,572 @@ def create_weather_openapi_tool() -> Tool:
         return openapi_tool
 
 
+def file_fingerprint(path: str) -> str:
+    """sha256 + size of a local file."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+            size += len(block)
+    return f"sha256:{digest.hexdigest()}:{size}"
+
+
+def _load_upload_map() -> dict[str, Any]:
+    try:
+        with open(os.path.join(_uploads_dir(), "uploads.json"), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"fingerprints": {}, "uploads": {}}
+
+
+def _save_upload_map(upload_map: dict[str, Any]) -> None:
+    uploads_dir = _uploads_dir()
+    os.makedirs(uploads_dir, exist_ok=True)
+    path = os.path.join(uploads_dir, "uploads.json")
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(upload_map, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def _cached_fingerprint(upload_map: dict[str, Any], path: str) -> str:
+    # only re-hash when size / mtime changed since the last upload
+    stat = os.stat(path)
+    known = upload_map["fingerprints"].get(os.path.abspath(path))
+    if (
+        known
+        and known["size"] == stat.st_size
+        and known["mtime_ns"] == stat.st_mtime_ns
+    ):
+        return known["fingerprint"]
+    fingerprint = file_fingerprint(path)
+    upload_map["fingerprints"][os.path.abspath(path)] = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "fingerprint": fingerprint,
+    }
+    return fingerprint
+
+
+def _prepare_upload(
+    path: str, variant_key: str, columns: list[str] | None, compress: bool
+) -> tuple[str, str]:
+    """Write the column-pruned / zipped variant of a CSV, returns (path, filename)."""
+    uploads_dir = _uploads_dir()
+    name = os.path.splitext(os.path.basename(path))[0]
+    tag = hashlib.sha256(variant_key.encode("utf-8")).hexdigest()[:12]
+    csv_path = path
+    if columns:
+        import pandas as pd
+
+        csv_path = os.path.join(uploads_dir, f"{name}-{tag}.csv")
+        if not os.path.exists(csv_path):
+            os.makedirs(uploads_dir, exist_ok=True)
+            pd.read_csv(path, usecols=columns).to_csv(csv_path, index=False)
+    if not compress:
+        return csv_path, f"{name}.csv"
+
+    zip_path = os.path.join(uploads_dir, f"{name}-{tag}.zip")
+    if not os.path.exists(zip_path):
+        os.makedirs(uploads_dir, exist_ok=True)
+        with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as z:
+            z.write(csv_path, arcname=f"{name}.csv")
+    return zip_path, f"{name}.zip"
+
+
+@prioritized(BACKGROUND)
+async def upload_dataset(
+    client: AIProjectClient,
+    file_path: str,
+    purpose: FilePurpose | None = None,
+    columns: list[str] | None = None,
+    compress: bool = False,
+) -> str:
+    """
+    Upload a dataset for the agents (e.g. code interpreter) once, returns the file id.
+
+    Files are fingerprinted (sha256 + size); an upload of the same content that still
+    exists in `files.list` is reused instead of uploading again. `columns` uploads only
+    those CSV columns, `compress` uploads a zip of the (pruned) CSV.
+    """
+    from azure.ai.agents.models import FilePurpose
+
+    purpose = purpose or FilePurpose.AGENTS
+    upload_map = _load_upload_map()
+    fingerprint = await asyncio.to_thread(_cached_fingerprint, upload_map, file_path)
+    variant_key = fingerprint
+    if columns:
+        variant_key += f"|columns={','.join(columns)}"
+    if compress:
+        variant_key += "|zip"
+
+    known = upload_map["uploads"].get(variant_key)
+    if known:
+        remote = await client.agents.files.list(purpose=purpose)
+        remote_file = next((f for f in remote.data if f.id == known["file_id"]), None)
+        if remote_file is not None and remote_file.status not in ("error", "deleted"):
+            print(f"Reusing uploaded file {known['file_id']} for {file_path}")
+            _save_upload_map(upload_map)
+            return known["file_id"]
+
+    upload_path, filename = await asyncio.to_thread(
+        _prepare_upload, file_path, variant_key, columns, compress
+    )
+    file = await client.agents.files.upload_and_poll(
+        file_path=upload_path, filename=filename, purpose=purpose
+    )
+    print(
+        f"Uploaded {filename} ({os.path.getsize(upload_path)} bytes) as file {file.id}"
+    )
+    upload_map["uploads"][variant_key] = {
+        "file_id": file.id,
+        "filename": filename,
+        "bytes": os.path.getsize(upload_path),
+        "source": os.path.abspath(file_path),
+        "uploaded_at": time.time(),
+    }
+    _save_upload_map(upload_map)
+    return file.id
+
+
+class ConnectionDirectory:
+    """
+    Caches the project's connections so name lookups don't re-list them every time.
+
+    The listing is fetched once and indexed by exact name and lower-cased name;
+    substring lookups (the historical behaviour of `get_connection_by_name`) fall
+    back to a scan and are memoized. The directory is refreshed after `ttl` seconds
+    or explicitly via `invalidate()`.
+    """
+
+    def __init__(self, client: AIProjectClient, ttl: float = 300.0):
+        self.client = client
+        self.ttl = ttl
+
+        self._connections: list[Any] = []
+        self._by_name: dict[str, Any] = {}
+        self._by_lower_name: dict[str, Any] = {}
+        self._by_substring: dict[str, Any] = {}
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def is_fresh(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    def invalidate(self) -> None:
+        """Drop the cached listing; the next lookup lists connections again."""
+        self._loaded_at = None
+
+    async def refresh(self) -> None:
+        """List all connections once and rebuild the indexes."""
+        connections = [c async for c in self.client.connections.list()]
+
+        by_name: dict[str, Any] = {}
+        by_lower_name: dict[str, Any] = {}
+        for connection in connections:
+            # keep the first occurrence, same as the original linear scan
+            by_name.setdefault(connection.name, connection)
+            by_lower_name.setdefault(connection.name.lower(), connection)
+
+        self._connections = connections
+        self._by_name = by_name
+        self._by_lower_name = by_lower_name
+        self._by_substring = {}
+        self._loaded_at = time.monotonic()
+
+        if _environment()["is_debug"]:
+            print(f"Connection directory loaded {len(connections)} connections")
+
+    async def _ensure_loaded(self) -> None:
+        if self.is_fresh():
+            return
+        async with self._lock:
+            # another coroutine may have refreshed while we were waiting
+            if not self.is_fresh():
+                await self.refresh()
+
+    def _lookup(self, name: str) -> Any | None:
+        connection = self._by_name.get(name)
+        if connection is not None:
+            return connection
+
+        lowered = name.lower()
+        connection = self._by_lower_name.get(lowered)
+        if connection is not None:
+            return connection
+
+        if lowered not in self._by_substring:
+            self._by_substring[lowered] = next(
+                (c for c in self._connections if lowered in c.name.lower()), None
+            )
+        return self._by_substring[lowered]
+
+    async def get(self, name: str) -> Any | None:
+        """Get the connection object for a name (exact, case-insensitive, substring)."""
+        await self._ensure_loaded()
+        return self._lookup(name)
+
+    async def resolve(self, name: str) -> str | None:
+        """Resolve a connection name to its ID."""
+        connection = await self.get(name)
+        return connection.id if connection is not None else None
+
+    async def resolve_many(self, names: Iterable[str]) -> dict[str, str | None]:
+        """Resolve many names against a single listing of the connections."""
+        await self._ensure_loaded()
+        resolved: dict[str, str | None] = {}
+        for name in names:
+            connection = self._lookup(name)
+            resolved[name] = connection.id if connection is not None else None
+        return resolved
+
+
+_connection_directories: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_connection_directory(
+    client: AIProjectClient, ttl: float = 300.0
+) -> ConnectionDirectory:
+    """Get the (per client) shared connection directory."""
+    directory = _connection_directories.get(client)
+    if directory is None:
+        directory = ConnectionDirectory(client, ttl=ttl)
+        _connection_directories[client] = directory
+    return directory
+
+
 async def get_connection_by_name(client: AIProjectClient, name: str) -> str:
-    # Implement logic to retrieve the connection ID by name
-    async for connection in client.connections.list():
-        if connection.name.lower().rfind(name.lower()) >= 0:
-            return connection.id
+    """Retrieve the connection ID by name using the cached connection directory."""
+    return await get_connection_directory(client).resolve(name)
+
+
+async def get_connections_by_name(
+    client: AIProjectClient, names: Iterable[str]
+) -> dict[str, str | None]:
+    """Retrieve the connection IDs for many names in one pass."""
+    return await get_connection_directory(client).resolve_many(names)
+
+
+@dataclass
+class TurnStats:
+    """Latency numbers of a single streamed agent turn."""
+
+    started_at: float = field(default_factory=time.perf_counter)
+    first_token_at: float | None = None
+    finished_at: float | None = None
+    text_chars: int = 0
+    chunks: int = 0
+    function_calls: int = 0
+
+    def mark_token(self, text: str) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.text_chars += len(text)
+        self.chunks += 1
+
+    @property
+    def time_to_first_token(self) -> float | None:
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    @property
+    def duration(self) -> float:
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    @property
+    def approx_tokens(self) -> int:
+        # the agents stream doesn't report usage; ~4 characters per token
+        return max(self.chunks, round(self.text_chars / 4))
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        if self.first_token_at is None:
+            return None
+        generation = (self.finished_at or time.perf_counter()) - self.first_token_at
+        return self.approx_tokens / generation if generation > 0 else None
+
+
+class StreamSink:
+    """
+    Receives a streamed agent turn as it arrives; override the hooks you need.
+    """
+
+    def __init__(self):
+        self.stats_history: list[TurnStats] = []
 
+    def on_turn_start(self, user_message: str) -> None:
+        pass
 
+    def on_text(self, text: str) -> None:
+        pass
+
+    def on_code(self, code: str) -> None:
+        pass
+
+    def on_function_call(self, item: FunctionCallContent) -> None:
+        pass
+
+    def on_function_result(self, item: FunctionResultContent) -> None:
+        pass
+
+    def on_file(self, file_id: str) -> None:
+        """Called when a file reference arrives; the download runs in the background."""
+        pass
+
+    def on_file_ready(self, file_id: str, path: str) -> None:
+        pass
+
+    def on_turn_end(self, stats: TurnStats) -> None:
+        self.stats_history.append(stats)
+
+
+class ConsoleStreamSink(StreamSink):
+    """Prints the streamed turn the same way `test_agent` prints full messages."""
+
+    def __init__(self):
+        super().__init__()
+        self._mode: str | None = None
+
+    def _switch(self, mode: str | None) -> None:
+        if mode == self._mode:
+            return
+        if self._mode == "code":
+            print("\n------- CODE END ------------")
+        elif self._mode == "text":
+            print()
+        if mode == "code":
+            print("------- CODE START ----------")
+        elif mode == "text":
+            print("Agent: ", end="")
+        self._mode = mode
+
+    def on_text(self, text: str) -> None:
+        self._switch("text")
+        print(text, end="", flush=True)
+
+    def on_code(self, code: str) -> None:
+        self._switch("code")
+        print(code, end="", flush=True)
+
+    def on_function_call(self, item: FunctionCallContent) -> None:
+        self._switch(None)
+        print(f"Function Call:> {item.name} with arguments: {item.arguments}")
+
+    def on_function_result(self, item: FunctionResultContent) -> None:
+        self._switch(None)
+        print(f"Function Result:> {item.result} for function: {item.name}")
+
+    def on_file(self, file_id: str) -> None:
+        self._switch(None)
+
+    def on_file_ready(self, file_id: str, path: str) -> None:
+        self._switch(None)
+        print(f"Downloaded file: {file_id} saved as {path}")
+
+    def on_turn_end(self, stats: TurnStats) -> None:
+        super().on_turn_end(stats)
+        self._switch(None)
+        ttft = stats.time_to_first_token
+        tps = stats.tokens_per_second
+        print(
+            f"[turn] time to first token: {f'{ttft:.2f}s' if ttft is not None else 'n/a'}, "
+            f"total: {stats.duration:.2f}s, ~{stats.approx_tokens} tokens"
+            + (f" ({tps:.1f} tokens/s)" if tps else "")
+        )
+
+
+_file_download_managers: (
+    "weakref.WeakKeyDictionary[AIProjectClient, FileDownloadManager]"
+) = weakref.WeakKeyDictionary()
+
+
+def get_file_download_manager(client: AIProjectClient) -> FileDownloadManager:
+    """Get the shared (per client) background file downloader."""
+    from file_downloads import FileDownloadManager
+
+    manager = _file_download_managers.get(client)
+    if manager is None:
+        manager = _file_download_managers[client] = FileDownloadManager(client)
+    return manager
+
+
+async def _collect_files(
+    downloads: FileDownloadManager,
+    file_ids: list[str],
+    display_files: bool,
+    sink: StreamSink | None = None,
+) -> dict[str, str]:
+    paths = await downloads.drain(file_ids)
+    for file_id in file_ids:
+        path = paths.get(file_id)
+        if path is None:
+            continue
+        if sink:
+            sink.on_file_ready(file_id, path)
+        else:
+            print(f"Downloaded file: {file_id} saved as {path}")
+        if display_files:
+            from file_downloads import display_file
+
+            display_file(path)
+    return paths
+
+
+async def _stream_agent_turn(
+    client: AIProjectClient,
+    agent: AzureAIAgent,
+    user_message: str,
+    thread: AzureAIAgentThread,
+    sink: StreamSink,
+    downloads: FileDownloadManager,
+    display_files: bool,
+    context_budget: ThreadContextBudget | None = None,
+    turn: TurnRecord | None = None,
+    invoke_kwargs: dict[str, Any] | None = None,
+    tracer: ToolCallTracer | None = None,
+    trace_turn: int | None = None,
+) -> AzureAIAgentThread:
+    from semantic_kernel.contents import (
+        FileReferenceContent,
+        FunctionCallContent,
+        FunctionResultContent,
+        StreamingFileReferenceContent,
+        StreamingTextContent,
+    )
+
+    stats = TurnStats()
+    file_ids: list[str] = []
+    sink.on_turn_start(user_message)
+
+    async def on_stream_intermediate_message(agent_response: ChatMessageContent):
+        if tracer is not None:
+            tracer.on_message(agent_response)
+        for item in agent_response.items or []:
+            if turn is not None:
+                context_budget.observe(turn, item)
+            if isinstance(item, FunctionCallContent):
+                stats.function_calls += 1
+                sink.on_function_call(item)
+            elif isinstance(item, FunctionResultContent):
+                sink.on_function_result(item)
+
+    try:
+        async for agent_response in agent.invoke_stream(
+            messages=user_message,
+            thread=thread,
+            additional_instructions="Today is " + date.today().strftime("%Y-%m-%d"),
+            on_intermediate_message=on_stream_intermediate_message,
+            **(invoke_kwargs or {}),
+        ):
+            is_code = bool((agent_response.metadata or {}).get("code"))
+            for item in agent_response.items or []:
+                if isinstance(item, StreamingTextContent) and item.text:
+                    stats.mark_token(item.text)
+                    if is_code:
+                        sink.on_code(item.text)
+                    else:
+                        sink.on_text(item.text)
+                        if turn is not None:
+                            turn.reply += item.text
+                elif isinstance(
+                    item, (FileReferenceContent, StreamingFileReferenceContent)
+                ):
+                    if item.file_id not in file_ids:
+                        file_ids.append(item.file_id)
+                        downloads.submit(item.file_id)
+                        sink.on_file(item.file_id)
+            thread = agent_response.thread
+    finally:
+        stats.finished_at = time.perf_counter()
+        sink.on_turn_end(stats)
+    if turn is not None and thread.id is not None:
+        context_budget.end_turn(thread, turn)
+    if tracer is not None:
+        tracer.record_run(thread.id, None)
+        await _end_traced_turn(tracer, client, trace_turn)
+    await _collect_files(downloads, file_ids, display_files, sink)
+    return thread
+
+
+@prioritized(INTERACTIVE)
 async def test_agent(
     client: AIProjectClient,
     agent: AzureAIAgent,
     user_message: str,
     thread: AzureAIAgentThread = None,
+    stream: bool = False,
+    sink: StreamSink | None = None,
+    downloads: FileDownloadManager | None = None,
+    display_files: bool = True,
+    context_budget: ThreadContextBudget | None = None,
+    tracer: ToolCallTracer | None = None,
 ) -> AzureAIAgentThread:
+    """
+    Send a message to the agent and print the response.
+
+    With `stream=True` the response is streamed through `sink` (console by default)
+    as it is generated, and time-to-first-token / tokens per second are reported.
+
+    Files referenced in the response are downloaded concurrently in the background
+    (deduplicated and cached by file id) and shown once the response is complete.
+
+    With a `context_budget` the thread's size is tracked per turn; a thread over
+    budget continues as a new thread seeded with a digest of the older turns, so
+    the returned thread may differ from the one passed in.
+
+    Tool calls are recorded on `tracer` (the shared `tracing.get_tool_tracer()` by
+    default) with timings, sizes and the agent that ran them; a per tool summary
+    is printed after the response. When the tracer reads run steps (AGENTS_TRACE),
+    the summary waits for them, so server-side tool calls are included.
+    """
+    from semantic_kernel.agents import AzureAIAgentThread
+    from semantic_kernel.contents import FileReferenceContent, TextContent
+    from tracing import get_tool_tracer
+
+    tracer = tracer or get_tool_tracer()
+    tracer.install(agent.kernel)
+    trace = tracer.begin_turn(agent.name, user_message)
     try:
+        turn = None
+        invoke_kwargs: dict[str, Any] = {}
+        if context_budget is not None:
+            thread, invoke_kwargs = await context_budget.prepare(client, thread)
+            turn = context_budget.begin_turn(user_message)
         thread = thread or AzureAIAgentThread(client=client)
+        downloads = downloads or get_file_download_manager(client)
+        if stream:
+            return await _stream_agent_turn(
+                client,
+                agent,
+                user_message,
+                thread,
+                sink or ConsoleStreamSink(),
+                downloads,
+                display_files,
+                context_budget,
+                turn,
+                invoke_kwargs,
+                tracer,
+                trace.turn,
+            )
+
+        async def on_message(agent_response: ChatMessageContent):
+            await on_intermediate_message(agent_response, tracer)
+            if turn is not None:
+                for item in agent_response.items or []:
+                    context_budget.observe(turn, item)
+
+        file_ids: list[str] = []
         async for agent_response in agent.invoke(
             messages=user_message,
             thread=thread,
             additional_instructions="Today is " + date.today().strftime("%Y-%m-%d"),
-            on_intermediate_message=on_intermediate_message,
+            on_intermediate_message=on_message,
+            **invoke_kwargs,
         ):
             for item in agent_response.items or []:
                 if isinstance(item, TextContent):
@@ -202,18 +1041,451 @@ async def test_agent(
                         print("------- CODE END ------------")
                     else:
                         print(f"Agent: {item.text}")
+                        if turn is not None:
+                            turn.reply += item.text
                 elif isinstance(item, FileReferenceContent):
-                    await client.agents.files.save(
-                        file_id=item.file_id,
-                        file_name=f"downloaded__{item.file_id}.png",
-                    )
-                    print(
-                        f"Downloaded file: {item.file_id} saved as downloaded__{item.file_id}.png"
-                    )
-                    from IPython.display import Image, display
-
-                    display(Image(f"downloaded__{item.file_id}.png"))
+                    if item.file_id not in file_ids:
+                        file_ids.append(item.file_id)
+                        downloads.submit(item.file_id)
+            metadata = agent_response.metadata or {}
+            tracer.record_run(metadata.get("thread_id"), metadata.get("run_id"))
             thread = agent_response.thread
+        if turn is not None and thread.id is not None:
+            context_budget.end_turn(thread, turn)
+        tracer.record_run(thread.id, None)
+        await _end_traced_turn(tracer, client, trace.turn)
+        await _collect_files(downloads, file_ids, display_files)
         return thread
     except Exception as e:
         print(f"Agent: {e}")
+    finally:
+        # no-op when the turn already ended
+        tracer.end_turn(client)
+
+
+@dataclass
+class SubTask:
+    """An independent sub-task of a plan, for one of the already created sub-agents."""
+
+    agent: AzureAIAgent
+    prompt: str
+    name: str | None = None
+
+    @property
+    def label(self) -> str:
+        return self.name or self.agent.name
+
+
+@dataclass
+class SubTaskResult:
+    task: SubTask
+    output: str = ""
+    error: str | None = None
+    duration: float = 0.0
+    thread_id: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def _run_sub_task(
+    client: AIProjectClient,
+    task: SubTask,
+    semaphore: asyncio.Semaphore | None,
+    timeout: float | None,
+    keep_threads: bool,
+    tracer: ToolCallTracer,
+) -> SubTaskResult:
+    from semantic_kernel.agents import AzureAIAgentThread
+    from semantic_kernel.contents import TextContent
+
+    result = SubTaskResult(task)
+    thread = AzureAIAgentThread(client=client)
+
+    async def invoke() -> None:
+        async for agent_response in task.agent.invoke(
+            messages=task.prompt,
+            thread=thread,
+            additional_instructions="Today is " + date.today().strftime("%Y-%m-%d"),
+            on_intermediate_message=lambda m: on_intermediate_message(m, tracer),
+        ):
+            for item in agent_response.items or []:
+                if isinstance(item, TextContent) and not item.metadata.get("code"):
+                    result.output += item.text
+            tracer.record_run(thread.id, (agent_response.metadata or {}).get("run_id"))
+
+    collecting = None
+    async with semaphore or contextlib.nullcontext():
+        tracer.install(task.agent.kernel)
+        tracer.begin_turn(task.agent.name, task.prompt)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(invoke(), timeout)
+        except asyncio.TimeoutError:
+            result.error = f"timed out after {timeout}s"
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        finally:
+            result.duration = time.perf_counter() - started
+            result.thread_id = thread.id
+            tracer.record_run(thread.id, None)
+            collecting = tracer.end_turn(client)
+
+    if not keep_threads and thread.id is not None:
+        if collecting is not None:
+            # the tracer reads the run steps before the thread goes away
+            await asyncio.gather(collecting, return_exceptions=True)
+        with contextlib.suppress(Exception):
+            await thread.delete()
+    return result
+
+
+@prioritized(INTERACTIVE)
+async def fan_out(
+    client: AIProjectClient,
+    plan: Iterable[SubTask],
+    max_concurrency: int | None = None,
+    timeout: float | None = None,
+    keep_threads: bool = False,
+    tracer: ToolCallTracer | None = None,
+) -> list[SubTaskResult]:
+    """
+    Run independent sub-tasks concurrently, each on its own thread.
+
+    Results are returned in plan order; a failing (or timed out) sub-task is reported
+    on its result instead of failing the others.
+    """
+    from tracing import get_tool_tracer
+
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+    return await asyncio.gather(
+        *(
+            _run_sub_task(
+                client,
+                task,
+                semaphore,
+                timeout,
+                keep_threads,
+                tracer or get_tool_tracer(),
+            )
+            for task in plan
+        )
+    )
+
+
+def merge_sub_task_results(results: Iterable[SubTaskResult]) -> str:
+    """Combine sub-task results into a single message for the main agent."""
+    sections = []
+    for result in results:
+        body = result.output.strip() if result.ok else f"FAILED: {result.error}"
+        sections.append(f"### {result.task.label}\nTask: {result.task.prompt}\n{body}")
+    return "\n\n".join(sections)
+
+
+async def orchestrate(
+    client: AIProjectClient,
+    main_agent: AzureAIAgent,
+    user_message: str,
+    plan: Iterable[SubTask],
+    thread: AzureAIAgentThread = None,
+    max_concurrency: int | None = None,
+    timeout: float | None = None,
+    **test_agent_kwargs: Any,
+) -> AzureAIAgentThread:
+    """
+    Fan the plan's sub-tasks out to the sub-agents, then let the main agent finish.
+
+    The sub-agents run concurrently instead of one at a time as connected agents
+    inside the main agent's run, so the fan-out takes about as long as the slowest
+    sub-agent. Their merged results are sent to the main agent with `user_message`.
+    """
+    started = time.perf_counter()
+    results = await fan_out(
+        client, plan, max_concurrency=max_concurrency, timeout=timeout
+    )
+    for result in results:
+        status = "ok" if result.ok else result.error
+        print(f"Sub-task {result.task.label}: {result.duration:.2f}s ({status})")
+    print(
+        f"Fan-out of {len(results)} sub-tasks took {time.perf_counter() - started:.2f}s "
+        f"(sum {sum(r.duration for r in results):.2f}s)"
+    )
+    message = (
+        f"{user_message}\n\n"
+        "These sub-tasks were already done by the connected agents, use their results "
+        "instead of calling the agents again for them:\n\n"
+        f"{merge_sub_task_results(results)}"
+    )
+    return await test_agent(client, main_agent, message, thread, **test_agent_kwargs)
+
+
+@dataclass
+class _PooledServer:
+    plugin: MCPStdioPlugin
+    started_at: float
+    last_checked: float
+    uses: int = 0
+
+
+class _CommandPool:
+    def __init__(self, key: tuple, factory):
+        self.key = key
+        self.factory = factory
+        self.idle: list[_PooledServer] = []
+        self.busy = 0
+        self.starting = 0
+        self.condition = asyncio.Condition()
+        self.started = 0
+        self.recycled = 0
+        self.failed_checks = 0
+        self.leases = 0
+        self.wait_times: list[float] = []
+
+    @property
+    def size(self) -> int:
+        return len(self.idle) + self.busy + self.starting
+
+
+class MCPServerPool:
+    """
+    Pre-started stdio MCP servers (`MCPStdioPlugin`), leased per command line.
+
+    Starting e.g. `npx @playwright/mcp@latest` costs npx resolution, Node startup and
+    a browser launch. The pool keeps up to `size` servers per command line running
+    and leases them to kernels / agents; idle servers are pinged before reuse when
+    they haven't been checked for `health_check_interval` seconds, and a server is
+    replaced after `max_uses` leases or when a lease fails.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_uses: int = 20,
+        health_check_interval: float = 30.0,
+    ):
+        self.size = size
+        self.max_uses = max_uses
+        self.health_check_interval = health_check_interval
+        self._pools: dict[tuple, _CommandPool] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def _key(command: str, args: list[str] | None, env: dict[str, str] | None):
+        return (command, tuple(args or ()), tuple(sorted((env or {}).items())))
+
+    def _pool(
+        self,
+        name: str,
+        command: str,
+        args: list[str] | None,
+        env: dict[str, str] | None,
+        plugin_kwargs: dict[str, Any],
+    ) -> _CommandPool:
+        key = self._key(command, args, env)
+        pool = self._pools.get(key)
+        if pool is None:
+
+            def factory() -> MCPStdioPlugin:
+                from semantic_kernel.connectors.mcp import MCPStdioPlugin
+
+                return MCPStdioPlugin(
+                    name=name, command=command, args=args, env=env, **plugin_kwargs
+                )
+
+            pool = self._pools[key] = _CommandPool(key, factory)
+        return pool
+
+    async def _start(self, pool: _CommandPool) -> _PooledServer:
+        plugin = pool.factory()
+        try:
+            await plugin.connect()
+        except BaseException:
+            async with pool.condition:
+                pool.starting -= 1
+                pool.condition.notify()
+            raise
+        pool.started += 1
+        now = time.perf_counter()
+        return _PooledServer(plugin, started_at=now, last_checked=now)
+
+    async def _is_healthy(self, pool: _CommandPool, server: _PooledServer) -> bool:
+        if time.perf_counter() - server.last_checked < self.health_check_interval:
+            return True
+        try:
+            await asyncio.wait_for(server.plugin.session.send_ping(), 10)
+        except Exception:
+            pool.failed_checks += 1
+            return False
+        server.last_checked = time.perf_counter()
+        return True
+
+    async def _retire(self, pool: _CommandPool, server: _PooledServer) -> None:
+        pool.recycled += 1
+        with contextlib.suppress(Exception):
+            await server.plugin.close()
+
+    async def _replenish(self, pool: _CommandPool) -> None:
+        # start a replacement for a retired server so the next lease doesn't wait
+        async with pool.condition:
+            if pool.size >= self.size:
+                return
+            pool.starting += 1
+        try:
+            server = await self._start(pool)
+        except Exception as e:
+            print(f"Could not restart MCP server {' '.join(pool.key[:1])}: {e}")
+            return
+        async with pool.condition:
+            pool.starting -= 1
+            pool.idle.append(server)
+            pool.condition.notify()
+
+    def _replenish_in_background(self, pool: _CommandPool) -> None:
+        task = asyncio.ensure_future(self._replenish(pool))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _acquire(self, pool: _CommandPool) -> _PooledServer:
+        while True:
+            async with pool.condition:
+                while not pool.idle and pool.size >= self.size:
+                    await pool.condition.wait()
+                if pool.idle:
+                    server = pool.idle.pop()
+                    pool.busy += 1
+                else:
+                    server = None
+                    pool.starting += 1
+            if server is None:
+                server = await self._start(pool)
+                async with pool.condition:
+                    pool.starting -= 1
+                    pool.busy += 1
+                return server
+            if await self._is_healthy(pool, server):
+                return server
+            await self._retire(pool, server)
+            async with pool.condition:
+                pool.busy -= 1
+                pool.condition.notify()
+
+    async def _release(
+        self, pool: _CommandPool, server: _PooledServer, failed: bool
+    ) -> None:
+        server.uses += 1
+        retire = failed or server.uses >= self.max_uses
+        if retire:
+            await self._retire(pool, server)
+        async with pool.condition:
+            pool.busy -= 1
+            if not retire:
+                pool.idle.append(server)
+            pool.condition.notify()
+        if retire:
+            self._replenish_in_background(pool)
+
+    async def warm(
+        self,
+        name: str,
+        command: str,
+        args: list[str] | None = None,
+        env: dict[str, str] | None = None,
+        count: int | None = None,
+        **plugin_kwargs: Any,
+    ) -> None:
+        """Start servers for a command line ahead of time (up to the pool size)."""
+        pool = self._pool(name, command, args, env, plugin_kwargs)
+        count = min(count or self.size, self.size)
+        async with pool.condition:
+            missing = max(0, count - pool.size)
+            pool.starting += missing
+        servers = await asyncio.gather(
+            *(self._start(pool) for _ in range(missing)), return_exceptions=True
+        )
+        async with pool.condition:
+            for server in servers:
+                if isinstance(server, _PooledServer):
+                    pool.starting -= 1
+                    pool.idle.append(server)
+            pool.condition.notify_all()
+        errors = [s for s in servers if isinstance(s, BaseException)]
+        if errors:
+            raise errors[0]
+
+    @contextlib.asynccontextmanager
+    async def lease(
+        self,
+        name: str,
+        command: str,
+        args: list[str] | None = None,
+        env: dict[str, str] | None = None,
+        kernel: Kernel | None = None,
+        plugin_name: str | None = None,
+        **plugin_kwargs: Any,
+    ):
+        """
+        Lease a running server for `command args`, added to `kernel` while leased.
+
+        An exception inside the `async with` block retires the server.
+        """
+        pool = self._pool(name, command, args, env, plugin_kwargs)
+        requested = time.perf_counter()
+        server = await self._acquire(pool)
+        pool.wait_times.append(time.perf_counter() - requested)
+        pool.leases += 1
+        plugin_name = plugin_name or name
+        if kernel is not None:
+            kernel.add_plugin(server.plugin, plugin_name=plugin_name)
+        failed = False
+        try:
+            yield server.plugin
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            if kernel is not None:
+                kernel.plugins.pop(plugin_name, None)
+            await self._release(pool, server, failed)
+
+    def stats(self) -> dict[str, Any]:
+        stats = {}
+        for (command, args, _), pool in self._pools.items():
+            waits = sorted(pool.wait_times)
+            stats[" ".join((command, *args))] = {
+                "idle": len(pool.idle),
+                "busy": pool.busy,
+                "started": pool.started,
+                "recycled": pool.recycled,
+                "failed_health_checks": pool.failed_checks,
+                "leases": pool.leases,
+                "wait_ms": (
+                    {
+                        "p50": waits[len(waits) // 2] * 1000,
+                        "p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))]
+                        * 1000,
+                        "max": waits[-1] * 1000,
+                    }
+                    if waits
+                    else {}
+                ),
+            }
+        return stats
+
+    async def close(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        for pool in self._pools.values():
+            async with pool.condition:
+                idle, pool.idle = pool.idle, []
+            for server in idle:
+                with contextlib.suppress(Exception):
+                    await server.plugin.close()
+        self._pools.clear()
+
+
+mcp_server_pool = MCPServerPool()
+
+
+def get_mcp_pool_stats() -> dict[str, Any]:
+    return mcp_server_pool.stats()
@@ -0,0 +1,243 @@
+"""Keep long agent conversations within a context token budget.
+
+Every turn on an `AzureAIAgentThread` resends the whole thread, including the large
+tool results of earlier turns, so follow-up turns get slower and more expensive as
+the conversation grows. `ThreadContextBudget` records the (approximate) tokens of
+each turn - user message, function calls / results and the reply - and once a
+thread is over `max_tokens` rolls the conversation over to a new thread that starts
+with:
+
+* a compact digest of the older turns (questions, tool names + truncated results,
+  first part of each reply), built locally without an extra model call, and
+* the last `keep_turns` turns, with their tool results truncated.
+
+`truncate_last_messages` additionally asks the service to only use the last N
+messages of a thread for each run (`truncation_strategy`).
+
+    budget = ThreadContextBudget(max_tokens=6000)
+    thread = await test_agent(client, agent, "...", thread, context_budget=budget)
+"""
+
+from __future__ import annotations
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from azure.ai.agents.models import (
+    MessageRole,
+    ThreadMessageOptions,
+    TruncationObject,
+    TruncationStrategy,
+)
+from azure.ai.projects.aio import AIProjectClient
+from semantic_kernel.agents import AzureAIAgentThread
+from semantic_kernel.contents import FunctionCallContent, FunctionResultContent
+
+
+def approx_tokens(text: str) -> int:
+    # the agents service doesn't report usage per message; ~4 characters per token
+    return round(len(text) / 4)
+
+
+def _shorten(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else f"{text[:limit]}... [{len(text)} chars]"
+
+
+@dataclass
+class ToolExchange:
+    name: str
+    arguments: str = ""
+    result: str = ""
+
+
+@dataclass
+class TurnRecord:
+    user: str
+    reply: str = ""
+    tools: List[ToolExchange] = field(default_factory=list)
+    # set on digest / compacted turns carried over to a new thread
+    carried: bool = False
+
+    @property
+    def tokens(self) -> int:
+        return (
+            approx_tokens(self.user)
+            + approx_tokens(self.reply)
+            + sum(
+                approx_tokens(t.name)
+                + approx_tokens(t.arguments)
+                + approx_tokens(t.result)
+                for t in self.tools
+            )
+        )
+
+
+class ThreadContextBudget:
+    """Tracks per-turn token usage of agent threads and rolls them over when too big."""
+
+    def __init__(
+        self,
+        max_tokens: int = 8000,
+        keep_turns: int = 2,
+        max_result_chars: int = 400,
+        digest_chars: int = 200,
+        truncate_last_messages: Optional[int] = None,
+        delete_rolled_over: bool = False,
+    ):
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.max_result_chars = max_result_chars
+        self.digest_chars = digest_chars
+        self.truncate_last_messages = truncate_last_messages
+        self.delete_rolled_over = delete_rolled_over
+
+        # thread id -> turns on that thread
+        self._turns: Dict[str, List[TurnRecord]] = {}
+        self._pending: Dict[int, List[TurnRecord]] = {}
+        self.rollovers = 0
+        self.tokens_dropped = 0
+
+    def turns(self, thread: Optional[AzureAIAgentThread]) -> List[TurnRecord]:
+        if thread is None:
+            return []
+        if thread.id is None:
+            return self._pending.get(id(thread), [])
+        return self._turns.get(thread.id, [])
+
+    def tokens(self, thread: Optional[AzureAIAgentThread]) -> int:
+        return sum(turn.tokens for turn in self.turns(thread))
+
+    # region turn tracking
+
+    def begin_turn(self, user_message: str) -> TurnRecord:
+        return TurnRecord(user=user_message)
+
+    def observe(self, turn: TurnRecord, item: Any) -> None:
+        """Record a function call / result from an intermediate message."""
+        if isinstance(item, FunctionCallContent):
+            arguments = item.arguments
+            if not isinstance(arguments, str):
+                arguments = json.dumps(arguments, default=str)
+            turn.tools.append(ToolExchange(item.name or "", arguments or ""))
+        elif isinstance(item, FunctionResultContent):
+            result = str(item.result)
+            for tool in reversed(turn.tools):
+                if tool.name == item.name and not tool.result:
+                    tool.result = result
+                    break
+            else:
+                turn.tools.append(ToolExchange(item.name or "", "", result))
+
+    def end_turn(self, thread: AzureAIAgentThread, turn: TurnRecord) -> None:
+        turns = self._pending.pop(id(thread), None) or self._turns.get(thread.id, [])
+        turns.append(turn)
+        self._turns[thread.id] = turns
+
+    # endregion
+
+    # region compaction
+
+    def _compact(self, turn: TurnRecord) -> str:
+        lines = []
+        for tool in turn.tools:
+            lines.append(
+                f"[tool {tool.name}({_shorten(tool.arguments, 120)}) -> "
+                f"{_shorten(tool.result, self.max_result_chars)}]"
+            )
+        if turn.reply:
+            lines.append(turn.reply)
+        return "\n".join(lines)
+
+    def digest(self, turns: List[TurnRecord]) -> str:
+        """Compact, extractive digest of earlier turns (no model call)."""
+        lines = ["Summary of the earlier conversation:"]
+        for turn in turns:
+            if turn.carried and not turn.user:
+                lines.append(turn.reply)
+                continue
+            lines.append(f"- User asked: {_shorten(turn.user, self.digest_chars)}")
+            tools = sorted({t.name for t in turn.tools if t.name})
+            if tools:
+                lines.append(f"  Tools used: {', '.join(tools)}")
+            if turn.reply:
+                lines.append(f"  Answer: {_shorten(turn.reply, self.digest_chars)}")
+        return "\n".join(lines)
+
+    async def _rollover(
+        self, client: AIProjectClient, thread: AzureAIAgentThread
+    ) -> AzureAIAgentThread:
+        turns = self._turns.pop(thread.id)
+        split = len(turns) - self.keep_turns
+        older, recent = turns[:split], turns[split:]
+        before = sum(turn.tokens for turn in turns)
+
+        digest = TurnRecord(user="", reply=self.digest(older), carried=True)
+        carried = [digest]
+        messages = [ThreadMessageOptions(role=MessageRole.AGENT, content=digest.reply)]
+        for turn in recent:
+            compacted = TurnRecord(
+                user=turn.user, reply=self._compact(turn), carried=True
+            )
+            carried.append(compacted)
+            messages.append(
+                ThreadMessageOptions(role=MessageRole.USER, content=turn.user)
+            )
+            if compacted.reply:
+                messages.append(
+                    ThreadMessageOptions(
+                        role=MessageRole.AGENT, content=compacted.reply
+                    )
+                )
+
+        new_thread = AzureAIAgentThread(client=client, messages=messages)
+        self._pending[id(new_thread)] = carried
+        self.rollovers += 1
+        self.tokens_dropped += before - sum(turn.tokens for turn in carried)
+        print(
+            f"Thread {thread.id} is ~{before} tokens (budget {self.max_tokens}), "
+            f"continuing in a new thread with a digest of {len(older)} turn(s)"
+        )
+        if self.delete_rolled_over:
+            await thread.delete()
+        return new_thread
+
+    # endregion
+
+    async def prepare(
+        self, client: AIProjectClient, thread: Optional[AzureAIAgentThread]
+    ) -> Tuple[Optional[AzureAIAgentThread], Dict[str, Any]]:
+        """Thread to use for the next turn (rolled over if needed) + invoke kwargs."""
+        kwargs: Dict[str, Any] = {}
+        if self.truncate_last_messages:
+            kwargs["truncation_strategy"] = TruncationObject(
+                type=TruncationStrategy.LAST_MESSAGES,
+                last_messages=self.truncate_last_messages,
+            )
+        if (
+            thread is not None
+            and thread.id in self._turns
+            and self.tokens(thread) > self.max_tokens
+            and len(self._turns[thread.id]) > self.keep_turns
+        ):
+            thread = await self._rollover(client, thread)
+        return thread, kwargs
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threads": len(self._turns),
+            "tokens": {
+                thread_id: sum(t.tokens for t in turns)
+                for thread_id, turns in self._turns.items()
+            },
+            "rollovers": self.rollovers,
+            "tokens_dropped": self.tokens_dropped,
+        }
+
+
+__all__ = [
+    "ThreadContextBudget",
+    "ToolExchange",
+    "TurnRecord",
+    "approx_tokens",
+]
@@ -0,0 +1,181 @@
+"""Thread-safe access token cache shared by the ARM REST helpers.
+
+`credential.get_token(...)` can be expensive - with `AzureDeveloperCliCredential` it
+spawns an `azd` subprocess - so tokens are cached per (scope, tenant) and refreshed
+proactively shortly before `expires_on`.
+
+Refreshes are single-flight: concurrent callers for the same key never trigger
+duplicate acquisitions. While a token is still valid but inside the refresh window,
+one caller refreshes it and everyone else keeps using the current token.
+
+`AsyncTokenCache` does the same for the `azure.identity.aio` credentials.
+"""
+
+from __future__ import annotations
+import asyncio
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+ARM_SCOPE = "https://management.azure.com/.default"
+
+
+class CachedToken(NamedTuple):
+    token: str
+    expires_on: int
+
+
+class TokenCache:
+    """Caches access tokens keyed by (scope, tenant)."""
+
+    def __init__(self, refresh_margin: float = 300.0, min_lifetime: float = 30.0):
+        # start refreshing `refresh_margin` seconds before expiry; below
+        # `min_lifetime` the token is treated as expired and callers wait
+        self.refresh_margin = refresh_margin
+        self.min_lifetime = min_lifetime
+
+        self._tokens: Dict[Tuple[str, Optional[str]], CachedToken] = {}
+        self._locks: Dict[Tuple[str, Optional[str]], threading.Lock] = {}
+        self._guard = threading.Lock()
+        self.acquisitions = 0
+        self.hits = 0
+
+    def _lock_for(self, key: Tuple[str, Optional[str]]) -> threading.Lock:
+        with self._guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _remaining(self, cached: Optional[CachedToken]) -> float:
+        return cached.expires_on - time.time() if cached else float("-inf")
+
+    def _acquire(self, credential, scope: str, tenant_id: Optional[str]) -> CachedToken:
+        kwargs = {"tenant_id": tenant_id} if tenant_id else {}
+        token = credential.get_token(scope, **kwargs)
+        self.acquisitions += 1
+        return CachedToken(token.token, int(token.expires_on))
+
+    def get_token(
+        self, credential, scope: str = ARM_SCOPE, tenant_id: Optional[str] = None
+    ) -> str:
+        """
+        Get a bearer token for the scope, acquiring it from the credential only when needed.
+        """
+        key = (scope, tenant_id)
+        cached = self._tokens.get(key)
+        remaining = self._remaining(cached)
+
+        if remaining > self.refresh_margin:
+            self.hits += 1
+            return cached.token
+
+        lock = self._lock_for(key)
+        if remaining > self.min_lifetime:
+            # still valid: refresh in the background of this call only if nobody else is
+            if not lock.acquire(blocking=False):
+                self.hits += 1
+                return cached.token
+        else:
+            lock.acquire()
+
+        try:
+            # someone else may have refreshed while we waited for the lock
+            cached = self._tokens.get(key)
+            if self._remaining(cached) > self.refresh_margin:
+                self.hits += 1
+                return cached.token
+            try:
+                cached = self._acquire(credential, scope, tenant_id)
+            except Exception:
+                # a failed proactive refresh shouldn't fail a call with a usable token
+                if self._remaining(cached) > self.min_lifetime:
+                    return cached.token
+                raise
+            self._tokens[key] = cached
+            return cached.token
+        finally:
+            lock.release()
+
+    def invalidate(self, scope: Optional[str] = None) -> None:
+        """Forget cached tokens (all, or only the ones for a scope)."""
+        with self._guard:
+            for key in list(self._tokens):
+                if scope is None or key[0] == scope:
+                    del self._tokens[key]
+
+
+class AsyncTokenCache(TokenCache):
+    """Same caching rules as TokenCache, for async credentials and coroutines."""
+
+    def __init__(self, refresh_margin: float = 300.0, min_lifetime: float = 30.0):
+        super().__init__(refresh_margin, min_lifetime)
+        self._async_locks: Dict[Tuple[str, Optional[str]], asyncio.Lock] = {}
+
+    def _async_lock_for(self, key: Tuple[str, Optional[str]]) -> asyncio.Lock:
+        lock = self._async_locks.get(key)
+        if lock is None:
+            lock = self._async_locks[key] = asyncio.Lock()
+        return lock
+
+    async def get_token_async(
+        self, credential, scope: str = ARM_SCOPE, tenant_id: Optional[str] = None
+    ) -> str:
+        """
+        Get a bearer token for the scope from an async credential, acquiring it only when needed.
+        """
+        key = (scope, tenant_id)
+        cached = self._tokens.get(key)
+        remaining = self._remaining(cached)
+
+        if remaining > self.refresh_margin:
+            self.hits += 1
+            return cached.token
+
+        lock = self._async_lock_for(key)
+        if remaining > self.min_lifetime and lock.locked():
+            # a refresh is already in flight and the current token is still usable
+            self.hits += 1
+            return cached.token
+
+        async with lock:
+            cached = self._tokens.get(key)
+            if self._remaining(cached) > self.refresh_margin:
+                self.hits += 1
+                return cached.token
+            kwargs = {"tenant_id": tenant_id} if tenant_id else {}
+            try:
+                token = await credential.get_token(scope, **kwargs)
+            except Exception:
+                if self._remaining(cached) > self.min_lifetime:
+                    return cached.token
+                raise
+            self.acquisitions += 1
+            cached = CachedToken(token.token, int(token.expires_on))
+            self._tokens[key] = cached
+            return cached.token
+
+
+arm_token_cache = TokenCache()
+arm_async_token_cache = AsyncTokenCache()
+
+
+def get_arm_token(credential, tenant_id: Optional[str] = None) -> str:
+    """Get an ARM (management.azure.com) token from the shared cache."""
+    return arm_token_cache.get_token(credential, ARM_SCOPE, tenant_id)
+
+
+async def get_arm_token_async(credential, tenant_id: Optional[str] = None) -> str:
+    """Get an ARM token for an async credential from the shared cache."""
+    return await arm_async_token_cache.get_token_async(credential, ARM_SCOPE, tenant_id)
+
+
+__all__ = [
+    "ARM_SCOPE",
+    "AsyncTokenCache",
+    "TokenCache",
+    "arm_async_token_cache",
+    "arm_token_cache",
+    "get_arm_token",
+    "get_arm_token_async",
+]
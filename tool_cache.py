@@ -0,0 +1,298 @@
+"""Opt-in memoization of kernel function (tool) results.
+
+The same tool questions come up again and again across conversations ("most 10
+popular books by reviews"), and every repeat re-runs the kernel function. A
+`ToolResultCache` installed on an agent's kernel (`setup.create_agent(...,
+memoize=True)`) answers repeats from memory instead.
+
+Results are keyed on (plugin, function, normalized arguments, dataset version):
+arguments are coerced to the declared parameter types and defaults are filled in, so
+`{"limit": "10"}` and `{"limit": 10}` hit the same entry, and plugins exposing a
+`dataset_version()` (e.g. `BooksTool`, based on the CSV's mtime / size) invalidate
+their entries when the data changes.
+
+The in-memory LRU is bounded by entry count and total bytes, entries expire after
+`ttl` seconds. With `store_path` results are also written to a sqlite file, so
+several kernels / notebooks / processes share them.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from semantic_kernel import Kernel
+from semantic_kernel.filters import FilterTypes, FunctionInvocationContext
+from semantic_kernel.functions import FunctionResult
+
+from settings import get_cache_dir, get_env
+
+_COERCE = {int: int, float: float, str: str}
+
+
+def _coerce(value: Any, type_object: Any) -> Any:
+    if type_object is bool and isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    coerce = _COERCE.get(type_object)
+    if coerce is None or isinstance(value, type_object):
+        return value
+    try:
+        return coerce(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def normalize_arguments(function, arguments) -> Dict[str, Any]:
+    """Declared parameters only, coerced to their types, with defaults filled in."""
+    normalized = {}
+    for parameter in function.metadata.parameters:
+        if parameter.name in arguments and arguments[parameter.name] is not None:
+            value = _coerce(arguments[parameter.name], parameter.type_object)
+        elif parameter.default_value is not None:
+            value = parameter.default_value
+        else:
+            continue
+        normalized[parameter.name] = value
+    return normalized
+
+
+class ToolResultCache:
+    """Bounded LRU + TTL cache of tool results, optionally backed by sqlite."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 16 * 1024 * 1024,
+        ttl: float = 3600.0,
+        store_path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.store_path = store_path
+
+        # key -> (value, size, expires_at)
+        self._entries: "OrderedDict[str, Tuple[str, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._versions: Dict[str, Callable[[], str]] = {}
+        self._store: Optional[sqlite3.Connection] = None
+
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.by_function: Counter = Counter()
+
+    # region keys
+
+    def register_version(self, plugin_name: str, version: Callable[[], str]) -> None:
+        """Use `version()` as the dataset version of a plugin's results."""
+        self._versions[plugin_name] = version
+
+    def key(self, plugin_name: str, function_name: str, arguments: Dict[str, Any]):
+        version_fn = self._versions.get(plugin_name)
+        version = version_fn() if version_fn else ""
+        payload = json.dumps(
+            [plugin_name, function_name, arguments, version],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # endregion
+
+    # region storage
+
+    def _open_store(self) -> sqlite3.Connection:
+        if self._store is None:
+            directory = os.path.dirname(self.store_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._store = sqlite3.connect(
+                self.store_path, timeout=5.0, check_same_thread=False
+            )
+            self._store.execute("PRAGMA journal_mode=WAL")
+            self._store.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT, size INTEGER, expires_at REAL)"
+            )
+        return self._store
+
+    def _remember(self, key: str, value: str, size: int, expires_at: float) -> None:
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size, expires_at)
+        self._bytes += size
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                self._bytes -= self._entries.pop(key)[1]
+
+            if self.store_path:
+                row = (
+                    self._open_store()
+                    .execute(
+                        "SELECT value, size, expires_at FROM results WHERE key = ?",
+                        (key,),
+                    )
+                    .fetchone()
+                )
+                if row and row[2] > now:
+                    self._remember(key, *row)
+                    self.store_hits += 1
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, size, expires_at)
+            if self.store_path:
+                store = self._open_store()
+                store.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                    (key, value, size, expires_at),
+                )
+                store.execute(
+                    "DELETE FROM results WHERE expires_at <= ?", (time.time(),)
+                )
+                store.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self.store_path:
+                store = self._open_store()
+                store.execute("DELETE FROM results")
+                store.commit()
+
+    # endregion
+
+    # region kernel integration
+
+    def install(
+        self, kernel: Kernel, plugin_names: Optional[Iterable[str]] = None
+    ) -> None:
+        """
+        Memoize the functions of `plugin_names` (all plugins if None) on the kernel.
+
+        Safe to call repeatedly; the filter is only added once per kernel. The plugin
+        list is per kernel, other kernels sharing this cache aren't affected.
+        """
+        invocation_filter = next(
+            (
+                f
+                for _, f in kernel.function_invocation_filters
+                if isinstance(f, _MemoizeFilter) and f.cache is self
+            ),
+            None,
+        )
+        if invocation_filter is None:
+            invocation_filter = _MemoizeFilter(self)
+            kernel.add_filter(FilterTypes.FUNCTION_INVOCATION, invocation_filter)
+        if plugin_names is None:
+            invocation_filter.plugins = None
+        elif invocation_filter.plugins is not None:
+            invocation_filter.plugins.update(plugin_names)
+
+    async def _invocation_filter(
+        self, context: FunctionInvocationContext, next, plugins: Optional[set]
+    ):
+        function = context.function
+        if plugins is not None and function.plugin_name not in plugins:
+            await next(context)
+            return
+
+        key = self.key(
+            function.plugin_name or "",
+            function.name,
+            normalize_arguments(function, context.arguments or {}),
+        )
+        cached = self.get(key)
+        if cached is not None:
+            self.by_function[f"{function.fully_qualified_name}:hit"] += 1
+            context.result = FunctionResult(
+                function=function.metadata, value=json.loads(cached)
+            )
+            return
+
+        self.by_function[f"{function.fully_qualified_name}:miss"] += 1
+        await next(context)
+        value = context.result.value if context.result is not None else None
+        if value is None:
+            return
+        try:
+            self.put(key, json.dumps(value))
+        except (TypeError, ValueError):
+            pass  # not JSON serializable, don't cache
+
+    # endregion
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.store_hits + self.misses
+        return {
+            "hits": self.hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.store_hits) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+            "by_function": dict(self.by_function),
+        }
+
+
+class _MemoizeFilter:
+    """A kernel's invocation filter, memoizing that kernel's allowed plugins."""
+
+    def __init__(self, cache: ToolResultCache):
+        self.cache = cache
+        self.plugins: Optional[set] = set()
+
+    async def __call__(self, context: FunctionInvocationContext, next):
+        await self.cache._invocation_filter(context, next, self.plugins)
+
+
+def default_store_path() -> str:
+    """`tool_results.sqlite` under AGENTS_CACHE_DIR, read on first use."""
+    return os.path.join(get_cache_dir(), "tool_results.sqlite")
+
+
+@lru_cache(maxsize=None)
+def get_tool_result_cache() -> ToolResultCache:
+    """The shared cache, backed by sqlite with AGENTS_TOOL_CACHE_SHARED=true."""
+    shared = get_env("AGENTS_TOOL_CACHE_SHARED", "false").lower() == "true"
+    return ToolResultCache(store_path=default_store_path() if shared else None)
+
+
+__all__ = [
+    "ToolResultCache",
+    "default_store_path",
+    "get_tool_result_cache",
+    "normalize_arguments",
+]
@@ -0,0 +1,494 @@
+"""Tool call timeline tracing for agent turns.
+
+`ToolCallTracer` replaces printing function calls / results from
+`on_intermediate_message` with structured events:
+
+* kernel (client side) function calls are timed by a kernel auto function invocation
+  filter and correlated with the agent's `FunctionCallContent` /
+  `FunctionResultContent` by call id,
+* server side tool calls of the run (connected sub-agents, OpenAPI, Bing, code
+  interpreter, ...) are read from the run steps after the turn, in the background,
+* every event records the agent that ran it, timestamps, duration and argument /
+  result sizes.
+
+Events are written by a background thread as JSONL and, optionally, as a Chrome
+trace (open in `chrome://tracing` or https://ui.perfetto.dev), so recording never
+blocks the agent stream loop:
+
+    tracer = ToolCallTracer(path=".cache/traces/run.jsonl", chrome_path=".cache/traces/run.json")
+    thread = await test_agent(client, agent, "...", tracer=tracer)
+    tracer.print_summary()
+"""
+
+from __future__ import annotations
+import asyncio
+import contextvars
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional
+
+from semantic_kernel import Kernel
+from semantic_kernel.contents import FunctionCallContent, FunctionResultContent
+from semantic_kernel.filters import AutoFunctionInvocationContext, FilterTypes
+
+from settings import get_cache_dir, get_env
+
+
+def _size(value: Any) -> int:
+    if value is None:
+        return 0
+    if not isinstance(value, str):
+        value = json.dumps(value, default=str)
+    return len(value.encode("utf-8"))
+
+
+def _timestamp(value: Any) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return None
+
+
+@dataclass
+class ToolCallEvent:
+    turn: int
+    call_id: str
+    name: str
+    agent: str
+    source: str  # "kernel" (function run by us) or "run_step" (run by the service)
+    started_at: float
+    ended_at: Optional[float] = None
+    arguments_bytes: int = 0
+    result_bytes: int = 0
+    status: str = "running"
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.ended_at is None:
+            return None
+        return self.ended_at - self.started_at
+
+
+@dataclass
+class TurnTrace:
+    turn: int
+    agent: str
+    user_message: str
+    started_at: float
+    ended_at: Optional[float] = None
+    thread_id: Optional[str] = None
+    run_ids: List[str] = field(default_factory=list)
+
+
+class _TraceWriter:
+    """Background thread appending events to JSONL / Chrome trace files."""
+
+    def __init__(self, path: Optional[str], chrome_path: Optional[str]):
+        self.path = path
+        self.chrome_path = chrome_path
+        self._queue: "queue.SimpleQueue[Optional[tuple]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._run, name="tool-trace-writer", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, record: Dict[str, Any], chrome_events: List[Dict[str, Any]]) -> None:
+        self._queue.put((record, chrome_events))
+
+    def _open(self, path: Optional[str]):
+        if not path:
+            return None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return open(path, "a", encoding="utf-8")
+
+    def _run(self) -> None:
+        jsonl = self._open(self.path)
+        chrome = self._open(self.chrome_path)
+        if chrome is not None and chrome.tell() == 0:
+            # JSON array trace format; the closing bracket is optional
+            chrome.write("[\n")
+        try:
+            while True:
+                item = self._queue.get()
+                batch = [item]
+                # write whatever else is queued before flushing
+                while item is not None:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    batch.append(item)
+                for entry in batch:
+                    if entry is None:
+                        continue
+                    record, chrome_events = entry
+                    if jsonl is not None:
+                        jsonl.write(json.dumps(record, default=str) + "\n")
+                    if chrome is not None:
+                        for event in chrome_events:
+                            chrome.write(json.dumps(event, default=str) + ",\n")
+                for f in (jsonl, chrome):
+                    if f is not None:
+                        f.flush()
+                if batch[-1] is None:
+                    return
+        finally:
+            for f in (jsonl, chrome):
+                if f is not None:
+                    f.close()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+class ToolCallTracer:
+    """Collects per turn tool call timelines, optionally writing them to disk."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        chrome_path: Optional[str] = None,
+        server_steps: bool = True,
+        max_events: int = 10_000,
+    ):
+        self.path = path
+        self.chrome_path = chrome_path
+        self.server_steps = server_steps
+        self.events: Deque[ToolCallEvent] = deque(maxlen=max_events)
+        self.turns: Deque[TurnTrace] = deque(maxlen=max_events)
+
+        self._turn_ids = itertools.count(1)
+        # per task, so concurrent conversations can share a tracer
+        self._turn: "contextvars.ContextVar[Optional[TurnTrace]]" = (
+            contextvars.ContextVar(f"tool_trace_turn_{id(self)}", default=None)
+        )
+        # call id -> event still waiting for its result
+        self._open_calls: Dict[str, ToolCallEvent] = {}
+        self._tracks: Dict[str, int] = {}
+        self._pending: set = set()
+        self._writer = _TraceWriter(path, chrome_path) if path or chrome_path else None
+        self._filter = self._auto_invocation_filter
+
+    # region recording
+
+    def install(self, kernel: Kernel) -> None:
+        """Time kernel function calls precisely. Safe to call repeatedly."""
+        filters = kernel.auto_function_invocation_filters
+        if not any(f is self._filter for _, f in filters):
+            kernel.add_filter(FilterTypes.AUTO_FUNCTION_INVOCATION, self._filter)
+
+    @property
+    def _current(self) -> Optional[TurnTrace]:
+        return self._turn.get()
+
+    def begin_turn(self, agent_name: str, user_message: str) -> TurnTrace:
+        turn = TurnTrace(
+            turn=next(self._turn_ids),
+            agent=agent_name,
+            user_message=user_message,
+            started_at=time.time(),
+        )
+        self._turn.set(turn)
+        self.turns.append(turn)
+        return turn
+
+    def _event_for(self, call_id: str, name: str, agent: str) -> ToolCallEvent:
+        event = self._open_calls.get(call_id)
+        if event is None:
+            event = ToolCallEvent(
+                turn=self._current.turn if self._current else 0,
+                call_id=call_id,
+                name=name,
+                agent=agent,
+                source="kernel",
+                started_at=time.time(),
+            )
+            self._open_calls[call_id] = event
+            self.events.append(event)
+        return event
+
+    def on_message(self, agent_response: Any) -> None:
+        """Record the function calls / results of an intermediate agent message."""
+        agent = agent_response.name or (self._current.agent if self._current else "")
+        for item in agent_response.items or []:
+            if isinstance(item, FunctionCallContent):
+                event = self._event_for(item.id or "", item.name or "", agent)
+                event.arguments_bytes = _size(item.arguments)
+            elif isinstance(item, FunctionResultContent):
+                event = self._event_for(item.id or "", item.name or "", agent)
+                event.result_bytes = _size(item.result)
+                self._finish(event)
+
+    async def _auto_invocation_filter(
+        self, context: AutoFunctionInvocationContext, next
+    ):
+        call = context.function_call_content
+        event = None
+        if call is not None:
+            event = self._event_for(
+                call.id or "",
+                call.name or context.function.fully_qualified_name,
+                self._current.agent if self._current else "",
+            )
+            event.started_at = time.time()
+            event.arguments_bytes = _size(call.arguments)
+        try:
+            await next(context)
+        except Exception:
+            if event is not None:
+                event.status = "failed"
+                event.ended_at = time.time()
+            raise
+        if event is not None:
+            event.ended_at = time.time()
+            result = context.function_result
+            event.result_bytes = _size(result.value if result is not None else None)
+
+    def _finish(self, event: ToolCallEvent) -> None:
+        if event.ended_at is None:
+            # the result arrived with the run's steps, not when the function returned
+            event.ended_at = time.time()
+        if event.status == "running":
+            event.status = "completed"
+        self._open_calls.pop(event.call_id, None)
+        self._write(event)
+
+    def record_run(self, thread_id: Optional[str], run_id: Optional[str]) -> None:
+        if self._current is None:
+            return
+        self._current.thread_id = thread_id or self._current.thread_id
+        if run_id and run_id not in self._current.run_ids:
+            self._current.run_ids.append(run_id)
+
+    async def _collect_run_steps(
+        self, client: Any, turn: TurnTrace, thread_id: str, run_id: str
+    ) -> None:
+        try:
+            async for step in client.agents.run_steps.list(
+                thread_id=thread_id, run_id=run_id
+            ):
+                if step.type != "tool_calls":
+                    continue
+                started = _timestamp(step.created_at) or turn.started_at
+                ended = _timestamp(step.completed_at) or _timestamp(step.failed_at)
+                for tool_call in step.step_details.tool_calls:
+                    if tool_call.type == "function":
+                        continue  # already traced on the client
+                    payload = tool_call.as_dict()
+                    details = payload.get(tool_call.type) or {}
+                    name = details.get("name") if isinstance(details, dict) else None
+                    event = ToolCallEvent(
+                        turn=turn.turn,
+                        call_id=tool_call.id,
+                        name=f"{tool_call.type}:{name}" if name else tool_call.type,
+                        agent=(
+                            name
+                            if tool_call.type == "connected_agent" and name
+                            else turn.agent
+                        ),
+                        source="run_step",
+                        started_at=started,
+                        ended_at=ended,
+                        arguments_bytes=_size(
+                            details.get("arguments") or details.get("input")
+                            if isinstance(details, dict)
+                            else None
+                        ),
+                        result_bytes=_size(
+                            details.get("output") if isinstance(details, dict) else None
+                        ),
+                        status=str(getattr(step.status, "value", step.status)),
+                        details={"step_id": step.id, "run_id": run_id},
+                    )
+                    self.events.append(event)
+                    self._write(event)
+        except Exception as e:
+            print(f"Could not read run steps of {run_id} for tracing: {e}")
+
+    async def _collect_server_steps(self, client: Any, turn: TurnTrace) -> None:
+        run_ids = list(turn.run_ids)
+        if not run_ids:
+            # streamed responses don't carry the run id, use the thread's latest run
+            try:
+                async for run in client.agents.runs.list(
+                    thread_id=turn.thread_id, limit=1
+                ):
+                    run_ids.append(run.id)
+                    break
+            except Exception as e:
+                print(f"Could not read runs of {turn.thread_id} for tracing: {e}")
+        for run_id in run_ids:
+            await self._collect_run_steps(client, turn, turn.thread_id, run_id)
+
+    def end_turn(self, client: Any = None) -> Optional[asyncio.Future]:
+        """End the current turn; returns the background run step collection, if any."""
+        turn = self._current
+        if turn is None:
+            return None
+        turn.ended_at = time.time()
+        for event in list(self._open_calls.values()):
+            if event.turn == turn.turn:
+                self._finish(event)
+        self._write_turn(turn)
+        task = None
+        if self.server_steps and client is not None and turn.thread_id:
+            task = asyncio.ensure_future(self._collect_server_steps(client, turn))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+        self._turn.set(None)
+        return task
+
+    # endregion
+
+    # region output
+
+    def _track(self, agent: str) -> int:
+        track = self._tracks.get(agent)
+        if track is None:
+            track = self._tracks[agent] = len(self._tracks) + 1
+            if self._writer is not None:
+                self._writer.put(
+                    {"type": "track", "agent": agent, "tid": track},
+                    [
+                        {
+                            "name": "thread_name",
+                            "ph": "M",
+                            "pid": 1,
+                            "tid": track,
+                            "args": {"name": agent or "agent"},
+                        }
+                    ],
+                )
+        return track
+
+    def _write(self, event: ToolCallEvent) -> None:
+        if self._writer is None:
+            return
+        track = self._track(event.agent)
+        record = {"type": "tool_call", **asdict(event), "duration": event.duration}
+        self._writer.put(
+            record,
+            [
+                {
+                    "name": event.name,
+                    "cat": event.source,
+                    "ph": "X",
+                    "pid": 1,
+                    "tid": track,
+                    "ts": event.started_at * 1e6,
+                    "dur": (event.duration or 0.0) * 1e6,
+                    "args": {
+                        "call_id": event.call_id,
+                        "turn": event.turn,
+                        "arguments_bytes": event.arguments_bytes,
+                        "result_bytes": event.result_bytes,
+                        "status": event.status,
+                    },
+                }
+            ],
+        )
+
+    def _write_turn(self, turn: TurnTrace) -> None:
+        if self._writer is None:
+            return
+        self._writer.put(
+            {"type": "turn", **asdict(turn)},
+            [
+                {
+                    "name": f"turn {turn.turn}",
+                    "cat": "turn",
+                    "ph": "X",
+                    "pid": 1,
+                    "tid": 0,
+                    "ts": turn.started_at * 1e6,
+                    "dur": ((turn.ended_at or turn.started_at) - turn.started_at) * 1e6,
+                    "args": {"agent": turn.agent, "user_message": turn.user_message},
+                }
+            ],
+        )
+
+    def summary(self, turn: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Per tool totals, largest total duration first."""
+        totals: Dict[tuple, Dict[str, Any]] = {}
+        for event in self.events:
+            if turn is not None and event.turn != turn:
+                continue
+            key = (event.agent, event.name)
+            total = totals.setdefault(
+                key,
+                {
+                    "agent": event.agent,
+                    "name": event.name,
+                    "calls": 0,
+                    "total_s": 0.0,
+                    "max_s": 0.0,
+                    "result_bytes": 0,
+                },
+            )
+            total["calls"] += 1
+            total["total_s"] += event.duration or 0.0
+            total["max_s"] = max(total["max_s"], event.duration or 0.0)
+            total["result_bytes"] += event.result_bytes
+        return sorted(totals.values(), key=lambda t: t["total_s"], reverse=True)
+
+    def print_summary(self, turn: Optional[int] = None) -> None:
+        for total in self.summary(turn):
+            print(
+                f"{total['total_s'] * 1000:8.0f}ms  {total['calls']:3d}x  "
+                f"{total['agent']}: {total['name']} "
+                f"(max {total['max_s'] * 1000:.0f}ms, {total['result_bytes']} bytes)"
+            )
+
+    async def flush(self) -> None:
+        """Wait for background run step collection."""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    # endregion
+
+
+def trace_dir() -> str:
+    """`traces` under AGENTS_CACHE_DIR, read on first use."""
+    return os.path.join(get_cache_dir(), "traces")
+
+
+@lru_cache(maxsize=None)
+def get_tool_tracer() -> ToolCallTracer:
+    """The shared tracer, writing traces to `trace_dir()` with AGENTS_TRACE=true."""
+    if get_env("AGENTS_TRACE", "false").lower() != "true":
+        # reading run steps costs two requests per turn, only pay them when tracing
+        return ToolCallTracer(server_steps=False)
+    directory = trace_dir()
+    name = time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+    return ToolCallTracer(
+        path=os.path.join(directory, f"{name}.jsonl"),
+        chrome_path=os.path.join(directory, f"{name}.trace.json"),
+    )
+
+
+__all__ = [
+    "ToolCallEvent",
+    "ToolCallTracer",
+    "TurnTrace",
+    "get_tool_tracer",
+    "trace_dir",
+]